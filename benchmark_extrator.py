@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+# Benchmarks do extrator.
+#
+# Comparação entre os dois caminhos de extração dos dados de um processo:
+# - DOM: cada campo é lido por uma chamada ao WebDriver (extrair_dados_dom)
+# - page_source: o HTML é obtido uma vez e analisado localmente (parsear_processo)
+#
+# Cada processo é carregado uma única vez e os dois caminhos são medidos sobre
+# a mesma página. O download de documentos não entra na medição.
+#
+# Uso: python benchmark_extrator.py ADI 6000 6010
+#
+# Suíte do parser, sem acesso ao portal: mede cada etapa de parsear_processo
+# (árvore, cabeçalho com relator e origem, andamentos, deslocamentos) e a
+# detecção de processo baixado sobre páginas gravadas com --gravar e páginas
+# sintéticas de tamanhos crescentes (até milhares de andamentos). Informa
+# processos/s, andamentos/s e o pico de memória, e termina com erro se algum
+# valor piorar além da tolerância em relação à base gravada.
+#
+# Uso: python benchmark_extrator.py parser --fixtures fixtures
+#      python benchmark_extrator.py parser --salvar-base   (grava a base de comparação)
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+import statistics
+import tracemalloc
+import urllib.parse
+
+import dsd
+import extrator_selenium as extrator
+import portal_simulado
+
+BASE_BENCHMARK = 'benchmark_base.json'  # Resultados de referência para a detecção de regressões
+TOLERANCIA = 0.2  # Piora relativa aceita antes de acusar regressão
+REPETICOES = 5  # Passadas sobre cada corpus; vale a mais rápida
+DURACAO_MINIMA_PASSADA = 0.5  # Segundos; corpora pequenos são percorridos várias vezes em cada passada
+TAMANHOS_SINTETICOS = (10, 100, 500, 2000)  # Andamentos de cada página sintética
+
+def comparar_parsers(classe: str, num_inicial: int, num_final: int):
+    """Mede e compara os dois caminhos de extração em um intervalo de processos.
+
+    Args:
+        classe: Classe processual (ADI, ADPF, etc.)
+        num_inicial: Número inicial do intervalo
+        num_final: Número final do intervalo
+    """
+    pool = extrator.PoolDrivers(tamanho=1)
+    tempos_dom = []
+    tempos_html = []
+    total_andamentos = 0
+
+    try:
+        for numero in range(num_inicial, num_final + 1):
+            url = extrator.URL_PROCESSO.format(classe=classe, numero=numero)
+            try:
+                driver, page = extrator.criar_driver_e_navegar(url, pool)
+            except Exception as e:
+                print(f'{classe}{numero} - falha ao carregar: {e}')
+                continue
+
+            try:
+                inicio = time.perf_counter()
+                dados_html = extrator.parsear_processo(page)
+                tempo_html = time.perf_counter() - inicio
+
+                if dados_html is None:
+                    print(f'{classe}{numero} - não encontrado')
+                    continue
+
+                inicio = time.perf_counter()
+                html_total = dsd.xpath_get(driver, '//*[@id="conteudo"]')
+                dados_dom = extrator.extrair_dados_dom(driver, html_total)
+                tempo_dom = time.perf_counter() - inicio
+            finally:
+                pool.devolver(driver)
+
+            divergentes = [campo for campo in dados_dom if dados_dom[campo] != dados_html.get(campo)]
+            n_andamentos = len(dados_html['andamentos_lista'])
+            total_andamentos += n_andamentos
+            tempos_dom.append(tempo_dom)
+            tempos_html.append(tempo_html)
+
+            print(f'{classe}{numero}: {n_andamentos} andamentos | '
+                  f'DOM {tempo_dom:.2f}s | page_source {tempo_html:.3f}s | '
+                  f'{tempo_dom / max(tempo_html, 1e-6):.0f}x'
+                  + (f' | campos divergentes: {divergentes}' if divergentes else ''))
+    finally:
+        pool.encerrar()
+
+    if tempos_dom:
+        print('\n' + '='*60)
+        print(f'Processos comparados: {len(tempos_dom)} ({total_andamentos} andamentos)')
+        print(f'DOM:         total {sum(tempos_dom):.2f}s | mediana {statistics.median(tempos_dom):.2f}s')
+        print(f'page_source: total {sum(tempos_html):.2f}s | mediana {statistics.median(tempos_html):.3f}s')
+        print(f'Ganho: {sum(tempos_dom) / max(sum(tempos_html), 1e-6):.0f}x')
+
+
+def pagina_sintetica(n_andamentos: int, n_deslocamentos: int = None) -> str:
+    """Monta uma página de processo no formato do portal, com o número de andamentos pedido.
+
+    Um terço dos andamentos tem julgador e um quarto tem documento. Nenhum é de
+    baixa, de modo que a detecção de processo baixado percorre toda a lista.
+    """
+    if n_deslocamentos is None:
+        n_deslocamentos = max(1, n_andamentos // 10)
+
+    andamentos = []
+    for i in range(n_andamentos):
+        julgador = ('<span class="andamento-julgador badge bg-info">MIN. ROBERTO BARROSO</span>'
+                    if i % 3 == 0 else '')
+        link = (f'<a href="downloadPeca.asp?id={15000000 + i}&amp;ext=.pdf" target="_blank">'
+                f'<i class="far fa-file-alt"></i> Inteiro teor</a>' if i % 4 == 0 else '')
+        andamentos.append(f"""
+<div class="andamento-item">
+  <div class="andamento-inner">
+    <div class="message-head clearfix">
+      <div class="andamento-detalhe">
+        <div class="col-md-3 p-l-0"><div class="andamento-data ">{i % 28 + 1:02d}/{i % 12 + 1:02d}/{2024 - i // 300}</div></div>
+        <div class="col-md-5 p-l-0"><h5 class="andamento-nome ">Conclusos ao(à) Relator(a) {i}</h5></div>
+        <div class="col-md-4 p-0">{julgador}</div>
+        <div class="col-md-9 p-0">Petição nº {50000 + i}/2024 &amp; anexos<br>recebida em {i % 28 + 1:02d}/01/2024</div>
+        <div class="col-md-3">{link}</div>
+      </div>
+    </div>
+  </div>
+</div>""")
+
+    deslocamentos = []
+    for i in range(n_deslocamentos):
+        deslocamentos.append(f"""
+<div class="lista-dados m-b-20">
+            <div class="col-md-12"><span class="processo-detalhes-bold">SECRETARIA JUDICIÁRIA {i}</span></div>
+            <div class="col-md-12"><span class="processo-detalhes">GABINETE DO MINISTRO {i}</span>
+            <span class="processo-detalhes bg-font-success">Recebido em {i % 28 + 1:02d}/03/2023</span></div>
+            <div class="col-md-12 text-right">
+                <span class="processo-detalhes">Guia {9000 + i}/2023</span></div>
+        </div>""")
+
+    return f"""<html><head><meta charset="utf-8"><title>STF</title></head><body>
+<div id="conteudo">
+<input type="hidden" id="incidente" value="{6000000 + n_andamentos}">
+<input type="hidden" id="classe-numero-processo" value="ADI {n_andamentos}">
+<div id="texto-pagina-interna"><div><div><div>
+  <div class="processo-titulo"><span class="badge bg-danger">MEDIDA LIMINAR</span> Processo Eletrônico Público</div>
+  <div><div><div><div>AÇÃO DIRETA DE INCONSTITUCIONALIDADE</div></div></div></div>
+</div></div></div></div>
+<div class="processo-dados p-l-16">Relator(a): MIN. ROBERTO BARROSO</div>
+<div class="processo-dados p-l-16">Redator do acórdão: </div>
+<div id="descricao-procedencia"><span class="processo-detalhes">SP - SÃO PAULO</span></div>
+<div id="partes">
+  <div class="detalhe-parte">REQTE.(S)</div><div class="nome-parte">PARTIDO DOS EXEMPLOS</div>
+  <div class="detalhe-parte">ADV.(A/S)</div><div class="nome-parte">FULANO DE TAL (00000/SP)</div>
+  <div class="detalhe-parte">INTDO.(A/S)</div><div class="nome-parte">PRESIDENTE DA REPÚBLICA</div>
+</div>
+<div id="informacoes-completas">
+  <div><div>Assunto:</div><div><ul><li>DIREITO ADMINISTRATIVO</li><li>SERVIDOR PÚBLICO</li></ul></div></div>
+  <div><div><div>Autuação</div><div><div>Data de Protocolo:</div><div>
+    12/02/2024 </div><div>Órgão de Origem:</div><div> SUPREMO TRIBUNAL FEDERAL </div></div></div></div>
+</div>
+<div class="processo-andamentos m-t-8">{''.join(andamentos)}</div>
+<div id="deslocamentos">{''.join(deslocamentos)}</div>
+</div></body></html>"""
+
+
+def carregar_fixtures(pasta: str) -> dict:
+    """Lê as páginas de processos gravadas com --gravar, já com as abas inseridas.
+
+    Returns:
+        dict: nome do processo (ex.: 'ADI6000') -> HTML completo da página
+    """
+    indice = portal_simulado.carregar_indice(pasta)
+
+    def ler(chave):
+        arquivo, _, _ = indice[chave]
+        with open(os.path.join(pasta, 'arquivos', arquivo), 'rb') as f:
+            return f.read().decode('utf-8', errors='replace')
+
+    paginas = {}
+    for chave in sorted(indice):
+        partes = urllib.parse.urlsplit('http://' + chave)
+        if not partes.path.endswith('/listarProcessos.asp'):
+            continue
+        consulta = dict(urllib.parse.parse_qsl(partes.query))
+        page = ler(chave)
+
+        # Gravações do backend HTTP: a página principal e as abas estão separadas
+        incidente = re.search(r'id="incidente"[^>]*value="(\d+)"', page)
+        if incidente is not None and 'processo-andamentos' not in page:
+            base = chave.rsplit('/', 1)[0]
+            chaves_abas = [f'{base}/{aba}?incidente={incidente.group(1)}' for aba, _, _ in extrator._ABAS_PROCESSO]
+            if all(chave_aba in indice for chave_aba in chaves_abas):
+                page = extrator.inserir_abas(page, [ler(chave_aba) for chave_aba in chaves_abas])
+
+        if extrator.parsear_processo(page) is not None:
+            paginas[f'{consulta.get("classe", "")}{consulta.get("numeroProcesso", "")}'] = page
+    return paginas
+
+
+def _medir_etapas(page: str, tempos: dict):
+    """Executa as etapas de parsear_processo separadamente, somando o tempo de cada uma."""
+    inicio = time.perf_counter()
+    pagina = extrator.PaginaProcesso(page)
+    meio = time.perf_counter()
+    tempos['arvore'] += meio - inicio
+
+    inicio = meio
+    html_total = pagina.inner_html(pagina.por_id('conteudo'))
+    html_origem = pagina.inner_html(pagina.por_id('descricao-procedencia'))
+    extrator._extrair_relator(html_total)
+    extrator._extrair_origem(html_origem)
+    extrator._tipo_processo(html_total)
+    meio = time.perf_counter()
+    tempos['cabecalho'] += meio - inicio
+
+    inicio = meio
+    andamentos = extrator._parsear_andamentos(pagina)
+    meio = time.perf_counter()
+    tempos['andamentos'] += meio - inicio
+
+    inicio = meio
+    extrator._parsear_deslocamentos(pagina)
+    meio = time.perf_counter()
+    tempos['deslocamentos'] += meio - inicio
+
+    inicio = meio
+    extrator._processo_finalizado(andamentos)
+    tempos['baixado'] += time.perf_counter() - inicio
+
+
+def medir_corpus(paginas: list, repeticoes: int = REPETICOES) -> dict:
+    """Mede o parser sobre um conjunto de páginas.
+
+    O tempo total é o de parsear_processo() seguido da detecção de processo
+    baixado; vale a passada mais rápida. Cada passada percorre o corpus quantas
+    vezes forem necessárias para durar DURACAO_MINIMA_PASSADA. O pico de memória
+    é o maior pico registrado pelo tracemalloc na análise de uma única página.
+
+    Args:
+        paginas: HTML completo de cada página
+        repeticoes: Número de passadas sobre o corpus
+
+    Returns:
+        dict: processos, andamentos, processos_por_segundo, andamentos_por_segundo,
+        memoria_pico_mb e o tempo de cada etapa (ms por processo)
+    """
+    inicio = time.perf_counter()
+    n_andamentos = sum(len(extrator.parsear_processo(page)['andamentos_lista']) for page in paginas)
+    voltas = max(1, math.ceil(DURACAO_MINIMA_PASSADA / max(time.perf_counter() - inicio, 1e-9)))
+
+    tempos_totais = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for _ in range(voltas):
+            for page in paginas:
+                dados = extrator.parsear_processo(page)
+                extrator._processo_finalizado(dados['andamentos_lista'])
+        tempos_totais.append((time.perf_counter() - inicio) / voltas)
+    melhor = max(min(tempos_totais), 1e-9)
+
+    etapas = dict.fromkeys(('arvore', 'cabecalho', 'andamentos', 'deslocamentos', 'baixado'), float('inf'))
+    for _ in range(repeticoes):
+        tempos = dict.fromkeys(etapas, 0.0)
+        for _ in range(voltas):
+            for page in paginas:
+                _medir_etapas(page, tempos)
+        etapas = {etapa: min(etapas[etapa], tempos[etapa] / voltas) for etapa in etapas}
+
+    pico = 0
+    tracemalloc.start()
+    try:
+        for page in paginas:
+            tracemalloc.reset_peak()
+            atual = tracemalloc.get_traced_memory()[0]
+            extrator.parsear_processo(page)
+            pico = max(pico, tracemalloc.get_traced_memory()[1] - atual)
+    finally:
+        tracemalloc.stop()
+
+    return {'processos': len(paginas),
+            'andamentos': n_andamentos,
+            'processos_por_segundo': round(len(paginas) / melhor, 2),
+            'andamentos_por_segundo': round(n_andamentos / melhor, 1),
+            'memoria_pico_mb': round(pico / 1024 / 1024, 3),
+            'etapas_ms': {etapa: round(tempo * 1000 / len(paginas), 3) for etapa, tempo in etapas.items()}}
+
+
+def comparar_com_base(resultados: dict, base: dict, tolerancia: float = TOLERANCIA) -> list:
+    """Compara os resultados com a base e retorna as regressões encontradas.
+
+    Vazão (processos/s e andamentos/s) abaixo de (1 - tolerancia) vezes a base
+    ou pico de memória acima de (1 + tolerancia) vezes a base são regressões.
+    Corpora ausentes da base, ou com outro número de processos, são ignorados.
+    """
+    regressoes = []
+    for corpus, atual in resultados.items():
+        anterior = base.get(corpus)
+        if anterior is None or anterior['processos'] != atual['processos']:
+            continue
+        for metrica in ('processos_por_segundo', 'andamentos_por_segundo'):
+            if atual[metrica] < anterior[metrica] * (1 - tolerancia):
+                regressoes.append(f'{corpus}: {metrica} caiu de {anterior[metrica]} para {atual[metrica]}')
+        if atual['memoria_pico_mb'] > anterior['memoria_pico_mb'] * (1 + tolerancia):
+            regressoes.append(f'{corpus}: memoria_pico_mb subiu de {anterior["memoria_pico_mb"]} '
+                              f'para {atual["memoria_pico_mb"]}')
+    return regressoes
+
+
+def benchmark_parser(argv: list = None) -> int:
+    """Executa a suíte do parser e retorna o código de saída (1 se houver regressão)."""
+    parser = argparse.ArgumentParser(prog='benchmark_extrator.py parser',
+                                     description='Mede o parser sobre páginas gravadas e sintéticas.')
+    parser.add_argument('--fixtures', metavar='PASTA',
+                        help='Pasta gravada com python extrator_selenium.py --gravar PASTA')
+    parser.add_argument('--tamanhos', type=int, nargs='*', default=list(TAMANHOS_SINTETICOS),
+                        help='Andamentos de cada página sintética (nenhum: sem páginas sintéticas)')
+    parser.add_argument('--repeticoes', type=int, default=REPETICOES)
+    parser.add_argument('--base', default=BASE_BENCHMARK, help=f'Arquivo da base (padrão: {BASE_BENCHMARK})')
+    parser.add_argument('--salvar-base', action='store_true', help='Grava os resultados como nova base')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help=f'Piora relativa aceita (padrão: {TOLERANCIA})')
+    args = parser.parse_args(argv)
+
+    corpora = {}
+    if args.fixtures:
+        paginas = carregar_fixtures(args.fixtures)
+        if paginas:
+            corpora['gravados'] = list(paginas.values())
+        print(f'{len(paginas)} página(s) gravada(s) em {args.fixtures}')
+    for tamanho in args.tamanhos:
+        corpora[f'sintetico_{tamanho}'] = [pagina_sintetica(tamanho)]
+    if not corpora:
+        parser.error('nenhuma página para medir')
+
+    resultados = {}
+    print(f'{"Corpus":<18}{"proc.":>6}{"andam.":>8}{"proc/s":>10}{"andam/s":>11}{"pico MB":>9}  '
+          f'etapas (ms/processo)')
+    for corpus, paginas in corpora.items():
+        resultado = medir_corpus(paginas, args.repeticoes)
+        resultados[corpus] = resultado
+        etapas = ' '.join(f'{etapa}={tempo}' for etapa, tempo in resultado['etapas_ms'].items())
+        print(f'{corpus:<18}{resultado["processos"]:>6}{resultado["andamentos"]:>8}'
+              f'{resultado["processos_por_segundo"]:>10}{resultado["andamentos_por_segundo"]:>11}'
+              f'{resultado["memoria_pico_mb"]:>9}  {etapas}')
+
+    if args.salvar_base:
+        with open(args.base, 'w', encoding='utf-8') as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f'Base gravada em {args.base}')
+        return 0
+
+    if not os.path.exists(args.base):
+        print(f'Sem base em {args.base}; use --salvar-base para criá-la')
+        return 0
+    with open(args.base, encoding='utf-8') as f:
+        regressoes = comparar_com_base(resultados, json.load(f), args.tolerancia)
+    if regressoes:
+        print(f'\nRegressões (tolerância de {args.tolerancia:.0%}):')
+        for regressao in regressoes:
+            print(f'  - {regressao}')
+        return 1
+    print(f'\nSem regressões em relação a {args.base}')
+    return 0
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'parser':
+        sys.exit(benchmark_parser(sys.argv[2:]))
+    if len(sys.argv) != 4:
+        print('Uso: python benchmark_extrator.py CLASSE NUM_INICIAL NUM_FINAL')
+        print('     python benchmark_extrator.py parser [--fixtures PASTA] [--salvar-base]')
+        sys.exit(1)
+    comparar_parsers(sys.argv[1], int(sys.argv[2]), int(sys.argv[3]))
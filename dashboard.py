@@ -149,6 +149,35 @@ _ALL_LIMINAR = (
 )
 
 
+def read_dataset(path: str, columns: list) -> pd.DataFrame:
+    """Reads only the given columns from the consolidated CSV or Parquet file."""
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+def parse_records(value) -> list:
+    """Returns a list column (andamentos, decisões) as a list.
+
+    CSV cells hold JSON strings; Parquet cells are already nested arrays.
+    """
+    if isinstance(value, str):
+        return json.loads(value)
+    return list(value)
+
+
+def resolve_decisions(decisoes: list, andamentos) -> list:
+    """Returns a case's decisões as andamento dicts.
+
+    Current files store decisões as the `index` of each decisional andamento;
+    files written before that hold copies of the andamentos themselves.
+    """
+    if not decisoes or isinstance(decisoes[0], dict):
+        return decisoes
+    by_index = {a["index"]: a for a in parse_records(andamentos)}
+    return [by_index[i] for i in decisoes if i in by_index]
+
+
 def _classify_liminar(
     andamentos_json: str, liminar_flag: str,
 ) -> tuple[str, str, int]:
@@ -158,7 +187,7 @@ def _classify_liminar(
     so a case with a monocratic grant + collegial referendo = 2.
     """
     try:
-        andamentos = json.loads(andamentos_json)
+        andamentos = parse_records(andamentos_json)
     except Exception:
         return ("Sem decisão liminar", "", 0)
 
@@ -209,7 +238,7 @@ def load_data(path: str) -> pd.DataFrame:
         "lista_assuntos", "len(andamentos_lista)", "len(decisões)",
         "len(deslocamentos)", "status_processo",
     ]
-    df = pd.read_csv(path, usecols=light_cols + ["andamentos_lista"])
+    df = read_dataset(path, light_cols + ["andamentos_lista"])
 
     df["data_protocolo"] = pd.to_datetime(
         df["data_protocolo"], format="%d/%m/%Y", errors="coerce"
@@ -217,7 +246,7 @@ def load_data(path: str) -> pd.DataFrame:
     df["ano"] = df["data_protocolo"].dt.year
     df["decada"] = (df["ano"] // 10 * 10).astype("Int64")
 
-    df["tem_liminar"] = df["liminar"].str.contains(
+    df["tem_liminar"] = df["liminar"].astype(str).str.contains(
         "MEDIDA LIMINAR", na=False
     )
 
@@ -243,6 +272,8 @@ def load_data(path: str) -> pd.DataFrame:
 
 def safe_parse_list(val):
     try:
+        if not isinstance(val, str):
+            return list(val)
         return ast.literal_eval(val)
     except Exception:
         return []
@@ -394,15 +425,15 @@ def _determine_session_result(
 
 @st.cache_data(show_spinner="Extraindo sessões virtuais dos andamentos...")
 def load_virtual_sessions(path: str) -> pd.DataFrame:
-    raw = pd.read_csv(
+    raw = read_dataset(
         path,
-        usecols=["nome_processo", "classe", "relator", "andamentos_lista"],
+        columns=["nome_processo", "classe", "relator", "andamentos_lista"],
     )
 
     records = []
     for _, row in raw.iterrows():
         try:
-            andamentos = json.loads(row["andamentos_lista"])
+            andamentos = parse_records(row["andamentos_lista"])
         except Exception:
             continue
 
@@ -557,15 +588,15 @@ def _normalize_minister_name(name: str) -> str:
 
 @st.cache_data(show_spinner="Extraindo destaques das sessões virtuais...")
 def load_destaques(path: str) -> pd.DataFrame:
-    raw = pd.read_csv(
+    raw = read_dataset(
         path,
-        usecols=["nome_processo", "classe", "relator", "andamentos_lista"],
+        columns=["nome_processo", "classe", "relator", "andamentos_lista"],
     )
 
     records = []
     for _, row in raw.iterrows():
         try:
-            andamentos = json.loads(row["andamentos_lista"])
+            andamentos = parse_records(row["andamentos_lista"])
         except Exception:
             continue
 
@@ -677,15 +708,15 @@ def load_destaque_cancelamentos(path: str) -> pd.DataFrame:
     Informal: destaque followed by return to virtual session with no vista
     in between.
     """
-    raw = pd.read_csv(
+    raw = read_dataset(
         path,
-        usecols=["nome_processo", "classe", "relator", "andamentos_lista"],
+        columns=["nome_processo", "classe", "relator", "andamentos_lista"],
     )
 
     records = []
     for _, row in raw.iterrows():
         try:
-            andamentos = json.loads(row["andamentos_lista"])
+            andamentos = parse_records(row["andamentos_lista"])
         except Exception:
             continue
 
@@ -792,15 +823,17 @@ _RE_SESSAO_VIRTUAL_DEC = re.compile(
 
 @st.cache_data(show_spinner="Extraindo votos alterados das decisões...")
 def load_votos_alterados(path: str) -> pd.DataFrame:
-    raw = pd.read_csv(
+    raw = read_dataset(
         path,
-        usecols=["nome_processo", "classe", "relator", "decisões"],
+        columns=["nome_processo", "classe", "relator", "decisões", "andamentos_lista"],
     )
 
     records = []
     for _, row in raw.iterrows():
         try:
-            decisoes = json.loads(row["decisões"])
+            decisoes = resolve_decisions(
+                parse_records(row["decisões"]), row["andamentos_lista"],
+            )
         except Exception:
             continue
 
@@ -881,15 +914,17 @@ def _enrich_votos_alterados(
 @st.cache_data(show_spinner="Classificando modalidade de julgamento dos processos...")
 def load_case_venue(path: str) -> pd.DataFrame:
     """Classify each case's collegial judgment venue: virtual, presencial, or mixed."""
-    raw = pd.read_csv(
+    raw = read_dataset(
         path,
-        usecols=["nome_processo", "decisões"],
+        columns=["nome_processo", "decisões", "andamentos_lista"],
     )
 
     records = []
     for _, row in raw.iterrows():
         try:
-            decisoes = json.loads(row["decisões"])
+            decisoes = resolve_decisions(
+                parse_records(row["decisões"]), row["andamentos_lista"],
+            )
         except Exception:
             decisoes = []
 
@@ -2586,15 +2621,15 @@ def _extract_vista_minister(nome: str, julgador: str, complemento: str) -> str:
 
 @st.cache_data(show_spinner="Extraindo pedidos de vista...")
 def load_vistas(path: str) -> pd.DataFrame:
-    raw = pd.read_csv(
+    raw = read_dataset(
         path,
-        usecols=["nome_processo", "classe", "relator", "andamentos_lista"],
+        columns=["nome_processo", "classe", "relator", "andamentos_lista"],
     )
 
     records = []
     for _, row in raw.iterrows():
         try:
-            andamentos = json.loads(row["andamentos_lista"])
+            andamentos = parse_records(row["andamentos_lista"])
         except Exception:
             continue
 
@@ -3568,18 +3603,20 @@ def apply_sidebar_filters(df: pd.DataFrame) -> pd.DataFrame:
 # --- Main ---
 def main():
     CSV_PATH = "ArquivosConcatenados.csv"
+    PARQUET_PATH = "ArquivosConcatenados.parquet"
+    DATA_PATH = PARQUET_PATH if os.path.exists(PARQUET_PATH) else CSV_PATH
 
-    if not os.path.exists(CSV_PATH):
-        st.error(f"Arquivo `{CSV_PATH}` não encontrado. Coloque-o na raiz do projeto.")
+    if not os.path.exists(DATA_PATH):
+        st.error(f"Arquivo `{CSV_PATH}` ou `{PARQUET_PATH}` não encontrado. Coloque-o na raiz do projeto.")
         return
 
-    df_raw = load_data(CSV_PATH)
-    vs_raw = load_virtual_sessions(CSV_PATH)
-    dest_raw = load_destaques(CSV_PATH)
-    dc_raw = load_destaque_cancelamentos(CSV_PATH)
-    va_raw = load_votos_alterados(CSV_PATH)
-    venue_raw = load_case_venue(CSV_PATH)
-    vt_raw = load_vistas(CSV_PATH)
+    df_raw = load_data(DATA_PATH)
+    vs_raw = load_virtual_sessions(DATA_PATH)
+    dest_raw = load_destaques(DATA_PATH)
+    dc_raw = load_destaque_cancelamentos(DATA_PATH)
+    va_raw = load_votos_alterados(DATA_PATH)
+    venue_raw = load_case_venue(DATA_PATH)
+    vt_raw = load_vistas(DATA_PATH)
     df = apply_sidebar_filters(df_raw)
 
     st.sidebar.divider()
@@ -58,11 +58,14 @@ def load_data(path: str) -> pd.DataFrame:
         "lista_assuntos", "len(andamentos_lista)", "len(decisões)",
         "len(deslocamentos)", "status_processo",
     ]
-    df = pd.read_csv(path, usecols=light_cols)
+    if path.endswith(".parquet"):
+        df = pd.read_parquet(path, columns=light_cols)
+    else:
+        df = pd.read_csv(path, usecols=light_cols)
 
     df["data_protocolo"] = pd.to_datetime(df["data_protocolo"], format="%d/%m/%Y", errors="coerce")
     df["ano"] = df["data_protocolo"].dt.year
-    df["tem_liminar"] = df["liminar"].str.contains("MEDIDA LIMINAR", na=False)
+    df["tem_liminar"] = df["liminar"].astype(str).str.contains("MEDIDA LIMINAR", na=False)
     df["origem_valida"] = df["origem"].apply(lambda x: x if x in UF_NAMES else None)
     df["categoria_autor"] = df["autor1"].apply(categorize_petitioner)
 
@@ -341,12 +344,14 @@ def render_explorer(df):
 # --- Main ---
 def main():
     CSV_PATH = "ArquivosConcatenados_1.csv"
+    PARQUET_PATH = "ArquivosConcatenados_1.parquet"
+    DATA_PATH = PARQUET_PATH if os.path.exists(PARQUET_PATH) else CSV_PATH
 
-    if not os.path.exists(CSV_PATH):
-        st.error(f"Arquivo `{CSV_PATH}` não encontrado. Coloque-o na raiz do projeto.")
+    if not os.path.exists(DATA_PATH):
+        st.error(f"Arquivo `{CSV_PATH}` ou `{PARQUET_PATH}` não encontrado. Coloque-o na raiz do projeto.")
         return
 
-    df_raw = load_data(CSV_PATH)
+    df_raw = load_data(DATA_PATH)
     df = apply_sidebar_filters(df_raw)
 
     st.sidebar.divider()
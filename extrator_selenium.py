@@ -4,47 +4,80 @@
 # SISTEMA DE ARQUIVAMENTO INTELIGENTE:
 # - baixados/: Processos com "BAIXA AO ARQUIVO" - nunca são reprocessados
 # - temp/: Processos em andamento - podem ser atualizados em novas execuções
-# - nao_encontrados/: Processos inexistentes - nunca são rebuscados
+# - registro_processos.sqlite: situação de cada processo (baixado, em andamento,
+#   não encontrado, erro de acesso), com tentativas, último erro e hash do conteúdo
 #
 # RETOMADA AUTOMÁTICA:
-# - Processos em baixados/ são sempre pulados
-# - Processos em temp/ são reprocessados para atualizar dados
-# - Processos em nao_encontrados/ são sempre pulados
-# - Para reprocessar tudo: delete temp/, baixados/ e nao_encontrados/
+# - Processos baixados são sempre pulados
+# - Processos em temp/ são atualizados: apenas andamentos novos têm documentos baixados
+# - Processos não encontrados são sempre pulados; erros de acesso são tentados de novo
+# - Para reprocessar tudo: delete temp/, baixados/ e registro_processos.sqlite
 #
 # Defina aqui a classe a ser buscada e um número inicial e final.
 # O nome da classe é sensível a maiúsculas. Utilize a sigla constante da página do STF.
+# Esses valores são usados quando o script é executado sem argumentos. Pela linha de
+# comando é possível extrair várias classes, intervalos e listas em uma só execução:
+#   python extrator_selenium.py ADI:6000-6010 ADPF:1-100 --arquivo lista.txt
 
 classe = 'ADI'
 num_inicial = 6000
 num_final = 6010
 
 # É possível definir uma lista de processos para processar. Esta, por exemplo, é a lista dos processos estruturais.
-# Nese caso, desative as linhas 152 e 153 (inserindo um # que transforma o código em comentário) e ative as linhas 148 a 150.
+# Nesse caso, ative a lista abaixo: ela é usada no lugar do intervalo quando o script é executado sem argumentos.
 # lista_processos = [ ['ADI', '130'], ['ADI', '206'], ['ADI', '267'], ['ADI', '296'], ['ADI', '297'], ['ADI', '336'], ['ADI', '343'], ['ADI', '361'], ['ADI', '443'], ['ADI', '477'], ['ADI', '480'], ['ADI', '529'], ['ADI', '535'], ['ADI', '607'], ['ADI', '635'], ['ADI', '652'], ['ADI', '713'], ['ADI', '720'], ['ADI', '799'], ['ADI', '823'], ['ADI', '875'], ['ADI', '877'], ['ADI', '889'], ['ADI', '986'], ['ADI', '989'], ['ADI', '1177'], ['ADI', '1338'], ['ADI', '1387'], ['ADI', '1458'], ['ADI', '1466'], ['ADI', '1468'], ['ADI', '1484'], ['ADI', '1495'], ['ADI', '1638'], ['ADI', '1698'], ['ADI', '1810'], ['ADI', '1820'], ['ADI', '1830'], ['ADI', '1836'], ['ADI', '1877'], ['ADI', '1987'], ['ADI', '1996'], ['ADI', '2017'], ['ADI', '2061'], ['ADI', '2076'], ['ADI', '2140'], ['ADI', '2154'], ['ADI', '2162'], ['ADI', '2205'], ['ADI', '2318'], ['ADI', '2445'], ['ADI', '2481'], ['ADI', '2486'], ['ADI', '2490'], ['ADI', '2491'], ['ADI', '2492'], ['ADI', '2493'], ['ADI', '2495'], ['ADI', '2496'], ['ADI', '2497'], ['ADI', '2498'], ['ADI', '2503'], ['ADI', '2504'], ['ADI', '2505'], ['ADI', '2506'], ['ADI', '2507'], ['ADI', '2508'], ['ADI', '2509'], ['ADI', '2510'], ['ADI', '2511'], ['ADI', '2512'], ['ADI', '2516'], ['ADI', '2517'], ['ADI', '2518'], ['ADI', '2519'], ['ADI', '2520'], ['ADI', '2523'], ['ADI', '2524'], ['ADI', '2525'], ['ADI', '2537'], ['ADI', '2557'], ['ADI', '2634'], ['ADI', '2727'], ['ADI', '2778'], ['ADI', '3243'], ['ADI', '3276'], ['ADI', '3302'], ['ADI', '3303'], ['ADI', '3575'], ['ADI', '3682'], ['ADI', '3902']]
 
 # IMPORTANTE: Suprimir stderr ANTES de qualquer import que use Chrome/ChromeDriver
 # Isso evita mensagens do tipo "DevTools listening", "PHONE_REGISTRATION_ERROR", etc.
 import sys
 import os
-sys.stderr = open(os.devnull, 'w', encoding='utf-8')
+if __name__ == '__main__':
+    sys.stderr = open(os.devnull, 'w', encoding='utf-8')
 
 import dsd  # Módulo dsd-br publicado no PyPI
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import os
 from datetime import datetime
 import time
+import argparse
+import ast
 import json
+import math
+import multiprocessing
+import urllib.parse
+import hashlib
+import queue
+import re
+import signal
+try:
+    import resource
+except ImportError:  # Windows: vale apenas o limite de tempo no processo principal
+    resource = None
+import socket
+import sqlite3
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
 from selenium.common.exceptions import (NoSuchElementException,
                                       TimeoutException,
                                       WebDriverException)
 import pdfplumber
+import requests
+import io
 from io import BytesIO
+from portal_simulado import GravadorFixtures, reescrever_url
 from striprtf.striprtf import rtf_to_text
 import urllib3
 from tenacity import (retry, stop_after_attempt, wait_exponential,
-                     retry_if_exception_type, before_sleep_log)
+                     retry_if_exception_type, retry_if_not_exception_type,
+                     before_sleep_log)
 import logging
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -55,17 +88,64 @@ logger = logging.getLogger(__name__)
 
 
 request_count = 0  # Contador de requisições
-processonaoencontrado = 0
+_lock_contador = threading.Lock()
 
 # Configuração do Chrome será feita via dsd.create_stf_webdriver()
 
 # Configurações globais
+URL_PROCESSO = 'https://portal.stf.jus.br/processos/listarProcessos.asp?classe={classe}&numeroProcesso={numero}'
 TIMEOUT = 15
 MAX_RETRIES = 5
 RETRY_DELAY = 2  # segundos
 BACKOFF_MIN = 2  # segundos mínimos entre tentativas
 BACKOFF_MAX = 30  # segundos máximos entre tentativas
 BACKOFF_MULTIPLIER = 2  # multiplicador para backoff exponencial
+NUM_TRABALHADORES = 1  # Extrações simultâneas (threads)
+REQUISICOES_POR_MINUTO = 120  # Taxa inicial de requisições ao portal, somando todos os trabalhadores
+REQUISICOES_POR_MINUTO_MIN = 10  # A taxa nunca cai abaixo deste valor
+REQUISICOES_POR_MINUTO_MAX = 600  # A taxa nunca sobe acima deste valor
+AUMENTO_POR_RESPOSTA = 1  # Requisições/min somadas à taxa a cada resposta normal
+FATOR_REDUCAO = 0.5  # Fator aplicado à taxa a cada bloqueio (403, CAPTCHA, 502) ou resposta lenta
+RESPOSTA_LENTA = 10  # Segundos a partir dos quais uma resposta reduz a taxa
+DISJUNTOR_LIMITE = 5  # Bloqueios (403, CAPTCHA, 502) dentro da janela que suspendem todas as requisições
+DISJUNTOR_JANELA = 60  # Janela, em segundos, para a contagem de bloqueios
+DISJUNTOR_ESPERA = 120  # Segundos de suspensão antes de testar o portal com uma única requisição
+DISJUNTOR_ESPERA_MAX = 1800  # A suspensão dobra a cada teste malsucedido, até este limite
+ORCAMENTO_ATUALIZACAO = None  # Máximo de requisições de páginas por execução com --atualizar (None: sem limite)
+PRIORIDADE_MINIMA_ATUALIZACAO = 0.05  # Processos com chance de mudança abaixo desta ficam para outra execução
+SESSAO_RECENTE_DIAS = 30  # Sessão ou pauta de julgamento virtual nestes dias aumenta a prioridade
+FATOR_SESSAO_RECENTE = 5  # Multiplicador da atividade esperada de processos com sessão recente
+DAEMON_INTERVALO_CICLO = 300  # Modo contínuo: segundos de espera entre ciclos de atualização
+DAEMON_INTERVALO_DESCOBERTA = 3600  # Modo contínuo: segundos entre buscas por processos novos
+DAEMON_STATUS = 'status_daemon.json'  # Modo contínuo: fila, processos concluídos e defasagem por classe
+FILA_DISTRIBUIDA = 'fila_distribuida.sqlite'  # Fila distribuída (--fila PASTA): arquivo dentro da pasta compartilhada
+FILA_TAMANHO_LOTE = 50  # Fila distribuída: processos por lote alugado a cada máquina
+FILA_PRAZO_LOTE = 600  # Fila distribuída: segundos sem renovação após os quais o lote de uma máquina parada é realugado
+FILA_INTERVALO_RENOVACAO = 60  # Fila distribuída: segundos entre renovações do lote em extração
+FILA_TENTATIVAS_LOTE = 3  # Fila distribuída: lotes com erros de acesso voltam à fila até este número de aluguéis
+LIMITE_NAO_ENCONTRADOS = 20  # Encerra após este número de processos seguidos não encontrados
+AMOSTRAS_FRONTEIRA = 3  # Números consecutivos consultados em cada ponto da busca pelo último processo
+POOL_DRIVERS = 1  # Número de drivers Chrome mantidos abertos
+PAGINAS_POR_DRIVER = 50  # Recicla o driver após este número de páginas
+BACKEND = 'selenium'  # 'selenium' (Chrome headless) ou 'http' (sem navegador, com fallback para o Chrome)
+DOWNLOADS_SIMULTANEOS = 8  # Documentos baixados em paralelo, somando todos os trabalhadores
+FILA_DOCUMENTOS = 200  # Máximo de documentos aguardando download
+PROCESSOS_EXTRACAO = max(1, (os.cpu_count() or 2) - 1)  # Processos para extrair texto de PDFs e RTFs
+TEMPO_CPU_MAX_DOCUMENTO = 120  # Segundos de CPU por documento antes de desistir da extração
+REGISTRO_PROCESSOS = 'registro_processos.sqlite'  # Registro da situação de cada processo (retomada)
+PRAZO_REIVINDICACAO = 1800  # Segundos até um processo em 'processando' poder ser retomado por outro trabalhador
+ATUALIZACAO_INCREMENTAL = True  # Processos em temp/ baixam apenas documentos de andamentos novos
+USAR_CACHE_DOCUMENTOS = True  # Reaproveita documentos já baixados em execuções anteriores
+CACHE_DOCUMENTOS = 'cache_documentos.sqlite'  # Arquivo do cache de documentos
+PASTA_LOGS = 'logs'  # Log de cada execução (JSONL), com o tempo de cada etapa por processo
+MUDANCAS = 'mudancas.jsonl'  # Andamentos, deslocamentos e partes novos, alterados ou removidos em cada extração (só acréscimo)
+TEXTOS_DOCUMENTOS = 'textos_documentos.sqlite'  # Textos dos documentos, referenciados pelos andamentos (documento_id)
+CACHE_TAMANHO_MAX_MB = 2048  # Tamanho máximo do cache; os documentos menos acessados são removidos
+FORMATOS_SAIDA = ('csv', 'parquet')  # Arquivos finais gerados; o Parquet tem as listas como colunas aninhadas
+CONSOLIDACAO_LOTE = 500  # Linhas do arquivo consolidado lidas por vez ao substituir processos alterados
+USAR_PARSER_DOM = False  # True: lê cada elemento pelo WebDriver em vez de analisar o page_source
+GRAVAR_FIXTURES = None  # Pasta onde gravar as páginas e documentos recebidos, para reprodução com portal_simulado.py
+PORTAL_SIMULADO = None  # URL base do portal simulado (ex.: 'http://127.0.0.1:8000'); None acessa o portal do STF
 
 
 # Exceções personalizadas para retry
@@ -74,18 +154,479 @@ class STFAccessError(Exception):
     pass
 
 
+class MedidorExecucao:
+    """Mede o tempo de cada etapa da extração e grava um log da execução em JSONL.
+
+    Cada processo tem seus tempos por etapa (driver, navegação, HTTP, parser,
+    documentos, gravação, esperas do limitador e do disjuntor e espera entre
+    tentativas), gravados como uma linha {"tipo": "processo", ...} ao final do
+    processo. Os documentos, baixados em outras threads, geram linhas
+    {"tipo": "documento", ...} próprias. Ao final, resumo() calcula percentis
+    por etapa e processos por hora, também gravados no log.
+
+    As etapas medidas fora de um processo (ex.: downloads) entram apenas nas
+    estatísticas gerais.
+    """
+
+    def __init__(self):
+        self._arquivo = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._duracoes = {}  # etapa -> lista de durações, em segundos
+        self._processos = {}  # status -> número de processos
+        self._totais = {}  # contador -> soma (documentos, bytes...)
+        self._inicio = time.time()
+        self.caminho = None
+
+    def abrir(self, pasta: str = PASTA_LOGS):
+        """Começa a gravar o log da execução em pasta/execucao_AAAAMMDD_HHMMSS.jsonl."""
+        os.makedirs(pasta, exist_ok=True)
+        self.caminho = os.path.join(pasta, f'execucao_{datetime.now():%Y%m%d_%H%M%S}.jsonl')
+        self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+        self._inicio = time.time()
+
+    def gravar(self, registro_log: dict):
+        """Acrescenta uma linha ao log da execução (sem efeito se o log não foi aberto)."""
+        if self._arquivo is None:
+            return
+        linha = json.dumps(registro_log, ensure_ascii=False)
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.write(linha + '\n')
+                self._arquivo.flush()
+
+    def iniciar_processo(self, classe: str, numero: int):
+        """Inicia a medição de um processo na thread atual."""
+        self._local.processo = {'classe': classe, 'numero': numero, 'inicio': time.time(),
+                                'etapas': {}, 'contadores': {}}
+
+    def finalizar_processo(self, status: str):
+        """Encerra a medição do processo da thread atual e grava sua linha no log."""
+        processo = getattr(self._local, 'processo', None)
+        self._local.processo = None
+        if processo is None:
+            return
+        duracao = time.time() - processo['inicio']
+        with self._lock:
+            self._processos[status] = self._processos.get(status, 0) + 1
+            if status != 'pulado':
+                self._duracoes.setdefault('processo', []).append(duracao)
+        if status != 'pulado':
+            self.gravar({'tipo': 'processo', 'classe': processo['classe'], 'numero': processo['numero'],
+                         'status': status, 'inicio': datetime.fromtimestamp(processo['inicio']).isoformat(timespec='seconds'),
+                         'duracao': round(duracao, 3),
+                         'etapas': {etapa: round(valor, 3) for etapa, valor in processo['etapas'].items()},
+                         **processo['contadores']})
+
+    @contextmanager
+    def etapa(self, nome: str):
+        """Mede a duração do bloco como uma etapa do processo atual."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar_etapa(nome, time.perf_counter() - inicio)
+
+    def registrar_etapa(self, nome: str, duracao: float):
+        """Soma uma duração, em segundos, à etapa do processo atual e às estatísticas gerais."""
+        processo = getattr(self._local, 'processo', None)
+        if processo is not None:
+            processo['etapas'][nome] = processo['etapas'].get(nome, 0) + duracao
+        with self._lock:
+            self._duracoes.setdefault(nome, []).append(duracao)
+
+    def somar(self, contador: str, valor: float = 1):
+        """Soma um valor a um contador do processo atual e da execução."""
+        processo = getattr(self._local, 'processo', None)
+        if processo is not None:
+            processo['contadores'][contador] = processo['contadores'].get(contador, 0) + valor
+        with self._lock:
+            self._totais[contador] = self._totais.get(contador, 0) + valor
+
+    def resumo(self) -> dict:
+        """Percentis por etapa (p50, p90, p99, em segundos), totais e processos gravados por hora."""
+        def percentil(valores: list, p: float) -> float:
+            return valores[min(len(valores) - 1, int(round(p / 100 * (len(valores) - 1))))]
+
+        with self._lock:
+            decorrido = time.time() - self._inicio
+            extraidos = self._processos.get('baixado', 0) + self._processos.get('temp', 0)
+            etapas = {}
+            for nome, valores in self._duracoes.items():
+                ordenados = sorted(valores)
+                etapas[nome] = {'n': len(ordenados), 'total': round(sum(ordenados), 1),
+                                'p50': round(percentil(ordenados, 50), 3),
+                                'p90': round(percentil(ordenados, 90), 3),
+                                'p99': round(percentil(ordenados, 99), 3)}
+            return {'tipo': 'resumo', 'duracao': round(decorrido, 1),
+                    'processos': dict(self._processos),
+                    'processos_por_hora': round(extraidos / decorrido * 3600, 1) if decorrido else 0,
+                    'totais': {nome: round(valor, 3) for nome, valor in self._totais.items()},
+                    'etapas': etapas}
+
+    def fechar(self) -> dict:
+        """Grava o resumo no log, fecha o arquivo e retorna o resumo."""
+        resumo = self.resumo()
+        self.gravar(resumo)
+        with self._lock:
+            if self._arquivo is not None:
+                self._arquivo.close()
+                self._arquivo = None
+        return resumo
+
+
+# Medição das etapas compartilhada entre os trabalhadores
+medidor = MedidorExecucao()
+
+
+def _antes_de_esperar(nivel: int):
+    """Callback de tenacity: registra a tentativa no logger e soma a espera no medidor."""
+    registrar_log = before_sleep_log(logger, nivel)
+
+    def antes_de_esperar(retry_state):
+        registrar_log(retry_state)
+        medidor.somar('tentativas_repetidas')
+        medidor.registrar_etapa('espera_tentativas', retry_state.next_action.sleep)
+    return antes_de_esperar
+
+
+class LimitadorRequisicoes:
+    """Balde de fichas adaptativo compartilhado por todos os trabalhadores.
+
+    Cada requisição ao portal (página de processo ou documento) consome uma
+    ficha. As fichas são repostas à taxa atual, de modo que a carga total
+    sobre o portal não depende do número de trabalhadores.
+
+    A taxa se ajusta como no controle de congestionamento do TCP (AIMD): cada
+    resposta normal a aumenta em `aumento` requisições por minuto, até
+    `maximo`; um bloqueio (403, CAPTCHA, 502) ou uma resposta mais lenta que
+    `resposta_lenta` segundos a multiplica por `fator_reducao`, até `minimo`.
+    Reduções seguidas dentro de `intervalo_reducao` segundos contam como uma
+    só, para que várias respostas ruins simultâneas não derrubem a taxa de uma vez.
+
+    Args:
+        por_minuto: Taxa inicial, em requisições por minuto
+        rajada: Número de requisições que podem ser feitas de uma só vez
+        minimo: Taxa mínima, em requisições por minuto
+        maximo: Taxa máxima, em requisições por minuto
+        aumento: Requisições por minuto somadas a cada resposta normal
+        fator_reducao: Fator aplicado à taxa a cada bloqueio ou resposta lenta
+        resposta_lenta: Segundos a partir dos quais uma resposta é considerada lenta
+        intervalo_reducao: Segundos mínimos entre duas reduções
+    """
+
+    def __init__(self, por_minuto: float = REQUISICOES_POR_MINUTO, rajada: int = 1,
+                 minimo: float = REQUISICOES_POR_MINUTO_MIN, maximo: float = REQUISICOES_POR_MINUTO_MAX,
+                 aumento: float = AUMENTO_POR_RESPOSTA, fator_reducao: float = FATOR_REDUCAO,
+                 resposta_lenta: float = RESPOSTA_LENTA, intervalo_reducao: float = 5):
+        self.taxa = por_minuto / 60.0
+        self.capacidade = rajada
+        self.minimo = minimo / 60.0
+        self.maximo = maximo / 60.0
+        self.aumento = aumento / 60.0
+        self.fator_reducao = fator_reducao
+        self.resposta_lenta = resposta_lenta
+        self.intervalo_reducao = intervalo_reducao
+        self._fichas = float(rajada)
+        self._ultimo = time.monotonic()
+        self._ultima_reducao = float('-inf')
+        self._lock = threading.Lock()
+        self.respostas = 0
+        self.reducoes = 0
+
+    def aguardar(self):
+        """Bloqueia até haver uma ficha disponível e a consome."""
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._fichas = min(self.capacidade,
+                                   self._fichas + (agora - self._ultimo) * self.taxa)
+                self._ultimo = agora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = (1 - self._fichas) / self.taxa
+            medidor.registrar_etapa('espera_limitador', espera)
+            time.sleep(espera)
+
+    def registrar_resposta(self, duracao: float):
+        """Registra uma resposta sem bloqueio e a duração da requisição, em segundos."""
+        if duracao > self.resposta_lenta:
+            self.registrar_bloqueio(f'resposta lenta ({duracao:.1f}s)')
+            return
+        with self._lock:
+            self.respostas += 1
+            self.taxa = min(self.maximo, self.taxa + self.aumento)
+
+    def registrar_bloqueio(self, motivo: str = 'bloqueio'):
+        """Reduz a taxa após um bloqueio do portal ou uma resposta lenta."""
+        with self._lock:
+            agora = time.monotonic()
+            if agora - self._ultima_reducao < self.intervalo_reducao:
+                return
+            self._ultima_reducao = agora
+            self.reducoes += 1
+            self.taxa = max(self.minimo, self.taxa * self.fator_reducao)
+            por_minuto = self.taxa * 60
+        logger.warning(f'Limitador: {motivo} - taxa reduzida para {por_minuto:.0f} requisições/min')
+
+    def estatisticas(self) -> dict:
+        """Taxa atual (requisições/min), respostas normais e reduções."""
+        with self._lock:
+            return {'por_minuto': round(self.taxa * 60, 1), 'respostas': self.respostas,
+                    'reducoes': self.reducoes}
+
+
+# Orçamento global de requisições, compartilhado entre os trabalhadores
+limitador = LimitadorRequisicoes(rajada=NUM_TRABALHADORES)
+
+
+class DisjuntorAcesso:
+    """Disjuntor que suspende todas as requisições ao portal durante um bloqueio.
+
+    Quando o portal começa a bloquear, cada processo e cada tentativa repetiriam
+    a mesma sequência condenada, abrindo um Chrome novo a cada vez. O disjuntor
+    abre após `limite` bloqueios dentro de `janela` segundos e suspende as
+    requisições de todos os trabalhadores por `espera` segundos. Em seguida,
+    uma única requisição de teste é liberada: se passar, o disjuntor fecha e a
+    extração continua; se for bloqueada, a suspensão recomeça com o dobro do
+    tempo, até `espera_max`.
+
+    Args:
+        limite: Bloqueios dentro da janela que abrem o disjuntor
+        janela: Janela de contagem, em segundos
+        espera: Suspensão inicial, em segundos
+        espera_max: Suspensão máxima, em segundos
+        prazo_teste: Segundos após os quais um teste sem resposta é liberado para outro trabalhador
+    """
+
+    def __init__(self, limite: int = DISJUNTOR_LIMITE, janela: float = DISJUNTOR_JANELA,
+                 espera: float = DISJUNTOR_ESPERA, espera_max: float = DISJUNTOR_ESPERA_MAX,
+                 prazo_teste: float = TIMEOUT * 4):
+        self.limite = limite
+        self.janela = janela
+        self.espera_inicial = espera
+        self.espera_max = espera_max
+        self.prazo_teste = prazo_teste
+        self.estado = 'fechado'  # 'fechado', 'aberto' ou 'teste'
+        self._bloqueios = []
+        self._espera = espera
+        self._reabre_em = 0.0
+        self._teste_iniciado = 0.0
+        self._condicao = threading.Condition()
+        self.aberturas = 0
+        self.tempo_suspenso = 0.0
+
+    def aguardar(self):
+        """Bloqueia enquanto o disjuntor estiver aberto ou houver um teste em curso."""
+        with self._condicao:
+            while True:
+                agora = time.monotonic()
+                if self.estado == 'fechado':
+                    return
+                if self.estado == 'aberto' and agora >= self._reabre_em:
+                    # Esta requisição é o teste; as demais aguardam o resultado
+                    self.estado = 'teste'
+                    self._teste_iniciado = agora
+                    logger.info('Disjuntor: testando o portal com uma requisição')
+                    return
+                if self.estado == 'teste' and agora - self._teste_iniciado > self.prazo_teste:
+                    # O teste anterior não informou o resultado (ex.: erro do Selenium)
+                    self._teste_iniciado = agora
+                    return
+                if self.estado == 'aberto':
+                    espera = self._reabre_em - agora
+                else:
+                    espera = self._teste_iniciado + self.prazo_teste - agora
+                inicio_espera = time.perf_counter()
+                self._condicao.wait(max(espera, 0.1))
+                medidor.registrar_etapa('espera_disjuntor', time.perf_counter() - inicio_espera)
+
+    def registrar_sucesso(self):
+        """Registra uma resposta sem bloqueio; fecha o disjuntor se era o teste."""
+        with self._condicao:
+            if self.estado == 'teste':
+                logger.warning('Disjuntor: portal respondeu normalmente, retomando a extração')
+                self.estado = 'fechado'
+                self._bloqueios.clear()
+                self._espera = self.espera_inicial
+                self._condicao.notify_all()
+
+    def registrar_bloqueio(self):
+        """Registra um bloqueio (403, CAPTCHA, 502); abre o disjuntor se necessário."""
+        with self._condicao:
+            agora = time.monotonic()
+            if self.estado == 'teste':
+                self._espera = min(self._espera * 2, self.espera_max)
+                self._abrir(agora, 'teste bloqueado')
+            elif self.estado == 'fechado':
+                self._bloqueios = [t for t in self._bloqueios if agora - t <= self.janela]
+                self._bloqueios.append(agora)
+                if len(self._bloqueios) >= self.limite:
+                    self._abrir(agora, f'{len(self._bloqueios)} bloqueios em {self.janela}s')
+
+    def _abrir(self, agora: float, motivo: str):
+        self.estado = 'aberto'
+        self._reabre_em = agora + self._espera
+        self.aberturas += 1
+        self.tempo_suspenso += self._espera
+        self._bloqueios.clear()
+        logger.warning(f'Disjuntor aberto ({motivo}): requisições suspensas por {self._espera:.0f}s')
+        self._condicao.notify_all()
+
+    def estatisticas(self) -> dict:
+        """Estado atual, número de aberturas e tempo total de suspensão, em segundos."""
+        with self._condicao:
+            return {'estado': self.estado, 'aberturas': self.aberturas,
+                    'tempo_suspenso': round(self.tempo_suspenso)}
+
+
+# Disjuntor compartilhado entre os trabalhadores, as tentativas e os downloads
+disjuntor = DisjuntorAcesso()
+
+
+class PoolDrivers:
+    """Pool de WebDrivers headless reutilizados entre processos e tentativas.
+
+    Abrir e fechar o Chrome a cada processo consome a maior parte do tempo da
+    extração. O pool mantém os drivers abertos e os devolve para reuso,
+    reciclando cada driver após `max_paginas` páginas ou quando ele é
+    descartado (CAPTCHA, 403, 502 ou erro do Selenium).
+
+    Args:
+        tamanho: Número máximo de drivers abertos ao mesmo tempo
+        max_paginas: Páginas carregadas por um driver antes de ser reciclado
+    """
+
+    def __init__(self, tamanho: int = POOL_DRIVERS, max_paginas: int = PAGINAS_POR_DRIVER):
+        self.tamanho = tamanho
+        self.max_paginas = max_paginas
+        self._livres = queue.LifoQueue()
+        self._paginas = {}
+        self._vagas = threading.BoundedSemaphore(tamanho)
+        self._lock = threading.Lock()
+        self.criados = 0
+        self.reciclados = 0
+        self.reutilizacoes = 0
+
+    def obter(self):
+        """Retorna um driver livre, criando um novo se necessário."""
+        self._vagas.acquire()
+        try:
+            driver = self._livres.get_nowait()
+        except queue.Empty:
+            try:
+                driver = dsd.create_stf_webdriver(headless=True)
+            except Exception:
+                self._vagas.release()
+                raise
+            time.sleep(1)  # Apenas na criação; drivers reutilizados já estão prontos
+            with self._lock:
+                self.criados += 1
+                self._paginas[id(driver)] = 0
+        else:
+            with self._lock:
+                self.reutilizacoes += 1
+        return driver
+
+    def devolver(self, driver, descartar: bool = False):
+        """Devolve o driver ao pool ou o encerra se deve ser reciclado.
+
+        Args:
+            driver: Driver obtido com obter()
+            descartar: Se True, encerra o driver (ex.: após CAPTCHA ou 403)
+        """
+        with self._lock:
+            paginas = self._paginas.get(id(driver), 0) + 1
+            reciclar = descartar or paginas >= self.max_paginas
+            if reciclar:
+                self._paginas.pop(id(driver), None)
+                self.reciclados += 1
+            else:
+                self._paginas[id(driver)] = paginas
+
+        if reciclar:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        else:
+            self._livres.put(driver)
+        self._vagas.release()
+
+    def encerrar(self):
+        """Encerra todos os drivers livres do pool."""
+        while True:
+            try:
+                driver = self._livres.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._paginas.pop(id(driver), None)
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def estatisticas(self) -> dict:
+        """Retorna contadores de uso do pool."""
+        with self._lock:
+            return {'vivos': len(self._paginas),
+                    'criados': self.criados,
+                    'reciclados': self.reciclados,
+                    'reutilizacoes': self.reutilizacoes}
+
+
+def aguardar_carregamento(driver, timeout: float = TIMEOUT):
+    """Aguarda o carregamento das abas da página do processo.
+
+    As abas de andamentos e informações são preenchidas depois do carregamento
+    inicial. A espera termina antes se a página indicar processo inexistente ou
+    bloqueio. Em caso de timeout, segue com o conteúdo disponível.
+    """
+    def carregada(driver):
+        if (driver.find_elements(By.CLASS_NAME, 'processo-andamentos') and
+                driver.find_elements(By.ID, 'informacoes-completas')):
+            return True
+        page = driver.page_source
+        return any(marca in page for marca in ('Processo não encontrado', '403 Forbidden',
+                                                'CAPTCHA', '502 Bad Gateway'))
+
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.2).until(carregada)
+    except TimeoutException:
+        logger.debug(f'Timeout aguardando as abas de {driver.current_url}')
+
+
+# Gravação das respostas do portal (--gravar), reproduzidas por portal_simulado.py
+gravador = GravadorFixtures()
+
+
+def url_acesso(url: str) -> str:
+    """URL efetivamente acessada: a do portal simulado, se PORTAL_SIMULADO estiver definido.
+
+    As URLs gravadas nos dados e usadas como chave do cache continuam as do portal do STF.
+    """
+    return reescrever_url(url, PORTAL_SIMULADO)
+
+
 # Funções com retry logic usando tenacity
 @retry(
     stop=stop_after_attempt(MAX_RETRIES),
     wait=wait_exponential(multiplier=BACKOFF_MULTIPLIER, min=BACKOFF_MIN, max=BACKOFF_MAX),
     retry=retry_if_exception_type((STFAccessError, WebDriverException)),
-    before_sleep=before_sleep_log(logger, logging.INFO)
+    reraise=True,  # Esgotadas as tentativas, propaga o erro original (não RetryError)
+    before_sleep=_antes_de_esperar(logging.INFO)
 )
-def criar_driver_e_navegar(url: str):
-    """Cria WebDriver e navega para URL com retry automático.
+def criar_driver_e_navegar(url: str, pool: PoolDrivers):
+    """Obtém um WebDriver do pool e navega para URL com retry automático.
+
+    O driver retornado deve ser devolvido com pool.devolver(driver). Em caso
+    de bloqueio ou erro, o driver é descartado antes de nova tentativa.
 
     Args:
         url: URL do processo no portal STF
+        pool: Pool de drivers reutilizáveis
 
     Returns:
         tuple: (driver, page_source)
@@ -94,465 +635,3461 @@ def criar_driver_e_navegar(url: str):
         STFAccessError: Se detectar CAPTCHA, 403 ou 502
         WebDriverException: Erros do Selenium
     """
-    driver = dsd.create_stf_webdriver(headless=True)
-    time.sleep(1)  # Remover para máxima velocidade
+    # Durante um bloqueio, aguarda o disjuntor antes de abrir um Chrome
+    disjuntor.aguardar()
+    with medidor.etapa('driver'):
+        driver = pool.obter()
 
     try:
-        dsd.webdriver_get(driver, url)
+        limitador.aguardar()
+        inicio = time.monotonic()
+        with medidor.etapa('navegacao'):
+            dsd.webdriver_get(driver, url_acesso(url))
+            aguardar_carregamento(driver)
+            page = driver.page_source
 
         # Valida se não há bloqueios
-        if '403 Forbidden' in driver.page_source:
-            driver.quit()
+        if '403 Forbidden' in page:
             raise STFAccessError('403 Forbidden detectado')
 
-        if 'CAPTCHA' in driver.page_source:
-            driver.quit()
+        if 'CAPTCHA' in page:
             raise STFAccessError('CAPTCHA detectado')
 
-        if '502 Bad Gateway' in driver.page_source:
-            driver.quit()
+        if '502 Bad Gateway' in page:
             raise STFAccessError('502 Bad Gateway detectado')
 
-        return driver, driver.page_source
+        limitador.registrar_resposta(time.monotonic() - inicio)
+        disjuntor.registrar_sucesso()
+        # A página já renderizada é gravada sem scripts, para não recarregar as abas na reprodução
+        gravador.gravar(url, re.sub(r'<script\b.*?</script>', '', page, flags=re.S | re.I).encode('utf-8'))
+        return driver, page
 
     except Exception as e:
-        try:
-            driver.quit()
-        except:
-            pass
+        if isinstance(e, STFAccessError):
+            limitador.registrar_bloqueio(str(e))
+            disjuntor.registrar_bloqueio()
+        pool.devolver(driver, descartar=True)
         raise
 
 
+def normalizar_url(url: str) -> str:
+    """Normaliza a URL de um documento para uso como chave de cache.
+
+    Remove resíduos de '&amp;', o fragmento e a diferença de caixa no host,
+    e ordena os parâmetros da consulta.
+    """
+    partes = urllib.parse.urlsplit(url.strip().replace('&amp;', '&'))
+    consulta = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(partes.query, keep_blank_values=True)))
+    return urllib.parse.urlunsplit((partes.scheme.lower(), partes.netloc.lower(),
+                                    partes.path, consulta, ''))
+
+
+class CacheDocumentos:
+    """Cache persistente, em SQLite, dos textos extraídos dos documentos.
+
+    Decisões publicadas não mudam, então cada documento só precisa ser baixado
+    uma vez. Os textos são endereçados pelo hash do conteúdo baixado (documentos
+    idênticos em URLs diferentes ocupam espaço uma só vez) e cada URL
+    normalizada aponta para o hash, com tamanho e data da busca. Quando o cache
+    ultrapassa `tamanho_max_mb`, os documentos acessados há mais tempo são
+    removidos.
+
+    Args:
+        caminho: Arquivo SQLite do cache
+        tamanho_max_mb: Tamanho máximo dos textos armazenados, em MB (None: sem limite)
+    """
+
+    def __init__(self, caminho: str = CACHE_DOCUMENTOS, tamanho_max_mb: float = CACHE_TAMANHO_MAX_MB):
+        self.caminho = caminho
+        self.tamanho_max = tamanho_max_mb * 1024 * 1024 if tamanho_max_mb else None
+        self._conexao = None
+        self._lock = threading.Lock()
+        self._tamanho_total = 0
+        self.acertos = 0
+        self.falhas = 0
+        self.removidos = 0
+
+    def _conectar(self) -> sqlite3.Connection:
+        # A conexão é aberta no primeiro uso, para que importar o módulo não crie o arquivo
+        if self._conexao is None:
+            self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+            self._conexao.execute('PRAGMA journal_mode=WAL')
+            self._conexao.executescript('''
+                CREATE TABLE IF NOT EXISTS conteudos (
+                    hash TEXT PRIMARY KEY,
+                    texto TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS documentos (
+                    url TEXT PRIMARY KEY,
+                    hash TEXT NOT NULL,
+                    tamanho_bytes INTEGER NOT NULL,
+                    buscado_em TEXT NOT NULL,
+                    acessado_em REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_documentos_acesso ON documentos(acessado_em);
+            ''')
+            self._tamanho_total = self._conexao.execute(
+                'SELECT COALESCE(SUM(tamanho), 0) FROM conteudos').fetchone()[0]
+        return self._conexao
+
+    def obter(self, url: str):
+        """Retorna o texto do documento, ou None se ele não está no cache."""
+        chave = normalizar_url(url)
+        with self._lock:
+            conexao = self._conectar()
+            linha = conexao.execute(
+                'SELECT c.texto FROM documentos d JOIN conteudos c ON c.hash = d.hash WHERE d.url = ?',
+                (chave,)).fetchone()
+            if linha is None:
+                self.falhas += 1
+                return None
+            with conexao:
+                conexao.execute('UPDATE documentos SET acessado_em = ? WHERE url = ?',
+                                (time.time(), chave))
+            self.acertos += 1
+            return linha[0]
+
+    def gravar(self, url: str, texto: str, hash_conteudo: str, tamanho_bytes: int):
+        """Armazena o texto extraído do documento.
+
+        Args:
+            url: URL do documento
+            texto: Texto extraído
+            hash_conteudo: SHA-256 do conteúdo baixado
+            tamanho_bytes: Tamanho do conteúdo baixado
+        """
+        with self._lock:
+            conexao = self._conectar()
+            with conexao:
+                inserido = conexao.execute(
+                    'INSERT OR IGNORE INTO conteudos (hash, texto, tamanho) VALUES (?, ?, ?)',
+                    (hash_conteudo, texto, len(texto.encode('utf-8')))).rowcount
+                conexao.execute(
+                    'INSERT OR REPLACE INTO documentos (url, hash, tamanho_bytes, buscado_em, acessado_em) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (normalizar_url(url), hash_conteudo, tamanho_bytes,
+                     datetime.now().isoformat(timespec='seconds'), time.time()))
+            if inserido:
+                self._tamanho_total += len(texto.encode('utf-8'))
+            if self.tamanho_max is not None and self._tamanho_total > self.tamanho_max:
+                self._despejar(conexao)
+
+    def _despejar(self, conexao: sqlite3.Connection):
+        """Remove os documentos menos acessados até o cache voltar a 90% do limite."""
+        while self._tamanho_total > self.tamanho_max * 0.9:
+            urls = conexao.execute(
+                'SELECT url FROM documentos ORDER BY acessado_em LIMIT 100').fetchall()
+            if not urls:
+                break
+            with conexao:
+                conexao.executemany('DELETE FROM documentos WHERE url = ?', urls)
+                conexao.execute('DELETE FROM conteudos WHERE hash NOT IN (SELECT hash FROM documentos)')
+            self.removidos += len(urls)
+            self._tamanho_total = conexao.execute(
+                'SELECT COALESCE(SUM(tamanho), 0) FROM conteudos').fetchone()[0]
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {'acertos': self.acertos,
+                    'falhas': self.falhas,
+                    'removidos': self.removidos,
+                    'tamanho_mb': round(self._tamanho_total / 1024 / 1024, 1)}
+
+    def fechar(self):
+        with self._lock:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
+
+
+# Cache de documentos compartilhado entre os trabalhadores
+cache_documentos = CacheDocumentos()
+
+
+class TextosDocumentos:
+    """Repositório, em SQLite, dos textos dos documentos vinculados aos andamentos.
+
+    Os andamentos guardam apenas o `documento_id`, o SHA-256 do
+    texto, em vez do texto completo, e cada texto é armazenado uma única vez,
+    mesmo que apareça em vários andamentos ou processos. Diferente do cache de
+    documentos, nada é removido: este arquivo acompanha os dados extraídos.
+
+    Os valores especiais 'NA' (andamento sem documento) e 'Exception' (falha no
+    download) são usados diretamente como `documento_id`.
+
+    Args:
+        caminho: Arquivo SQLite dos textos
+    """
+
+    def __init__(self, caminho: str = TEXTOS_DOCUMENTOS):
+        self.caminho = caminho
+        self._conexao = None
+        self._lock = threading.Lock()
+
+    def _conectar(self) -> sqlite3.Connection:
+        # A conexão é aberta no primeiro uso, para que importar o módulo não crie o arquivo
+        if self._conexao is None:
+            self._conexao = sqlite3.connect(self.caminho, check_same_thread=False)
+            self._conexao.execute('PRAGMA journal_mode=WAL')
+            self._conexao.execute('''
+                CREATE TABLE IF NOT EXISTS textos (
+                    documento_id TEXT PRIMARY KEY,
+                    texto TEXT NOT NULL,
+                    tamanho INTEGER NOT NULL,
+                    url TEXT
+                )
+            ''')
+        return self._conexao
+
+    def gravar(self, texto: str, url: str = None) -> str:
+        """Armazena o texto, se ainda não existir, e retorna seu documento_id.
+
+        Args:
+            texto: Texto extraído do documento
+            url: URL do documento (registrada na primeira vez que o texto aparece)
+        """
+        if texto in ('NA', 'Exception'):
+            return texto
+        documento_id = hashlib.sha256(texto.encode('utf-8')).hexdigest()
+        with self._lock:
+            conexao = self._conectar()
+            with conexao:
+                conexao.execute(
+                    'INSERT OR IGNORE INTO textos (documento_id, texto, tamanho, url) VALUES (?, ?, ?, ?)',
+                    (documento_id, texto, len(texto.encode('utf-8')), url))
+        return documento_id
+
+    def obter(self, documento_id: str):
+        """Retorna o texto do documento, ou None se o documento_id não existe."""
+        if documento_id in ('NA', 'Exception'):
+            return documento_id
+        with self._lock:
+            linha = self._conectar().execute(
+                'SELECT texto FROM textos WHERE documento_id = ?', (documento_id,)).fetchone()
+        return linha[0] if linha else None
+
+    def obter_com_url(self, documento_id: str):
+        """Retorna (texto, url) do documento, ou None se o documento_id não existe."""
+        with self._lock:
+            return self._conectar().execute(
+                'SELECT texto, url FROM textos WHERE documento_id = ?', (documento_id,)).fetchone()
+
+    def fechar(self):
+        with self._lock:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
+
+
+# Textos dos documentos compartilhados entre os trabalhadores
+textos_documentos = TextosDocumentos()
+
+
+def separar_textos(andamentos: list) -> list:
+    """Move o texto inline (link_conteúdo) de andamentos antigos para o repositório de textos.
+
+    Andamentos gravados antes da separação trazem o texto completo em
+    `link_conteúdo`; ele é substituído pelo `documento_id` correspondente.
+    """
+    for andamento in andamentos:
+        if 'link_conteúdo' in andamento:
+            andamento['documento_id'] = textos_documentos.gravar(
+                andamento.pop('link_conteúdo'), andamento.get('link'))
+    return andamentos
+
+
+class DocumentoLentoError(Exception):
+    """Extração do texto de um documento excedeu o tempo de CPU permitido"""
+    pass
+
+
+def _interromper_documento(signum, frame):
+    raise DocumentoLentoError('limite de tempo de CPU do documento excedido')
+
+
+class PoolExtracaoEncerradoError(Exception):
+    """O pool de extração foi encerrado antes de o documento terminar"""
+    pass
+
+
+def _iniciar_processo_extracao():
+    """Inicializa um processo do pool de extração: SIGXCPU interrompe o documento atual."""
+    if resource is not None:
+        signal.signal(signal.SIGXCPU, _interromper_documento)
+
+
+@contextmanager
+def _limite_cpu(segundos: float):
+    """Limita o tempo de CPU do processo atual durante o bloco (RLIMIT_CPU).
+
+    O limite vale a partir do início do bloco, e não do envio do documento ao
+    pool. Ao atingi-lo, o kernel envia SIGXCPU, que interrompe inclusive uma
+    única página travada dentro do pdfplumber com DocumentoLentoError.
+    """
+    if resource is None:
+        yield
+        return
+    flexivel, rigido = resource.getrlimit(resource.RLIMIT_CPU)
+    uso = resource.getrusage(resource.RUSAGE_SELF)
+    limite = math.ceil(uso.ru_utime + uso.ru_stime + segundos)
+    if flexivel != resource.RLIM_INFINITY:
+        limite = min(limite, flexivel)
+    resource.setrlimit(resource.RLIMIT_CPU, (limite, rigido))
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_CPU, (flexivel, rigido))
+
+
+def _extrair_texto_pdf(bruto: bytes, limite_cpu: float) -> tuple:
+    """Extrai o texto de um PDF, página a página (executada em processo separado).
+
+    O texto de cada página é acumulado em uma lista e unido uma única vez.
+    Páginas sem texto (ex.: imagens digitalizadas) contribuem com uma linha vazia.
+
+    Args:
+        bruto: Conteúdo do PDF
+        limite_cpu: Tempo máximo de CPU, em segundos, para o documento
+
+    Returns:
+        tuple: (texto, número de páginas, segundos de CPU)
+
+    Raises:
+        DocumentoLentoError: Se o limite de CPU for excedido
+    """
+    inicio = time.process_time()
+    paginas = []
+    with _limite_cpu(limite_cpu), pdfplumber.open(BytesIO(bruto)) as pdf:
+        for pagina in pdf.pages:
+            paginas.append((pagina.extract_text() or '') + '\n')
+            if time.process_time() - inicio > limite_cpu:
+                raise DocumentoLentoError(
+                    f'PDF interrompido após {len(paginas)} de {len(pdf.pages)} páginas')
+    return ''.join(paginas), len(paginas), time.process_time() - inicio
+
+
+def _extrair_texto_rtf(texto_rtf: str, limite_cpu: float) -> tuple:
+    """Converte um RTF em texto (executada em processo separado).
+
+    Returns:
+        tuple: (texto, número de páginas (0), segundos de CPU)
+    """
+    inicio = time.process_time()
+    with _limite_cpu(limite_cpu):
+        texto = rtf_to_text(texto_rtf)
+    return texto, 0, time.process_time() - inicio
+
+
+class ExtratorDocumentos:
+    """Pool de processos para a extração de texto de PDFs e RTFs.
+
+    A análise de PDFs com o pdfplumber consome CPU e, nas threads de download,
+    disputaria o GIL com o restante da extração. Cada documento é analisado em
+    um processo separado, com limite de tempo de CPU aplicado no próprio
+    processo (RLIMIT_CPU) a partir do início da análise.
+
+    Os documentos só são enviados ao pool quando há um processo livre, de modo
+    que o tempo de espera não conta para o limite. Se ainda assim um documento
+    não terminar a tempo (ex.: travado em código C, que não recebe o sinal, ou
+    processo encerrado por falta de memória), o pool é encerrado com
+    `terminate()` e recriado no próximo uso, para que o processo travado não
+    ocupe uma vaga indefinidamente. Os documentos em análise nos demais
+    processos falham com PoolExtracaoEncerradoError e são tentados de novo.
+
+    Args:
+        processos: Número de processos de extração
+        limite_cpu: Tempo máximo de CPU por documento, em segundos
+    """
+
+    def __init__(self, processos: int = PROCESSOS_EXTRACAO, limite_cpu: float = TEMPO_CPU_MAX_DOCUMENTO):
+        self.processos = processos
+        self.limite_cpu = limite_cpu
+        self._pool = None
+        self._pendentes = {}  # Documentos em análise: evento de conclusão -> pool
+        self._lock = threading.Lock()
+        self._vagas = threading.BoundedSemaphore(processos)
+        self.documentos = 0
+        self.paginas = 0
+        self.segundos_cpu = 0.0
+        self.interrompidos = 0
+
+    def _descartar_pool(self, pool):
+        """Encerra os processos do pool e libera os documentos em análise nele."""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+            pendentes = [concluido for concluido, pool_pendente in self._pendentes.items() if pool_pendente is pool]
+            for concluido in pendentes:
+                del self._pendentes[concluido]
+        pool.terminate()
+        for concluido in pendentes:
+            concluido.set()
+
+    def _executar(self, funcao, conteudo) -> str:
+        # Aguarda um processo livre antes de enviar, para que o prazo comece com a análise
+        with self._vagas:
+            concluido = threading.Event()
+            with self._lock:
+                # O pool é criado no primeiro uso, para que importar o módulo não inicie processos
+                if self._pool is None:
+                    self._pool = multiprocessing.Pool(self.processos, initializer=_iniciar_processo_extracao)
+                pool = self._pool
+                resultado = pool.apply_async(funcao, (conteudo, self.limite_cpu),
+                                             callback=lambda _: concluido.set(),
+                                             error_callback=lambda _: concluido.set())
+                self._pendentes[concluido] = pool
+
+            # Margem sobre o limite de CPU para a inicialização do processo e a disputa pela CPU
+            no_prazo = concluido.wait(self.limite_cpu * 3)
+            with self._lock:
+                descartado = self._pendentes.pop(concluido, None) is None
+            if descartado and not resultado.ready():
+                raise PoolExtracaoEncerradoError('pool de extração encerrado durante a análise do documento')
+            if not no_prazo:
+                # O processo não respondeu ao limite de CPU: é encerrado junto com o pool
+                with self._lock:
+                    self.interrompidos += 1
+                self._descartar_pool(pool)
+                raise DocumentoLentoError('processo de extração não respondeu ao limite de tempo de CPU')
+            try:
+                texto, paginas, segundos = resultado.get()
+            except DocumentoLentoError:
+                with self._lock:
+                    self.interrompidos += 1
+                raise
+
+        with self._lock:
+            self.documentos += 1
+            self.paginas += paginas
+            self.segundos_cpu += segundos
+        return texto
+
+    def extrair_pdf(self, bruto: bytes) -> str:
+        """Retorna o texto do PDF."""
+        return self._executar(_extrair_texto_pdf, bruto)
+
+    def extrair_rtf(self, texto_rtf: str) -> str:
+        """Retorna o texto do RTF."""
+        return self._executar(_extrair_texto_rtf, texto_rtf)
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {'documentos': self.documentos,
+                    'paginas': self.paginas,
+                    'paginas_por_segundo': round(self.paginas / self.segundos_cpu, 1) if self.segundos_cpu else 0.0,
+                    'interrompidos': self.interrompidos}
+
+    def encerrar(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+
+# Extração de texto de documentos, compartilhada entre os trabalhadores
+extrator_documentos = ExtratorDocumentos()
+
+
 @retry(
     stop=stop_after_attempt(2),  # Apenas 2 tentativas para downloads
     wait=wait_exponential(multiplier=1, min=5, max=10),
-    retry=retry_if_exception_type((Exception,)),
-    before_sleep=before_sleep_log(logger, logging.DEBUG)
+    # Documentos que excedem o tempo de CPU não são baixados de novo
+    retry=retry_if_not_exception_type(DocumentoLentoError),
+    reraise=True,
+    before_sleep=_antes_de_esperar(logging.DEBUG)
 )
+def _baixar_e_extrair(url: str) -> tuple:
+    """Baixa o documento e extrai seu conteúdo (PDF/RTF/HTML) com retry.
+
+    Returns:
+        tuple: (texto, SHA-256 do conteúdo baixado, tamanho em bytes)
+
+    Raises:
+        STFAccessError: Se o bloqueio (403, CAPTCHA, 502) persistir após as tentativas
+    """
+    disjuntor.aguardar()
+    limitador.aguardar()
+    inicio = time.monotonic()
+    if '.pdf' in url or 'RTF' in url:
+        response = dsd.get_response(url_acesso(url))
+        bruto = response.content
+        tipo_conteudo = response.headers.get('Content-Type', 'application/octet-stream')
+        status = response.status_code
+        texto_resposta = response.text if 'html' in tipo_conteudo else ''
+    else:
+        conteudo = dsd.get(url_acesso(url))
+        bruto = conteudo.encode('utf-8')
+        tipo_conteudo = 'text/html; charset=utf-8'
+        status = 200
+        texto_resposta = conteudo
+    duracao = time.monotonic() - inicio
+
+    # Bloqueios nos documentos contam para o limitador e o disjuntor, como nas páginas
+    motivo = (f'{status} retornado por {url}' if status in (403, 502) else
+              next((mensagem for marca, mensagem in _MARCAS_BLOQUEIO if marca in texto_resposta), None))
+    if motivo is not None:
+        limitador.registrar_bloqueio(motivo)
+        disjuntor.registrar_bloqueio()
+        raise STFAccessError(motivo)
+    gravador.gravar(url, bruto, tipo_conteudo)
+    limitador.registrar_resposta(duracao)
+    disjuntor.registrar_sucesso()
+    medidor.registrar_etapa('download', duracao)
+    medidor.somar('bytes_baixados', len(bruto))
+
+    if '.pdf' in url:
+        with medidor.etapa('extracao_texto'):
+            conteudo = extrator_documentos.extrair_pdf(bruto)
+    elif 'RTF' in url:
+        with medidor.etapa('extracao_texto'):
+            conteudo = extrator_documentos.extrair_rtf(response.text)
+
+    medidor.gravar({'tipo': 'documento', 'url': url, 'bytes': len(bruto), 'download': round(duracao, 3)})
+    return conteudo, hashlib.sha256(bruto).hexdigest(), len(bruto)
+
+
 def baixar_documento(url: str) -> str:
-    """Baixa e extrai conteúdo de documento (PDF/RTF/HTML) com retry.
+    """Retorna o conteúdo de um documento (PDF/RTF/HTML), consultando antes o cache.
 
     Args:
         url: URL do documento
 
     Returns:
-        str: Conteúdo extraído do documento ou 'Exception' em caso de falha
+        str: Conteúdo extraído do documento
+
+    Raises:
+        Exception: Se o download falhar após as tentativas
     """
     if url == 'NA':
         return 'NA'
 
-    try:
-        if '.pdf' in url:
-            response = dsd.get_response(url)
-            file_like = BytesIO(response.content)
-            conteudo = ""
-            with pdfplumber.open(file_like) as pdf:
-                for pagina in pdf.pages:
-                    conteudo += pagina.extract_text() + "\n"
+    if USAR_CACHE_DOCUMENTOS:
+        conteudo = cache_documentos.obter(url)
+        if conteudo is not None:
             return conteudo
 
-        elif 'RTF' in url:
-            response = dsd.get_response(url)
-            return rtf_to_text(response.text)
+    conteudo, hash_conteudo, tamanho = _baixar_e_extrair(url)
+    if USAR_CACHE_DOCUMENTOS:
+        cache_documentos.gravar(url, conteudo, hash_conteudo, tamanho)
+    return conteudo
 
-        else:
-            return dsd.get(url)
 
-    except Exception:
-        raise
+# Backends de obtenção da página do processo. Todos retornam o HTML completo
+# da página, de modo que o restante da extração não depende do backend usado.
+
+# Marcas de bloqueio do portal, tratadas como STFAccessError
+_MARCAS_BLOQUEIO = (('403 Forbidden', '403 Forbidden detectado'),
+                    ('CAPTCHA', 'CAPTCHA detectado'),
+                    ('502 Bad Gateway', '502 Bad Gateway detectado'))
+
+# Abas carregadas pela página do processo depois do carregamento inicial.
+# Cada aba é inserida na página dentro do elemento que o parser procura.
+_ABAS_PROCESSO = (('abaPartes.asp', None, None),
+                  ('abaInformacoes.asp', 'id="informacoes-completas"', '<div id="informacoes-completas">'),
+                  ('abaAndamentos.asp', 'processo-andamentos', '<div class="processo-andamentos">'),
+                  ('abaDeslocamentos.asp', 'id="deslocamentos"', '<div id="deslocamentos">'))
+
+
+def inserir_abas(page: str, fragmentos: list) -> str:
+    """Insere na página principal os fragmentos das abas, na ordem de _ABAS_PROCESSO.
+
+    Cada fragmento é envolvido no elemento que o parser procura, se ainda não o contiver.
+    """
+    abas = []
+    for (_, marca, envoltorio), fragmento in zip(_ABAS_PROCESSO, fragmentos):
+        if marca is not None and marca not in fragmento:
+            fragmento = f'{envoltorio}{fragmento}</div>'
+        abas.append(fragmento)
+
+    fim_corpo = page.rfind('</body>')
+    if fim_corpo == -1:
+        fim_corpo = len(page)
+    return page[:fim_corpo] + ''.join(abas) + page[fim_corpo:]
+
+
+CABECALHOS_HTTP = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "pt-BR,pt;q=0.9",
+    "Referer": "https://portal.stf.jus.br/",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/137.0.0.0 Safari/537.36",
+}
+
+
+class BackendSelenium:
+    """Obtém a página do processo pelo Chrome headless, usando o pool de drivers."""
+
+    nome = 'selenium'
+    requisicoes_por_pagina = 1
+
+    def __init__(self, pool: PoolDrivers):
+        self.pool = pool
+
+    def obter_pagina(self, url: str) -> str:
+        """Retorna o page_source da página do processo.
+
+        Raises:
+            STFAccessError: Se detectar CAPTCHA, 403 ou 502 após as tentativas
+            WebDriverException: Erros do Selenium
+        """
+        driver, page = criar_driver_e_navegar(url, self.pool)
+        self.pool.devolver(driver)
+        return page
+
+    def estatisticas(self) -> dict:
+        return {'backend': self.nome, **self.pool.estatisticas()}
+
+    def encerrar(self):
+        self.pool.encerrar()
+
+
+class BackendHTTP:
+    """Obtém a página do processo e suas abas por HTTP, sem abrir o navegador.
+
+    A página principal e os fragmentos de partes, informações, andamentos e
+    deslocamentos são buscados por uma sessão HTTP com conexões reutilizadas
+    e montados em um único HTML, no formato esperado por parsear_processo().
+    O navegador (criar_driver_e_navegar) só é usado quando o portal responde
+    com CAPTCHA, 403 ou 502.
+
+    Args:
+        pool: Pool de drivers usado no fallback para o navegador
+        conexoes: Número de conexões HTTP mantidas abertas
+    """
+
+    nome = 'http'
+    requisicoes_por_pagina = 1 + len(_ABAS_PROCESSO)
+
+    def __init__(self, pool: PoolDrivers, conexoes: int = NUM_TRABALHADORES):
+        self.pool = pool
+        self.sessao = requests.Session()
+        self.sessao.headers.update(CABECALHOS_HTTP)
+        self.sessao.verify = False
+        adaptador = requests.adapters.HTTPAdapter(pool_connections=conexoes,
+                                                  pool_maxsize=conexoes)
+        self.sessao.mount('https://', adaptador)
+        self.sessao.mount('http://', adaptador)
+        self._lock = threading.Lock()
+        self.paginas_http = 0
+        self.fallbacks = 0
+
+    @retry(
+        stop=stop_after_attempt(MAX_RETRIES),
+        wait=wait_exponential(multiplier=BACKOFF_MULTIPLIER, min=BACKOFF_MIN, max=BACKOFF_MAX),
+        retry=retry_if_exception_type((requests.ConnectionError, requests.Timeout)),
+        reraise=True,
+        before_sleep=_antes_de_esperar(logging.INFO)
+    )
+    def _get(self, url: str) -> requests.Response:
+        disjuntor.aguardar()
+        limitador.aguardar()
+        try:
+            with medidor.etapa('http'):
+                resposta = self.sessao.get(url_acesso(url), timeout=TIMEOUT)
+        except requests.Timeout:
+            limitador.registrar_bloqueio(f'timeout em {url}')
+            raise
+        resposta.encoding = 'utf-8'
+        if resposta.status_code in (403, 502):
+            limitador.registrar_bloqueio(f'{resposta.status_code} retornado por {url}')
+            disjuntor.registrar_bloqueio()
+            raise STFAccessError(f'{resposta.status_code} retornado por {url}')
+        for marca, mensagem in _MARCAS_BLOQUEIO:
+            if marca in resposta.text:
+                limitador.registrar_bloqueio(mensagem)
+                disjuntor.registrar_bloqueio()
+                raise STFAccessError(mensagem)
+        resposta.raise_for_status()
+        limitador.registrar_resposta(resposta.elapsed.total_seconds())
+        disjuntor.registrar_sucesso()
+        gravador.gravar(url, resposta.content, resposta.headers.get('Content-Type', 'text/html; charset=utf-8'))
+        return resposta
+
+    def _montar_pagina(self, url: str) -> str:
+        resposta = self._get(url)
+        page = resposta.text
+
+        incidente = re.search(r'id="incidente"[^>]*value="(\d+)"', page)
+        if incidente is None:
+            incidente = re.search(r'incidente=(\d+)', resposta.url)
+        if incidente is None:
+            # Sem incidente não há abas: processo não encontrado
+            return page
+
+        base = resposta.url.rsplit('/', 1)[0]
+        return inserir_abas(page, [self._get(f'{base}/{aba}?incidente={incidente.group(1)}').text
+                                   for aba, _, _ in _ABAS_PROCESSO])
+
+    def obter_pagina(self, url: str) -> str:
+        """Retorna o HTML da página do processo com as abas já inseridas.
+
+        Raises:
+            STFAccessError: Se o bloqueio persistir também no navegador
+            WebDriverException: Erros do Selenium no fallback
+        """
+        try:
+            page = self._montar_pagina(url)
+        except STFAccessError as e:
+            logger.info(f'{e} - usando o navegador para {url}')
+            with self._lock:
+                self.fallbacks += 1
+            driver, page = criar_driver_e_navegar(url, self.pool)
+            self.pool.devolver(driver)
+            return page
+
+        with self._lock:
+            self.paginas_http += 1
+        return page
+
+    def estatisticas(self) -> dict:
+        with self._lock:
+            return {'backend': self.nome,
+                    'paginas_http': self.paginas_http,
+                    'fallbacks': self.fallbacks,
+                    **self.pool.estatisticas()}
+
+    def encerrar(self):
+        self.sessao.close()
+        self.pool.encerrar()
+
+
+BACKENDS = {'selenium': BackendSelenium,
+            'http': BackendHTTP}
+
+
+class DownloaderDocumentos:
+    """Fila limitada de downloads de documentos, atendida por um pool de threads.
+
+    Os documentos de um processo são agendados assim que a página é analisada
+    e baixados em paralelo, de modo que o tempo do processo passa a ser o do
+    documento mais lento, e não a soma de todos. Quando a fila está cheia,
+    agendar() bloqueia até que algum download termine.
+
+    Args:
+        simultaneos: Número de downloads em paralelo
+        tamanho_fila: Número máximo de documentos pendentes
+    """
+
+    def __init__(self, simultaneos: int = DOWNLOADS_SIMULTANEOS, tamanho_fila: int = FILA_DOCUMENTOS):
+        self._executor = ThreadPoolExecutor(max_workers=simultaneos,
+                                            thread_name_prefix='download')
+        self._vagas = threading.BoundedSemaphore(tamanho_fila)
+
+    def _baixar(self, url: str, ao_concluir=None):
+        # Usa função com retry automático (tenacity)
+        try:
+            conteudo = baixar_documento(url)
+        except Exception:
+            conteudo = 'Exception'
+        return ao_concluir(url, conteudo) if ao_concluir is not None else conteudo
+
+    def agendar(self, url: str, ao_concluir=None):
+        """Agenda o download do documento e retorna um Future com seu conteúdo.
+
+        Args:
+            url: URL do documento
+            ao_concluir: Função opcional (url, conteudo) executada na thread do
+                download assim que ele termina; o Future retorna o seu resultado
+        """
+        self._vagas.acquire()
+        try:
+            futuro = self._executor.submit(self._baixar, url, ao_concluir)
+        except Exception:
+            self._vagas.release()
+            raise
+        futuro.add_done_callback(lambda _: self._vagas.release())
+        return futuro
+
+    def encerrar(self):
+        self._executor.shutdown(wait=True)
+
+
+# Downloads de documentos, compartilhados entre os trabalhadores
+downloader = DownloaderDocumentos()
+
+
+def _trabalhador_ativo(trabalhador: str) -> bool:
+    """Indica se o trabalhador de uma reivindicação pode estar em execução.
+
+    Apenas trabalhadores desta máquina são verificados (pelo pid); os de outras
+    máquinas são considerados ativos até o fim do prazo de reivindicação.
+    """
+    maquina, _, resto = (trabalhador or '').partition(':')
+    pid = resto.split(':', 1)[0]
+    if maquina != socket.gethostname() or not pid.isdigit():
+        return True
+    if int(pid) == os.getpid():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _status_abandonado(classe: str, numero: int, tentativas: int):
+    """Status de um processo deixado em 'processando', segundo os arquivos parciais (None: nunca extraído)."""
+    if os.path.exists(f'baixados/{classe}{numero}_partial.csv'):
+        return 'baixado'
+    if os.path.exists(f'temp/{classe}{numero}_partial.csv'):
+        return 'em_andamento'
+    return 'erro_acesso' if tentativas else None
+
+
+class RegistroProcessos:
+    """Registro transacional, em SQLite, da situação de cada processo.
+
+    Substitui os arquivos marcadores de baixados/, temp/ e nao_encontrados/
+    como fonte da retomada: cada (classe, numero) tem uma linha com status,
+    número de tentativas, último erro, data da última busca e hash do conteúdo
+    gravado. Falhas de acesso não se confundem com processos inexistentes: só
+    o número de tentativas e o último erro são registrados, e o status anterior
+    é mantido; processos que nunca foram extraídos ficam como 'erro_acesso'.
+    Os arquivos parciais de baixados/ e temp/ continuam guardando os dados.
+
+    Processos deixados em 'processando' por um trabalhador interrompido desta
+    máquina (processo inexistente) são retomados sem esperar o prazo, e seu
+    status é restaurado a partir dos arquivos parciais.
+
+    Durante a extração, cada documento concluído do processo também é
+    registrado, de modo que uma extração interrompida retoma apenas os
+    documentos que faltavam. Esses registros são apagados ao concluir o processo.
+
+    Status possíveis: 'processando', 'baixado', 'em_andamento',
+    'nao_encontrado' e 'erro_acesso'.
+
+    Args:
+        caminho: Arquivo SQLite do registro
+        prazo_reivindicacao: Segundos após os quais um processo em
+            'processando' (ex.: trabalhador interrompido) pode ser reivindicado de novo
+    """
+
+    # Processos que não precisam ser buscados de novo
+    STATUS_CONCLUIDOS = ('baixado', 'nao_encontrado')
+
+    def __init__(self, caminho: str = REGISTRO_PROCESSOS, prazo_reivindicacao: float = PRAZO_REIVINDICACAO):
+        self.caminho = caminho
+        self.prazo_reivindicacao = prazo_reivindicacao
+        self._conexao = None
+        self._lock = threading.Lock()
+
+    def _conectar(self) -> sqlite3.Connection:
+        # A conexão é aberta no primeiro uso, para que importar o módulo não crie o arquivo
+        if self._conexao is None:
+            # isolation_level=None: as transações são abertas explicitamente com BEGIN IMMEDIATE
+            self._conexao = sqlite3.connect(self.caminho, check_same_thread=False,
+                                            isolation_level=None, timeout=30)
+            self._conexao.execute('PRAGMA journal_mode=WAL')
+            self._conexao.executescript('''
+                CREATE TABLE IF NOT EXISTS processos (
+                    classe TEXT NOT NULL,
+                    numero INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    ultimo_erro TEXT,
+                    ultima_busca TEXT,
+                    hash_conteudo TEXT,
+                    trabalhador TEXT,
+                    reivindicado_em REAL,
+                    PRIMARY KEY (classe, numero)
+                );
+                CREATE INDEX IF NOT EXISTS idx_processos_status ON processos(classe, status);
+                CREATE TABLE IF NOT EXISTS consolidacao (
+                    arquivo TEXT NOT NULL,
+                    classe TEXT NOT NULL,
+                    numero INTEGER NOT NULL,
+                    hash_conteudo TEXT NOT NULL,
+                    PRIMARY KEY (arquivo, classe, numero)
+                );
+                CREATE TABLE IF NOT EXISTS arquivos_consolidados (
+                    arquivo TEXT PRIMARY KEY,
+                    tamanho INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS documentos_processo (
+                    classe TEXT NOT NULL,
+                    numero INTEGER NOT NULL,
+                    link TEXT NOT NULL,
+                    documento_id TEXT NOT NULL,
+                    PRIMARY KEY (classe, numero, link)
+                );
+            ''')
+        return self._conexao
+
+    def migrar_marcadores(self):
+        """Importa a situação registrada nas pastas baixados/, temp/ e nao_encontrados/.
+
+        Processos já presentes no registro não são alterados.
+        """
+        pastas = (('baixados', 'baixado'), ('temp', 'em_andamento'),
+                  ('nao_encontrados', 'nao_encontrado'))
+        linhas = []
+        for pasta, status in pastas:
+            if not os.path.isdir(pasta):
+                continue
+            for arquivo in os.listdir(pasta):
+                match = re.fullmatch(r'([A-Za-z]+)(\d+)_partial\.csv', arquivo)
+                if match:
+                    linhas.append((match.group(1), int(match.group(2)), status))
+
+        with self._lock:
+            conexao = self._conectar()
+            conexao.execute('BEGIN IMMEDIATE')
+            antes = conexao.total_changes
+            conexao.executemany(
+                'INSERT OR IGNORE INTO processos (classe, numero, status) VALUES (?, ?, ?)', linhas)
+            importados = conexao.total_changes - antes
+            conexao.execute('COMMIT')
+        if importados:
+            print(f'Registro de processos: {importados} processo(s) importado(s) das pastas de marcadores')
+
+    def reivindicar(self, classe: str, numero: int, trabalhador: str) -> tuple:
+        """Reivindica atomicamente um processo para extração.
+
+        Returns:
+            tuple: (reivindicado, status anterior). O processo não é reivindicado
+            se já foi concluído ou se outro trabalhador o está processando.
+        """
+        agora = time.time()
+        with self._lock:
+            conexao = self._conectar()
+            conexao.execute('BEGIN IMMEDIATE')
+            try:
+                linha = conexao.execute(
+                    'SELECT status, reivindicado_em, trabalhador, tentativas FROM processos '
+                    'WHERE classe = ? AND numero = ?', (classe, numero)).fetchone()
+                status = linha[0] if linha else None
+                if status == 'processando':
+                    if agora - (linha[1] or 0) < self.prazo_reivindicacao and _trabalhador_ativo(linha[2]):
+                        conexao.execute('COMMIT')
+                        return False, status
+                    # Trabalhador interrompido: o status anterior é restaurado pelos arquivos parciais
+                    status = _status_abandonado(classe, numero, linha[3])
+                    if status in self.STATUS_CONCLUIDOS:
+                        conexao.execute(
+                            'UPDATE processos SET status = ?, trabalhador = NULL, reivindicado_em = NULL '
+                            'WHERE classe = ? AND numero = ?', (status, classe, numero))
+                if status in self.STATUS_CONCLUIDOS:
+                    conexao.execute('COMMIT')
+                    return False, status
+
+                conexao.execute(
+                    'INSERT INTO processos (classe, numero, status, trabalhador, reivindicado_em) '
+                    "VALUES (?, ?, 'processando', ?, ?) "
+                    "ON CONFLICT (classe, numero) DO UPDATE SET status = 'processando', "
+                    'trabalhador = excluded.trabalhador, reivindicado_em = excluded.reivindicado_em',
+                    (classe, numero, trabalhador, agora))
+                conexao.execute('COMMIT')
+            except Exception:
+                conexao.execute('ROLLBACK')
+                raise
+        return True, status
+
+    def concluir(self, classe: str, numero: int, status: str, hash_conteudo: str = None):
+        """Registra o resultado de uma extração bem-sucedida.
+
+        Args:
+            status: 'baixado', 'em_andamento' ou 'nao_encontrado'
+            hash_conteudo: SHA-256 da linha gravada
+        """
+        with self._lock:
+            conexao = self._conectar()
+            conexao.execute('BEGIN IMMEDIATE')
+            try:
+                conexao.execute(
+                    'UPDATE processos SET status = ?, tentativas = tentativas + 1, ultimo_erro = NULL, '
+                    'ultima_busca = ?, hash_conteudo = ?, trabalhador = NULL, reivindicado_em = NULL '
+                    'WHERE classe = ? AND numero = ?',
+                    (status, datetime.now().isoformat(timespec='seconds'), hash_conteudo, classe, numero))
+                conexao.execute('DELETE FROM documentos_processo WHERE classe = ? AND numero = ?',
+                                (classe, numero))
+                conexao.execute('COMMIT')
+            except Exception:
+                conexao.execute('ROLLBACK')
+                raise
+
+    def registrar_documento(self, classe: str, numero: int, link: str, documento_id: str):
+        """Registra um documento concluído durante a extração do processo."""
+        with self._lock:
+            self._conectar().execute(
+                'INSERT OR REPLACE INTO documentos_processo (classe, numero, link, documento_id) '
+                'VALUES (?, ?, ?, ?)', (classe, numero, link, documento_id))
+
+    def documentos_concluidos(self, classe: str, numero: int) -> dict:
+        """Documentos concluídos em uma extração interrompida do processo: link -> documento_id."""
+        with self._lock:
+            return dict(self._conectar().execute(
+                'SELECT link, documento_id FROM documentos_processo WHERE classe = ? AND numero = ?',
+                (classe, numero)).fetchall())
+
+    def registrar_erro(self, classe: str, numero: int, erro: str, status_anterior: str = None):
+        """Registra uma falha de acesso, que não marca o processo como inexistente.
+
+        Processos já extraídos mantêm o status anterior ('baixado' ou
+        'em_andamento'), para continuarem na consolidação e nas atualizações;
+        os demais ficam como 'erro_acesso'.
+        """
+        status = status_anterior if status_anterior in ('baixado', 'em_andamento') else 'erro_acesso'
+        with self._lock:
+            self._conectar().execute(
+                'UPDATE processos SET status = ?, tentativas = tentativas + 1, '
+                'ultimo_erro = ?, ultima_busca = ?, trabalhador = NULL, reivindicado_em = NULL '
+                'WHERE classe = ? AND numero = ?',
+                (status, erro, datetime.now().isoformat(timespec='seconds'), classe, numero))
+
+    def liberar_abandonados(self):
+        """Restaura os processos deixados em 'processando' por trabalhadores interrompidos desta máquina."""
+        with self._lock:
+            conexao = self._conectar()
+            conexao.execute('BEGIN IMMEDIATE')
+            try:
+                abandonados = [(classe, numero, tentativas) for classe, numero, trabalhador, tentativas
+                               in conexao.execute("SELECT classe, numero, trabalhador, tentativas FROM processos "
+                                                  "WHERE status = 'processando'")
+                               if not _trabalhador_ativo(trabalhador)]
+                for classe, numero, tentativas in abandonados:
+                    status = _status_abandonado(classe, numero, tentativas)
+                    if status is None:
+                        conexao.execute('DELETE FROM processos WHERE classe = ? AND numero = ?', (classe, numero))
+                    else:
+                        conexao.execute(
+                            'UPDATE processos SET status = ?, trabalhador = NULL, reivindicado_em = NULL '
+                            'WHERE classe = ? AND numero = ?', (status, classe, numero))
+                conexao.execute('COMMIT')
+            except Exception:
+                conexao.execute('ROLLBACK')
+                raise
+        if abandonados:
+            print(f'Registro de processos: {len(abandonados)} processo(s) de execuções interrompidas liberado(s)')
+
+    def liberar(self, classe: str, numero: int, status_anterior: str = None):
+        """Desfaz uma reivindicação, restaurando o status anterior do processo."""
+        with self._lock:
+            conexao = self._conectar()
+            if status_anterior is None:
+                conexao.execute('DELETE FROM processos WHERE classe = ? AND numero = ?', (classe, numero))
+            else:
+                conexao.execute(
+                    'UPDATE processos SET status = ?, trabalhador = NULL, reivindicado_em = NULL '
+                    'WHERE classe = ? AND numero = ?', (status_anterior, classe, numero))
+
+    def situacao(self, classe: str, numero: int) -> tuple:
+        """Status e hash do conteúdo registrados do processo, ou (None, None)."""
+        with self._lock:
+            linha = self._conectar().execute(
+                'SELECT status, hash_conteudo FROM processos WHERE classe = ? AND numero = ?',
+                (classe, numero)).fetchone()
+        return tuple(linha) if linha else (None, None)
+
+    def importar(self, classe: str, numero: int, status: str, hash_conteudo: str = None):
+        """Registra um processo extraído em outra máquina (ver importar_fila)."""
+        with self._lock:
+            self._conectar().execute(
+                'INSERT INTO processos (classe, numero, status, tentativas, ultima_busca, hash_conteudo) '
+                'VALUES (?, ?, ?, 1, ?, ?) '
+                'ON CONFLICT (classe, numero) DO UPDATE SET status = excluded.status, '
+                'ultima_busca = excluded.ultima_busca, hash_conteudo = excluded.hash_conteudo, '
+                'ultimo_erro = NULL, trabalhador = NULL, reivindicado_em = NULL',
+                (classe, numero, status, datetime.now().isoformat(timespec='seconds'), hash_conteudo))
+
+    def status(self, classe: str, numero: int):
+        """Status registrado do processo, ou None se ainda não foi buscado."""
+        with self._lock:
+            linha = self._conectar().execute(
+                'SELECT status FROM processos WHERE classe = ? AND numero = ?', (classe, numero)).fetchone()
+        return linha[0] if linha else None
+
+    def maior_numero(self, classe: str):
+        """Maior número de processo da classe já encontrado, ou None."""
+        with self._lock:
+            return self._conectar().execute(
+                "SELECT MAX(numero) FROM processos WHERE classe = ? AND status IN ('baixado', 'em_andamento')",
+                (classe,)).fetchone()[0]
+
+    def listar(self, classe: str, status: str) -> list:
+        """Números dos processos da classe com o status, em ordem crescente."""
+        with self._lock:
+            return [numero for (numero,) in self._conectar().execute(
+                'SELECT numero FROM processos WHERE classe = ? AND status = ? ORDER BY numero',
+                (classe, status))]
+
+    def listar_buscas(self, classe: str, status: str) -> dict:
+        """Processos da classe com o status: numero -> data da última busca (ISO) ou None."""
+        with self._lock:
+            return dict(self._conectar().execute(
+                'SELECT numero, ultima_busca FROM processos WHERE classe = ? AND status = ? ORDER BY numero',
+                (classe, status)))
+
+    def classes(self) -> list:
+        """Classes presentes no registro, em ordem alfabética."""
+        with self._lock:
+            return [classe for (classe,) in self._conectar().execute(
+                'SELECT DISTINCT classe FROM processos ORDER BY classe')]
+
+    def contar(self, classe: str) -> dict:
+        """Número de processos da classe em cada status."""
+        with self._lock:
+            return dict(self._conectar().execute(
+                'SELECT status, COUNT(*) FROM processos WHERE classe = ? GROUP BY status', (classe,)))
+
+    def pendentes_consolidacao(self, arquivo: str, classe: str) -> list:
+        """Processos da classe cujo conteúdo atual ainda não está no arquivo consolidado.
+
+        Returns:
+            list: Tuplas (numero, status, hash_conteudo, ja_consolidado), em ordem de número
+        """
+        with self._lock:
+            return [(numero, status, hash_conteudo, bool(ja_consolidado))
+                    for numero, status, hash_conteudo, ja_consolidado in self._conectar().execute(
+                        "SELECT p.numero, p.status, COALESCE(p.hash_conteudo, ''), c.numero IS NOT NULL "
+                        'FROM processos p LEFT JOIN consolidacao c '
+                        'ON c.arquivo = ? AND c.classe = p.classe AND c.numero = p.numero '
+                        "WHERE p.classe = ? AND p.status IN ('baixado', 'em_andamento') "
+                        "AND (c.numero IS NULL OR c.hash_conteudo != COALESCE(p.hash_conteudo, '')) "
+                        'ORDER BY p.numero', (arquivo, classe))]
+
+    def maior_consolidado(self, arquivo: str, classe: str):
+        """Maior número de processo da classe já gravado no arquivo consolidado, ou None."""
+        with self._lock:
+            return self._conectar().execute(
+                'SELECT MAX(numero) FROM consolidacao WHERE arquivo = ? AND classe = ?',
+                (arquivo, classe)).fetchone()[0]
+
+    def tamanho_consolidado(self, arquivo: str):
+        """Tamanho do arquivo consolidado registrado na última consolidação (None se não houver)."""
+        with self._lock:
+            linha = self._conectar().execute(
+                'SELECT tamanho FROM arquivos_consolidados WHERE arquivo = ?', (arquivo,)).fetchone()
+        return linha[0] if linha else None
+
+    def marcar_consolidados(self, arquivo: str, classe: str, processos: list, tamanho: int,
+                            reiniciar: bool = False):
+        """Registra os processos gravados no arquivo consolidado e o novo tamanho do arquivo.
+
+        Args:
+            processos: Tuplas (numero, hash_conteudo)
+            tamanho: Tamanho do arquivo após a gravação
+            reiniciar: Se True, descarta o registro anterior do arquivo (arquivo recriado)
+        """
+        with self._lock:
+            conexao = self._conectar()
+            conexao.execute('BEGIN IMMEDIATE')
+            try:
+                if reiniciar:
+                    conexao.execute('DELETE FROM consolidacao WHERE arquivo = ?', (arquivo,))
+                conexao.executemany(
+                    'INSERT OR REPLACE INTO consolidacao (arquivo, classe, numero, hash_conteudo) '
+                    'VALUES (?, ?, ?, ?)',
+                    [(arquivo, classe, numero, hash_conteudo) for numero, hash_conteudo in processos])
+                conexao.execute('INSERT OR REPLACE INTO arquivos_consolidados (arquivo, tamanho) VALUES (?, ?)',
+                                (arquivo, tamanho))
+                conexao.execute('COMMIT')
+            except Exception:
+                conexao.execute('ROLLBACK')
+                raise
+
+    def fechar(self):
+        with self._lock:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
+
+
+# Registro de processos compartilhado entre os trabalhadores
+registro = RegistroProcessos()
+
+
+def identificar_trabalhador() -> str:
+    """Identificação do trabalhador atual no registro (máquina, processo e thread)."""
+    return f'{socket.gethostname()}:{os.getpid()}:{threading.current_thread().name}'
 
 
 def arquivo_existe(arquivo):
     """Verifica se o arquivo existe e não está vazio"""
     return os.path.exists(arquivo) and os.path.getsize(arquivo) > 0
 
-# Garante que os diretórios existem
-os.makedirs('dados', exist_ok=True)
-os.makedirs('temp', exist_ok=True)
-os.makedirs('baixados', exist_ok=True)  # Processos finalizados (não são reprocessados)
-os.makedirs('nao_encontrados', exist_ok=True)  # Processos inexistentes (não são rebuscados)
-
-# Define os nomes dos arquivos finais
-csv_file = ('Dados ' + 
-            classe + ' de ' +
-            str(num_inicial) + ' a ' +
-            str(num_final) + '.csv')
-# xlsx_file = 'dados/Dados_processuais.xlsx'
-
-# Loop alternativo para processar uma lista de processos específica. Desative o loop principal e ative este para usar a lista.
-# for item in lista_processos:
-#     classe = item[0]
-#     processo_num = item[1]
-
-# Loop principal para percorrer os processos
-for processo in range(num_final - num_inicial + 1):
-    if processonaoencontrado > 20:
-        break
-    processo_num = processo + num_inicial
-
-    # Verifica se o processo já foi extraído
+
+COLUNAS = ['incidente',
+           'classe',
+           'nome_processo',
+           'classe_extenso',
+           'tipo_processo',
+           'liminar',
+           'origem',
+           'relator',
+           'autor1',
+           'len(partes_total)',
+           'partes_total',
+           'data_protocolo',
+           'origem_orgao',
+           'lista_assuntos',
+           'len(andamentos_lista)',
+           'andamentos_lista',
+           'len(decisões)',
+           'decisões',
+           'len(deslocamentos)',
+           'deslocamentos_lista',
+           'status_processo']
+
+
+def registrar_requisicao() -> int:
+    """Incrementa o contador global de requisições e retorna o novo valor."""
+    global request_count
+    with _lock_contador:
+        request_count += 1
+        return request_count
+
+
+def _extrair_origem(html_origem: str) -> str:
+    """Extrai a sigla do estado de origem do HTML de #descricao-procedencia."""
+    try:
+        origem = dsd.clext(html_origem, '>', '<') if html_origem else 'NA'
+        # Extrai apenas a sigla do estado (primeiras 2 letras maiúsculas)
+        if origem != 'NA':
+            match = re.search(r'\b([A-Z]{2})\b', origem)
+            origem = match.group(1) if match else origem
+    except Exception:
+        origem = 'NA'
+    return origem
+
+
+def _extrair_relator(html_total: str) -> str:
+    """Extrai o nome do relator, sem o prefixo "Min.", do HTML de #conteudo."""
+    try:
+        relator = dsd.clext(html_total, 'Relator(a): ', '<')
+        # Remove o prefixo "Min. ", "MIN. " ou "min. " (case-insensitive)
+        relator = re.sub(r'^MIN\.\s+', '', relator, flags=re.IGNORECASE)
+    except Exception:
+        relator = 'NA'
+    return relator
+
+
+def _tipo_processo(html_total: str) -> str:
+    """Identifica se o processo é físico ou eletrônico."""
+    if 'Processo Físico' in html_total:
+        return 'Físico'
+    elif 'Processo Eletrônico' in html_total:
+        return 'Eletrônico'
+    return 'NA'
+
+
+def _montar_partes(tipos: list, nomes: list) -> tuple:
+    """Monta a lista de partes a partir dos innerHTML de tipos e nomes.
+
+    Returns:
+        tuple: (partes_total, primeiro_autor)
+    """
+    partes_total = []
+    primeiro_autor = 'NA'
+    for n in range(len(tipos)):
+        index = n + 1
+        if index == 1:
+            primeiro_autor = nomes[n]
+
+        parte_info = {'_index': index,
+                      'tipo': tipos[n],
+                      'nome': nomes[n]}
+
+        partes_total.append(parte_info)
+    return partes_total, primeiro_autor
+
+
+def _extrair_assuntos(html_assuntos: str) -> list:
+    """Extrai a lista de assuntos do HTML da seção de informações."""
+    return [dsd.clext(assunto, '', '</') for assunto in html_assuntos.split('<li>')[1:]]
+
+
+def _link_andamento(html: str) -> str:
+    """Extrai o link do documento vinculado a um andamento."""
+    if 'href' in html:
+        and_link = dsd.ext(html, 'href="', '"')
+        return 'https://portal.stf.jus.br/processos/' + and_link.replace('amp;', '')
+    return 'NA'
+
+
+def _parsear_deslocamento(htmld: str, index: int) -> dict:
+    """Extrai os dados de um deslocamento a partir de seu innerHTML."""
+    enviado = dsd.clext(htmld, '"processo-detalhes-bold">', '<')
+    recebido = dsd.clext(htmld, '"processo-detalhes">', '<')
+
+    if 'processo-detalhes bg-font-success">' in htmld:
+        data_recebido = dsd.ext(htmld, 'processo-detalhes bg-font-success">', '<')
+    else:
+        data_recebido = 'NA'
+
+    guia = dsd.clext(htmld, 'text-right">\n                <span class="processo-detalhes">', '<')
+
+    return {'index': index,
+            'data_recebido': data_recebido,
+            'enviado por': enviado,
+            'recebido por': recebido,
+            'guia': guia,
+            }
+
+
+def _processo_finalizado(andamentos_lista: list) -> bool:
+    """Determina se o processo foi finalizado (baixado/findo).
+
+    Verifica padrões que indicam processo finalizado:
+    - Andamentos que COMEÇAM com "BAIXA" (baixa ao arquivo, baixa definitiva, etc.)
+    - Andamentos que COMEÇAM com "PROCESSO FINDO"
+    """
+    return any(
+        and_dict['nome'].upper().startswith('BAIXA') or
+        and_dict['nome'].upper().startswith('PROCESSO FINDO')
+        for and_dict in andamentos_lista
+    )
+
+
+def extrair_dados_dom(driver, html_total: str) -> dict:
+    """Extrai os dados do processo consultando os elementos da página no WebDriver.
+
+    Cada elemento lido é uma chamada ao chromedriver. Mantido como alternativa
+    a parsear_processo() e como referência para o benchmark entre os dois.
+
+    Args:
+        driver: WebDriver já posicionado na página do processo
+        html_total: innerHTML do elemento #conteudo
+
+    Returns:
+        dict: Dados do processo, sem o conteúdo dos documentos
+    """
+    incidente = dsd.id_get(driver, 'incidente').get_attribute('value')
+
+    nome_processo = dsd.id_get(driver, 'classe-numero-processo').get_attribute('value')
+
+    classe_extenso = dsd.xpath_get(driver, '//*[@id="texto-pagina-interna"]/div/div/div/div[2]/div[1]/div/div[1]')
+
+    titulo_processo = dsd.xpath_get(driver, '//*[@id="texto-pagina-interna"]/div/div/div/div[1]')
+
+    liminar = []
+    if 'bg-danger' in titulo_processo:
+        for item in dsd.class_get_list(driver, 'bg-danger'):
+            liminar.append(item.text)
+
+    try:
+        origem = _extrair_origem(dsd.xpath_get(driver, '//*[@id="descricao-procedencia"]'))
+    except Exception:
+        origem = 'NA'
+
+    partes_total, primeiro_autor = _montar_partes(
+        [parte.get_attribute('innerHTML') for parte in dsd.class_get_list(driver, 'detalhe-parte')],
+        [parte.get_attribute('innerHTML') for parte in dsd.class_get_list(driver, 'nome-parte')])
+
+    data_protocolo = dsd.clean(dsd.xpath_get(driver, '//*[@id="informacoes-completas"]/div[2]/div[1]/div[2]/div[2]'))
+
+    origem_orgao = dsd.clean(dsd.xpath_get(driver, '//*[@id="informacoes-completas"]/div[2]/div[1]/div[2]/div[4]'))
+
+    lista_assuntos = _extrair_assuntos(dsd.xpath_get(driver, '//*[@id="informacoes-completas"]/div[1]/div[2]'))
+
+    andamentos_info = driver.find_element(By.CLASS_NAME,
+                                          'processo-andamentos')
+    andamentos = dsd.class_get_list(andamentos_info, 'andamento-item')
+    andamentos_lista = []
+    for n in range(len(andamentos)):
+        index = len(andamentos) - n
+        andamento = andamentos[n]
+        html = andamento.get_attribute('innerHTML')
+
+        and_tipo = 'invalid' if 'andamento-invalido' in html else 'valid'
+
+        and_data = andamento.find_element(By.CLASS_NAME,
+                                          'andamento-data').text
+        and_nome = andamento.find_element(By.CLASS_NAME,
+                                          'andamento-nome').text
+        and_complemento = andamento.find_element(By.CLASS_NAME,
+                                                 'col-md-9').text
+
+        if 'andamento-julgador badge bg-info' in html:
+            and_julgador = andamento.find_element(By.CLASS_NAME,
+                                                  'andamento-julgador').text
+        else:
+            and_julgador = 'NA'
+
+        if 'fa-download' in html:
+            and_link_tipo = andamento.find_element(By.CLASS_NAME, 'fa-download').text
+        elif 'fa-file-alt' in html:
+            and_link_tipo = andamento.find_element(By.CLASS_NAME, 'fa-file-alt').text
+        else:
+            and_link_tipo = 'NA'
+
+        andamentos_lista.append({'index': index,
+                                 'data': and_data,
+                                 'nome': and_nome,
+                                 'complemento': and_complemento,
+                                 'julgador': and_julgador,
+                                 'validade': and_tipo,
+                                 'link': _link_andamento(html),
+                                 'link_tipo': and_link_tipo,
+                                 })
+
+    deslocamentos_info = driver.find_element(By.XPATH,
+                                             '//*[@id="deslocamentos"]')
+    deslocamentos = dsd.class_get_list(deslocamentos_info, 'lista-dados')
+    deslocamentos_lista = []
+    for n in range(len(deslocamentos)):
+        deslocamentos_lista.append(
+            _parsear_deslocamento(deslocamentos[n].get_attribute('innerHTML'),
+                                  len(deslocamentos) - n))
+
+    return {'incidente': incidente,
+            'nome_processo': nome_processo,
+            'classe_extenso': classe_extenso,
+            'tipo_processo': _tipo_processo(html_total),
+            'liminar': liminar,
+            'origem': origem,
+            'relator': _extrair_relator(html_total),
+            'autor1': primeiro_autor,
+            'partes_total': partes_total,
+            'data_protocolo': data_protocolo,
+            'origem_orgao': origem_orgao,
+            'lista_assuntos': lista_assuntos,
+            'andamentos_lista': andamentos_lista,
+            'deslocamentos_lista': deslocamentos_lista}
+
+
+# Parser da página do processo a partir de um único page_source
+
+# Elementos HTML sem tag de fechamento
+_TAGS_VAZIAS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                'link', 'meta', 'param', 'source', 'track', 'wbr'}
+
+# Elementos que quebram linha no texto visível
+_TAGS_BLOCO = {'div', 'p', 'li', 'ul', 'ol', 'tr', 'table', 'section',
+               'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+
+class _No:
+    """Elemento da árvore HTML com as posições de seu conteúdo no código-fonte."""
+
+    __slots__ = ('tag', 'attrs', 'classes', 'filhos', 'inicio', 'fim')
+
+    def __init__(self, tag: str, attrs: dict, inicio: int):
+        self.tag = tag
+        self.attrs = attrs
+        self.classes = (attrs.get('class') or '').split()
+        self.filhos = []  # _No ou str (texto)
+        self.inicio = inicio  # Início do innerHTML
+        self.fim = inicio  # Fim do innerHTML
+
+    def elementos(self):
+        """Percorre os elementos descendentes em ordem de documento."""
+        pilha = [f for f in reversed(self.filhos) if isinstance(f, _No)]
+        while pilha:
+            no = pilha.pop()
+            yield no
+            pilha.extend(f for f in reversed(no.filhos) if isinstance(f, _No))
+
+    def por_classe(self, classe: str) -> list:
+        """Equivale a find_elements(By.CLASS_NAME, classe)."""
+        return [no for no in self.elementos() if classe in no.classes]
+
+    def caminho(self, caminho: str):
+        """Resolve um caminho XPath relativo simples, como 'div/div[2]/div'."""
+        atuais = [self]
+        for passo in caminho.split('/'):
+            match = re.fullmatch(r'(\w+)(?:\[(\d+)\])?', passo)
+            tag, posicao = match.group(1), match.group(2)
+            proximos = []
+            for no in atuais:
+                filhos = [f for f in no.filhos if isinstance(f, _No) and f.tag == tag]
+                if posicao is None:
+                    proximos.extend(filhos)
+                elif int(posicao) <= len(filhos):
+                    proximos.append(filhos[int(posicao) - 1])
+            atuais = proximos
+        return atuais[0] if atuais else None
+
+    def texto(self) -> str:
+        """Texto visível do elemento, com espaços normalizados (como .text do Selenium)."""
+        partes = []
+        pilha = [self]
+        while pilha:
+            no = pilha.pop()
+            if isinstance(no, str):
+                partes.append(re.sub(r'\s+', ' ', no))
+            elif no.tag == 'br':
+                partes.append('\n')
+            elif no.tag in _TAGS_BLOCO:
+                partes.append('\n')
+                pilha.append('\n')
+                pilha.extend(reversed(no.filhos))
+            else:
+                pilha.extend(reversed(no.filhos))
+        linhas = (' '.join(linha.split()) for linha in ''.join(partes).split('\n'))
+        return '\n'.join(linha for linha in linhas if linha)
+
+
+class _ConstrutorArvore(HTMLParser):
+    """Constrói uma árvore de _No a partir do HTML, indexando elementos por id e classe."""
+
+    def __init__(self, html: str):
+        super().__init__(convert_charrefs=True)
+        self.html = html
+        self.raiz = _No('#documento', {}, 0)
+        self.ids = {}
+        self.classes = {}
+        self._pilha = [self.raiz]
+        self._linhas = [0] + [m.end() for m in re.finditer('\n', html)]
+
+    def _posicao(self) -> int:
+        linha, coluna = self.getpos()
+        return self._linhas[linha - 1] + coluna
+
+    def _novo_no(self, tag, attrs):
+        inicio = self._posicao() + len(self.get_starttag_text())
+        no = _No(tag, {k: (v or '') for k, v in attrs}, inicio)
+        self._pilha[-1].filhos.append(no)
+        if 'id' in no.attrs:
+            self.ids.setdefault(no.attrs['id'], no)
+        for classe in no.classes:
+            self.classes.setdefault(classe, []).append(no)
+        return no
+
+    def handle_starttag(self, tag, attrs):
+        no = self._novo_no(tag, attrs)
+        if tag not in _TAGS_VAZIAS:
+            self._pilha.append(no)
+
+    def handle_startendtag(self, tag, attrs):
+        self._novo_no(tag, attrs)
+
+    def handle_endtag(self, tag):
+        # Fecha o elemento correspondente, tolerando tags não fechadas no meio
+        for posicao in range(len(self._pilha) - 1, 0, -1):
+            if self._pilha[posicao].tag == tag:
+                fim = self._posicao()
+                for no in self._pilha[posicao:]:
+                    no.fim = fim
+                del self._pilha[posicao:]
+                return
+
+    def handle_data(self, data):
+        self._pilha[-1].filhos.append(data)
+
+    def close(self):
+        super().close()
+        for no in self._pilha[1:]:
+            no.fim = len(self.html)
+        self.raiz.fim = len(self.html)
+
+
+class PaginaProcesso:
+    """Página do processo analisada uma única vez a partir do page_source."""
+
+    def __init__(self, html: str):
+        self.html = html
+        construtor = _ConstrutorArvore(html)
+        construtor.feed(html)
+        construtor.close()
+        self.raiz = construtor.raiz
+        self.ids = construtor.ids
+        self.classes = construtor.classes
+
+    def inner_html(self, no) -> str:
+        """innerHTML do elemento, ou '' se o elemento não existe."""
+        return self.html[no.inicio:no.fim] if no is not None else ''
+
+    def por_classe(self, classe: str) -> list:
+        """Todos os elementos da página com a classe, em ordem de documento."""
+        return self.classes.get(classe, [])
+
+    def por_id(self, elemento_id: str, caminho: str = None):
+        """Busca um elemento por id e, opcionalmente, por um caminho a partir dele."""
+        no = self.ids.get(elemento_id)
+        if no is not None and caminho:
+            no = no.caminho(caminho)
+        return no
+
+
+# Classes dos elementos lidos em cada andamento
+_CAMPOS_ANDAMENTO = ('andamento-data', 'andamento-nome', 'col-md-9',
+                     'andamento-julgador', 'fa-download', 'fa-file-alt')
+
+
+def _parsear_andamentos(pagina: PaginaProcesso) -> list:
+    """Extrai a lista de andamentos da página já analisada."""
+    andamentos_info = next(iter(pagina.por_classe('processo-andamentos')), None)
+    andamentos = andamentos_info.por_classe('andamento-item') if andamentos_info else []
+    andamentos_lista = []
+    for n in range(len(andamentos)):
+        index = len(andamentos) - n
+        andamento = andamentos[n]
+        html = pagina.inner_html(andamento)
+
+        and_tipo = 'invalid' if 'andamento-invalido' in html else 'valid'
+
+        # Um único percurso do andamento localiza o primeiro elemento de cada campo
+        nos = {}
+        for no in andamento.elementos():
+            for classe_no in no.classes:
+                if classe_no in _CAMPOS_ANDAMENTO and classe_no not in nos:
+                    nos[classe_no] = no
+        campos = {classe_campo: (nos[classe_campo].texto() if classe_campo in nos else '')
+                  for classe_campo in _CAMPOS_ANDAMENTO}
+
+        if 'andamento-julgador badge bg-info' in html:
+            and_julgador = campos['andamento-julgador']
+        else:
+            and_julgador = 'NA'
+
+        if 'fa-download' in html:
+            and_link_tipo = campos['fa-download']
+        elif 'fa-file-alt' in html:
+            and_link_tipo = campos['fa-file-alt']
+        else:
+            and_link_tipo = 'NA'
+
+        andamentos_lista.append({'index': index,
+                                 'data': campos['andamento-data'],
+                                 'nome': campos['andamento-nome'],
+                                 'complemento': campos['col-md-9'],
+                                 'julgador': and_julgador,
+                                 'validade': and_tipo,
+                                 'link': _link_andamento(html),
+                                 'link_tipo': and_link_tipo,
+                                 })
+    return andamentos_lista
+
+
+def _parsear_deslocamentos(pagina: PaginaProcesso) -> list:
+    """Extrai a lista de deslocamentos da página já analisada."""
+    deslocamentos_info = pagina.por_id('deslocamentos')
+    deslocamentos = deslocamentos_info.por_classe('lista-dados') if deslocamentos_info else []
+    return [_parsear_deslocamento(pagina.inner_html(deslocamentos[n]), len(deslocamentos) - n)
+            for n in range(len(deslocamentos))]
+
+
+def parsear_processo(page_source: str):
+    """Extrai os dados do processo a partir de um único page_source.
+
+    Equivalente a extrair_dados_dom(), mas sem nenhuma chamada ao WebDriver:
+    o HTML é analisado uma única vez e todos os campos são lidos da árvore.
+
+    Args:
+        page_source: HTML completo da página do processo
+
+    Returns:
+        dict: Dados do processo, sem o conteúdo dos documentos, ou None se o
+        processo não foi encontrado
+    """
+    pagina = PaginaProcesso(page_source)
+
+    html_total = pagina.inner_html(pagina.por_id('conteudo'))
+    html_origem = pagina.inner_html(pagina.por_id('descricao-procedencia'))
+    if 'Processo não encontrado' in html_total or html_origem == '':
+        return None
+
+    incidente = pagina.por_id('incidente')
+    nome_processo = pagina.por_id('classe-numero-processo')
+
+    titulo_processo = pagina.inner_html(pagina.por_id('texto-pagina-interna', 'div/div/div/div[1]'))
+    liminar = []
+    if 'bg-danger' in titulo_processo:
+        liminar = [no.texto() for no in pagina.por_classe('bg-danger')]
+
+    partes_total, primeiro_autor = _montar_partes(
+        [pagina.inner_html(no) for no in pagina.por_classe('detalhe-parte')],
+        [pagina.inner_html(no) for no in pagina.por_classe('nome-parte')])
+
+    return {'incidente': incidente.attrs.get('value', '') if incidente else 'NA',
+            'nome_processo': nome_processo.attrs.get('value', '') if nome_processo else 'NA',
+            'classe_extenso': pagina.inner_html(pagina.por_id('texto-pagina-interna',
+                                                              'div/div/div/div[2]/div[1]/div/div[1]')),
+            'tipo_processo': _tipo_processo(html_total),
+            'liminar': liminar,
+            'origem': _extrair_origem(html_origem),
+            'relator': _extrair_relator(html_total),
+            'autor1': primeiro_autor,
+            'partes_total': partes_total,
+            'data_protocolo': dsd.clean(pagina.inner_html(
+                pagina.por_id('informacoes-completas', 'div[2]/div[1]/div[2]/div[2]'))),
+            'origem_orgao': dsd.clean(pagina.inner_html(
+                pagina.por_id('informacoes-completas', 'div[2]/div[1]/div[2]/div[4]'))),
+            'lista_assuntos': _extrair_assuntos(pagina.inner_html(
+                pagina.por_id('informacoes-completas', 'div[1]/div[2]'))),
+            'andamentos_lista': _parsear_andamentos(pagina),
+            'deslocamentos_lista': _parsear_deslocamentos(pagina)}
+
+
+def _chave_andamento(andamento: dict) -> tuple:
+    """Identifica um andamento entre duas extrações do mesmo processo."""
+    return (andamento['data'], andamento['nome'], andamento['complemento'], andamento['link'])
+
+
+def carregar_processo_anterior(arquivo: str):
+    """Lê as listas gravadas na extração anterior de um processo em temp/.
+
+    Returns:
+        dict: andamentos_lista, deslocamentos_lista e partes_total da extração
+        anterior, ou None se o arquivo não pode ser lido
+    """
+    try:
+        anterior = pd.read_csv(arquivo, usecols=['partes_total', 'andamentos_lista', 'deslocamentos_lista'])
+        return {'andamentos_lista': separar_textos(json.loads(anterior['andamentos_lista'].iloc[0])),
+                'deslocamentos_lista': json.loads(anterior['deslocamentos_lista'].iloc[0]),
+                'partes_total': json.loads(anterior['partes_total'].iloc[0])}
+    except Exception as e:
+        logger.warning(f'Não foi possível ler a extração anterior em {arquivo}: {e}')
+        return None
+
+
+# Listas comparadas no registro de mudanças: (nome, campo nos dados, chave de
+# identificação, chave de pareamento). Itens com a mesma chave de identificação
+# são o mesmo item; os que sobram de cada lado e têm a mesma chave de
+# pareamento são registrados como alterados.
+_LISTAS_MUDANCAS = (('andamentos', 'andamentos_lista', ('data', 'nome', 'complemento', 'link'), ('data', 'nome')),
+                    ('deslocamentos', 'deslocamentos_lista',
+                     ('data_recebido', 'enviado por', 'recebido por', 'guia'), ('enviado por', 'recebido por', 'guia')),
+                    ('partes', 'partes_total', ('tipo', 'nome'), ('nome',)))
+
+
+def comparar_listas(anteriores: list, atuais: list, chave: tuple, chave_par: tuple) -> list:
+    """Compara duas versões de uma lista de itens (andamentos, deslocamentos ou partes).
+
+    A posição (index) não entra na comparação, pois muda quando há itens novos.
+
+    Returns:
+        list: (operacao, item atual, item anterior), com operacao 'novo',
+        'alterado' ou 'removido' (None no lado ausente)
+    """
+    def conteudo(item):
+        return {campo: valor for campo, valor in item.items() if campo not in ('index', '_index')}
+
+    restantes = {}
+    for item in anteriores:
+        restantes.setdefault(tuple(item.get(campo) for campo in chave), []).append(item)
+
+    mudancas = []
+    sem_par = []
+    for item in atuais:
+        iguais = restantes.get(tuple(item.get(campo) for campo in chave))
+        if iguais:
+            anterior = iguais.pop(0)
+            if conteudo(anterior) != conteudo(item):
+                mudancas.append(('alterado', item, anterior))
+        else:
+            sem_par.append(item)
+
+    removidos = {}
+    for itens in restantes.values():
+        for anterior in itens:
+            removidos.setdefault(tuple(anterior.get(campo) for campo in chave_par), []).append(anterior)
+    for item in sem_par:
+        candidatos = removidos.get(tuple(item.get(campo) for campo in chave_par))
+        if candidatos:
+            mudancas.append(('alterado', item, candidatos.pop(0)))
+        else:
+            mudancas.append(('novo', item, None))
+    for itens in removidos.values():
+        mudancas.extend(('removido', None, anterior) for anterior in itens)
+    return mudancas
+
+
+class RegistroMudancas:
+    """Registro, só de acréscimo, das mudanças de cada processo entre duas extrações.
+
+    Cada linha do arquivo JSONL é uma mudança em um andamento, deslocamento ou
+    parte: {"momento", "classe", "numero", "incidente", "lista", "operacao",
+    "item", "anterior", "primeira_extracao"}, com operacao 'novo', 'alterado'
+    ou 'removido'. Na primeira extração de um processo, todos os itens entram
+    como novos. Os consumidores podem atualizar tabelas derivadas a partir do
+    ponto em que pararam, sem reprocessar toda a base.
+
+    As mudanças são registradas antes de a nova extração substituir a anterior,
+    de modo que nenhuma se perde em uma interrupção; em contrapartida, um
+    processo interrompido entre as duas etapas tem suas mudanças registradas
+    de novo na próxima extração.
+
+    Args:
+        caminho: Arquivo JSONL do registro de mudanças
+    """
+
+    def __init__(self, caminho: str = MUDANCAS):
+        self.caminho = caminho
+        self._lock = threading.Lock()
+
+    def registrar(self, classe: str, numero: int, incidente: str, anterior: dict, atual: dict) -> int:
+        """Compara as duas extrações do processo e acrescenta as mudanças ao registro.
+
+        Args:
+            anterior: Listas da extração anterior (carregar_processo_anterior), ou None
+            atual: Dados da extração atual, com as mesmas listas
+
+        Returns:
+            int: Número de mudanças registradas
+        """
+        momento = datetime.now().isoformat(timespec='seconds')
+        linhas = []
+        for lista, campo, chave, chave_par in _LISTAS_MUDANCAS:
+            mudancas = comparar_listas(anterior[campo] if anterior else [], atual[campo], chave, chave_par)
+            for operacao, item, item_anterior in mudancas:
+                linhas.append(json.dumps({'momento': momento, 'classe': classe, 'numero': numero,
+                                          'incidente': incidente, 'lista': lista, 'operacao': operacao,
+                                          'item': item, 'anterior': item_anterior,
+                                          'primeira_extracao': anterior is None}, ensure_ascii=False))
+        if linhas:
+            with self._lock:
+                with open(self.caminho, 'a', encoding='utf-8') as f:
+                    f.write('\n'.join(linhas) + '\n')
+        return len(linhas)
+
+
+# Mudanças registradas por todos os trabalhadores
+mudancas = RegistroMudancas()
+
+
+def montar_linha(dados: dict, classe: str, anteriores: list = None, numero: int = None) -> tuple:
+    """Baixa os documentos dos andamentos e monta a linha a gravar.
+
+    Os documentos são baixados em paralelo pelo downloader compartilhado. Se
+    os andamentos da extração anterior forem informados, os que já existiam
+    (mesma data, nome, complemento e link) são reaproveitados com seu documento
+    e apenas os novos têm documentos baixados. Os textos dos documentos são
+    gravados no repositório de textos e referenciados pelo `documento_id`.
+
+    Se o número do processo for informado, cada documento é registrado no
+    registro de processos assim que termina, e os documentos registrados por
+    uma extração interrompida não são baixados de novo.
+
+    Args:
+        dados: Dados do processo retornados por parsear_processo() ou extrair_dados_dom()
+        classe: Classe processual (ADI, ADPF, etc.)
+        anteriores: Andamentos gravados na extração anterior (atualização incremental)
+        numero: Número do processo, para registrar o progresso dos documentos
+
+    Returns:
+        tuple: (dados_a_gravar, processo_baixado)
+    """
+    andamentos_lista = dados['andamentos_lista']
+
+    # Reaproveita os andamentos já conhecidos, exceto os que tiveram falha no download
+    conhecidos = {}
+    for andamento_anterior in anteriores or []:
+        if andamento_anterior.get('documento_id') != 'Exception':
+            conhecidos.setdefault(_chave_andamento(andamento_anterior), []).append(andamento_anterior)
+
+    novos = []
+    for n, andamento_dados in enumerate(andamentos_lista):
+        iguais = conhecidos.get(_chave_andamento(andamento_dados))
+        if iguais:
+            andamento_anterior = iguais.pop()
+            andamento_anterior.update(andamento_dados)
+            andamentos_lista[n] = andamento_anterior
+        else:
+            novos.append(andamento_dados)
+
+    # Documentos já concluídos por uma extração interrompida deste processo
+    documentos_id = registro.documentos_concluidos(classe, numero) if numero is not None else {}
+
+    def concluir_documento(link: str, texto: str) -> str:
+        # Executada na thread do download: o documento é registrado assim que termina
+        documento_id = textos_documentos.gravar(texto, link)
+        if numero is not None and documento_id != 'Exception':
+            registro.registrar_documento(classe, numero, link, documento_id)
+        return documento_id
+
+    # Agenda os documentos novos de uma vez (links repetidos são baixados uma só vez)
+    futuros = {}
+    retomados = set()
+    for andamento_dados in novos:
+        link = andamento_dados['link']
+        if link in documentos_id:
+            retomados.add(link)
+        elif link != 'NA' and link not in futuros:
+            futuros[link] = downloader.agendar(link, concluir_documento)
+    if retomados:
+        print(f'  -> {len(retomados)} documento(s) retomado(s) da extração interrompida')
+
+    # A linha só é finalizada quando todos os documentos estão resolvidos.
+    # Os textos vão para o repositório de textos; o andamento guarda só o documento_id.
+    with medidor.etapa('documentos'):
+        documentos_id.update({link: futuro.result() for link, futuro in futuros.items()})
+    medidor.somar('documentos', len(futuros))
+    for andamento_dados in novos:
+        andamento_dados['documento_id'] = documentos_id.get(andamento_dados['link'], 'NA')
+
+    if anteriores is not None:
+        print(f'  -> {len(novos)} andamento(s) novo(s) desde a última extração')
+
+    # As decisões são referências (index) aos andamentos com julgador, sem repetir os andamentos
+    indices_decisórios = [andamento_dados['index'] for andamento_dados in andamentos_lista
+                             if andamento_dados['julgador'] != 'NA']
+
+    partes_total = dados['partes_total']
+    deslocamentos_lista = dados['deslocamentos_lista']
+
+    processo_baixado = _processo_finalizado(andamentos_lista)
+    status_processo = 'Finalizado' if processo_baixado else 'Em andamento'
+
+    # Define os dados a gravar, criando uma lista com as variáveis
+    dados_a_gravar = [dados['incidente'],
+                      classe,
+                      dados['nome_processo'],
+                      dados['classe_extenso'],
+                      dados['tipo_processo'],
+                      dados['liminar'],
+                      dados['origem'],
+                      dados['relator'],
+                      dados['autor1'],
+                      len(partes_total),
+                      dsd.js(partes_total),
+                      dados['data_protocolo'],
+                      dados['origem_orgao'],
+                      dados['lista_assuntos'],
+                      len(andamentos_lista),
+                      dsd.js(andamentos_lista),
+                      len(indices_decisórios),
+                      dsd.js(indices_decisórios),
+                      len(deslocamentos_lista),
+                      dsd.js(deslocamentos_lista),
+                      status_processo
+                      ]
+
+    return dados_a_gravar, processo_baixado
+
+
+def obter_dados_dom(url: str, pool: PoolDrivers):
+    """Carrega a página no navegador e extrai os dados pelo WebDriver.
+
+    Returns:
+        dict: Dados do processo, ou None se o processo não foi encontrado
+    """
+    driver, page = criar_driver_e_navegar(url, pool)
+    descartar = False
+    try:
+        with medidor.etapa('parser'):
+            html_total = dsd.xpath_get(driver, '//*[@id="conteudo"]')
+            if ('Processo não encontrado' in html_total or
+                    dsd.xpath_get(driver, '//*[@id="descricao-procedencia"]') == ''):
+                return None
+            return extrair_dados_dom(driver, html_total)
+    except Exception:
+        descartar = True
+        raise
+    finally:
+        pool.devolver(driver, descartar=descartar)
+
+
+def extrair_processo(classe: str, processo_num: int, backend) -> str:
+    """Extrai um processo e grava seu arquivo parcial.
+
+    O processo é antes reivindicado no registro: processos baixados ou não
+    encontrados são pulados, e os que estão em andamento são atualizados.
+
+    Args:
+        classe: Classe processual (ADI, ADPF, etc.)
+        processo_num: Número do processo
+        backend: Backend de obtenção da página (BackendSelenium ou BackendHTTP)
+
+    Returns:
+        str: 'pulado', 'baixado', 'temp', 'nao_encontrado' ou 'erro'
+    """
     arquivo_temp = f'temp/{classe}{processo_num}_partial.csv'
-    arquivo_baixado = f'baixados/{classe}{processo_num}_partial.csv'
-    arquivo_nao_encontrado = f'nao_encontrados/{classe}{processo_num}_partial.csv'
 
-    # OTIMIZAÇÃO: Verifica PRIMEIRO se já está em baixados/ ou nao_encontrados/ antes de fazer qualquer coisa
-    if os.path.exists(arquivo_baixado):
-        print(f'{classe}{processo_num} - BAIXADO (pulando)')
-        continue
+    # OTIMIZAÇÃO: Consulta o registro antes de fazer qualquer coisa
+    reivindicado, status_anterior = registro.reivindicar(classe, processo_num, identificar_trabalhador())
+    if not reivindicado:
+        descricao = {'baixado': 'BAIXADO', 'nao_encontrado': 'NÃO ENCONTRADO'}.get(
+            status_anterior, 'EM PROCESSAMENTO POR OUTRO TRABALHADOR')
+        print(f'{classe}{processo_num} - {descricao} (pulando)')
+        return 'pulado'
+
+    try:
+        return _extrair_processo_reivindicado(classe, processo_num, backend, arquivo_temp, status_anterior)
+    except Exception as e:
+        registro.registrar_erro(classe, processo_num, f'{type(e).__name__}: {e}', status_anterior)
+        raise
+    except BaseException:
+        # Interrupção (Ctrl+C): devolve o processo para que a próxima execução o retome
+        registro.liberar(classe, processo_num, status_anterior)
+        raise
 
-    if os.path.exists(arquivo_nao_encontrado):
-        print(f'{classe}{processo_num} - NÃO ENCONTRADO (pulando)')
-        continue
 
-    # Se está em temp/, remove para reprocessar
+def _extrair_processo_reivindicado(classe: str, processo_num: int, backend, arquivo_temp: str,
+                                   status_anterior: str = None) -> str:
+    """Extrai um processo já reivindicado no registro (ver extrair_processo)."""
+    # Se está em temp/, atualiza a partir da extração anterior ou remove para reprocessar.
+    # A extração anterior é lida antes, para o registro de mudanças.
+    anterior = None
+    anteriores = None
     if os.path.exists(arquivo_temp):
-        print(f'{classe}{processo_num} - EM TEMP (reprocessando)')
-        os.remove(arquivo_temp)
+        anterior = carregar_processo_anterior(arquivo_temp)
+        if ATUALIZACAO_INCREMENTAL:
+            print(f'{classe}{processo_num} - EM TEMP (atualização incremental)')
+            if anterior is not None:
+                # Cópias: montar_linha altera os andamentos reaproveitados
+                anteriores = [dict(andamento) for andamento in anterior['andamentos_lista']]
+        else:
+            print(f'{classe}{processo_num} - EM TEMP (reprocessando)')
+            os.remove(arquivo_temp)
 
     print (classe + str (processo_num))
 
-    url = ('https://portal.stf.jus.br/processos/listarProcessos.asp?classe=' +
-           classe +
-           '&numeroProcesso=' +
-           str(processo_num)
-           )
+    url = URL_PROCESSO.format(classe=classe, numero=processo_num)
 
     # Incrementa contador apenas para requisições reais (não para processos pulados)
-    request_count += 1
+    contagem = registrar_requisicao()
 
-    # Usa função com retry automático (tenacity)
+    # Usa funções com retry automático (tenacity)
     try:
-        driver, page = criar_driver_e_navegar(url)
-    except (STFAccessError, WebDriverException) as e:
-        logger.error(f'{classe}{processo_num} - Falha após {MAX_RETRIES} tentativas: {e}')
-        processonaoencontrado += 1
-        continue
-    
-    html_total = dsd.xpath_get(driver, '//*[@id="conteudo"]')
-
-    if 'Processo não encontrado' not in html_total and dsd.xpath_get(driver, '//*[@id="descricao-procedencia"]') != '':
-        
-
-        processonaoencontrado = 0
-    
-        incidente = dsd.id_get(driver, 'incidente').get_attribute('value')
-
-        nome_processo = dsd.id_get(driver, 'classe-numero-processo').get_attribute('value')
-    
-        
-        classe_extenso = dsd.xpath_get(driver, '//*[@id="texto-pagina-interna"]/div/div/div/div[2]/div[1]/div/div[1]')
-
-        titulo_processo = dsd.xpath_get(driver, '//*[@id="texto-pagina-interna"]/div/div/div/div[1]')
-        
-        if 'Processo Físico' in html_total:
-            tipo_processo = 'Físico'
-        elif 'Processo Eletrônico' in html_total:
-            tipo_processo = 'Eletrônico'
-        else:
-            tipo_processo = 'NA'
-        
-        liminar = []
-        if 'bg-danger' in titulo_processo:
-            liminar0 = dsd.class_get_list(driver, 'bg-danger')
-            for item in liminar0:
-                liminar.append(item.text)
+        if USAR_PARSER_DOM:
+            dados = obter_dados_dom(url, backend.pool)
         else:
-            liminar = []
+            page = backend.obter_pagina(url)
+            with medidor.etapa('parser'):
+                dados = parsear_processo(page)
+    except (STFAccessError, WebDriverException, requests.RequestException) as e:
+        logger.error(f'{classe}{processo_num} - Falha após {MAX_RETRIES} tentativas: {e}')
+        registro.registrar_erro(classe, processo_num, f'{type(e).__name__}: {e}', status_anterior)
+        return 'erro'
 
-        
-        try:
-            origem = dsd.xpath_get(driver, '//*[@id="descricao-procedencia"]')
-            origem = dsd.clext(origem,'>','<') if origem else 'NA'
-            # Extrai apenas a sigla do estado (primeiras 2 letras maiúsculas)
-            if origem != 'NA':
-                import re
-                match = re.search(r'\b([A-Z]{2})\b', origem)
-                origem = match.group(1) if match else origem
-        except Exception:
-            origem = 'NA'
-            
-        try:
-            relator = dsd.clext(html_total, 'Relator(a): ','<')
-            # Remove o prefixo "Min. ", "MIN. " ou "min. " (case-insensitive)
-            import re
-            relator = re.sub(r'^MIN\.\s+', '', relator, flags=re.IGNORECASE)
-        except Exception:
-            relator = 'NA'
-            
-        partes_tipo = dsd.class_get_list(driver, 'detalhe-parte')
-        partes_nome = dsd.class_get_list(driver, 'nome-parte')
-        
-        partes_total = []
-        index = 0
-        adv = []
-        primeiro_autor = 'NA'
-        for n in range(len(partes_tipo)):
-            index = index + 1
-            tipo = partes_tipo[n].get_attribute('innerHTML')
-            nome_parte = partes_nome[n].get_attribute('innerHTML')
-            if index == 1:
-                primeiro_autor = nome_parte
-    
-            parte_info = {'_index': index,
-                          'tipo': tipo,
-                          'nome': nome_parte}
-            
-            partes_total.append(parte_info)
-    
-        data_protocolo = dsd.clean(dsd.xpath_get(driver, '//*[@id="informacoes-completas"]/div[2]/div[1]/div[2]/div[2]'))
-
-        origem_orgao = dsd.clean(dsd.xpath_get(driver, '//*[@id="informacoes-completas"]/div[2]/div[1]/div[2]/div[4]'))
-
-        assuntos = dsd.xpath_get(driver, '//*[@id="informacoes-completas"]/div[1]/div[2]').split('<li>')[1:]
-        lista_assuntos = []
-        
-        for assunto in assuntos:
-            lista_assuntos.append(dsd.clext(assunto, '', '</'))
-    
-    
-        resumo = dsd.xpath_get(driver, '/html/body/div[1]/div[2]/section/div/div/div/div/div/div/div[2]/div[1]')
-
-        andamentos_info = driver.find_element(By.CLASS_NAME,
-                                          'processo-andamentos')
-        andamentos = dsd.class_get_list(andamentos_info, 'andamento-item')
-        andamentos_lista = []
-        andamentos_decisórios = []
-        html_andamentos = []
-        for n in range(len(andamentos)):
-            index = len(andamentos) - n
-            andamento = andamentos[n]
-            html = andamento.get_attribute('innerHTML')
-            
-            html_andamentos.append(html)
-
-            
-            if 'andamento-invalido' in html:
-                and_tipo = 'invalid'
-            else:
-                and_tipo = 'valid'
-                
-            and_data = andamento.find_element(By.CLASS_NAME, 
-                                              'andamento-data').text
-            and_nome = andamento.find_element(By.CLASS_NAME, 
-                                              'andamento-nome').text
-            and_complemento = andamento.find_element(By.CLASS_NAME, 
-                                                     'col-md-9').text
-            
-            if 'andamento-julgador badge bg-info' in html:
-                and_julgador = andamento.find_element(By.CLASS_NAME, 
-                                                      'andamento-julgador').text
-            else:
-                and_julgador = 'NA'
-                
-            if 'href' in html:
-                and_link = dsd.ext(html, 'href="','"')
-                and_link = 'https://portal.stf.jus.br/processos/' + and_link.replace('amp;','')
-            else:
-                and_link = 'NA'
-            
-            if 'fa-download' in html:
-                and_link_tipo = andamento.find_element(By.CLASS_NAME, 'fa-download').text
-            elif 'fa-file-alt' in html:
-                and_link_tipo = andamento.find_element(By.CLASS_NAME, 'fa-file-alt').text
-            else:
-                and_link_tipo = 'NA'
+    if dados is None:
+        # Registra o processo como inexistente para evitar rebuscas
+        registro.concluir(classe, processo_num, 'nao_encontrado')
+        print(f'  -> Não encontrado: {classe}{processo_num}')
+        return 'nao_encontrado'
 
-            # Usa função com retry automático (tenacity)
-            try:
-                and_link_conteudo = baixar_documento(and_link)
-            except Exception:
-                and_link_conteudo = 'Exception'
-            
-            andamento_dados = {'index': index,
-                               'data': and_data,
-                               'nome': and_nome,
-                               'complemento' : and_complemento,
-                               'julgador': and_julgador,
-                               'validade': and_tipo,
-                               'link' : and_link,
-                               'link_tipo' : and_link_tipo,
-                               'link_conteúdo' : and_link_conteudo
-                               }
-            
-            andamentos_lista.append(andamento_dados)
-            if and_julgador != 'NA':
-                andamentos_decisórios.append(andamento_dados)
-        
-        deslocamentos_info = driver.find_element(By.XPATH,
-                                          '//*[@id="deslocamentos"]')
-        deslocamentos = dsd.class_get_list(deslocamentos_info, 'lista-dados')
-        deslocamentos_lista = []
-        htmld = 'NA'
-        for n in range(len(deslocamentos)):
-            index = len(deslocamentos) - n
-            deslocamento = deslocamentos[n]
-            htmld = deslocamento.get_attribute('innerHTML')
-            
-            enviado = dsd.clext(htmld, '"processo-detalhes-bold">','<')
-            recebido = dsd.clext(htmld, '"processo-detalhes">','<')
-            
-            if 'processo-detalhes bg-font-success">' in htmld:
-                data_recebido = dsd.ext(htmld, 'processo-detalhes bg-font-success">','<')
-            else:
-                data_recebido = 'NA'
-                
-            guia = dsd.clext(htmld, 'text-right">\n                <span class="processo-detalhes">','<')
-        
-            deslocamento_dados = {'index': index,
-                               'data_recebido': data_recebido,
-                               'enviado por': enviado,
-                               'recebido por' : recebido,
-                               'guia': guia,
-                               }
-            
-            deslocamentos_lista.append(deslocamento_dados)
-
-        # Determina se o processo foi finalizado (baixado/findo)
-        # Verifica padrões que indicam processo finalizado:
-        # - Andamentos que COMEÇAM com "BAIXA" (baixa ao arquivo, baixa definitiva, etc.)
-        # - Andamentos que COMEÇAM com "PROCESSO FINDO"
-        processo_baixado = any(
-            and_dict['nome'].upper().startswith('BAIXA') or
-            and_dict['nome'].upper().startswith('PROCESSO FINDO')
-            for and_dict in andamentos_lista
-        )
-        status_processo = 'Finalizado' if processo_baixado else 'Em andamento'
-
-    # # Define os dados a gravar, criando uma lista com as variáveis
-
-        dados_a_gravar = [incidente,
-                          classe,
-                          nome_processo,
-                          classe_extenso,
-                          tipo_processo,
-                          liminar,
-                          origem,
-                          relator,
-                          primeiro_autor,
-                          len(partes_total),
-                          dsd.js(partes_total),
-                          data_protocolo,
-                          origem_orgao,
-                          lista_assuntos,
-                          len(andamentos_lista),
-                          dsd.js(andamentos_lista),
-                          len(andamentos_decisórios),
-                          dsd.js(andamentos_decisórios),
-                          len(deslocamentos_lista),
-                          dsd.js(deslocamentos_lista),
-                          status_processo
-                          ]
-
-        colunas =            ['incidente',
-                              'classe',
-                              'nome_processo',
-                              'classe_extenso',
-                              'tipo_processo',
-                              'liminar',
-                              'origem',
-                              'relator',
-                              'autor1',
-                              'len(partes_total)',
-                              'partes_total',
-                              'data_protocolo',
-                              'origem_orgao',
-                              'lista_assuntos',
-                              'len(andamentos_lista)',
-                              'andamentos_lista',
-                              'len(decisões)',
-                              'decisões',
-                              'len(deslocamentos)',
-                              'deslocamentos_lista',
-                              'status_processo']
-
-
-# Acrescenta na lista os dados extraídos de cada processo
-        # Cria DataFrame com os dados do processo atual
-        
-        driver.quit()
-        # Pausa mínima a cada 25 requisições
-        if request_count % 25 == 0:
-            time.sleep(10)
-                # df = pd.DataFrame(lista_dados, columns=colunas)
-                # df.to_excel (xlsx_file[:-5] + str(saves) + '(' + nome_processo + ')' + '.xlsx',index=False) 
-                # df.to_csv (csv_file[:-4] + str(saves) + '(' + nome_processo + ')' + '.csv', 
-                #              index=False,
-                #              encoding='utf-8',
-                #              quoting=1,
-                #              doublequote=True
-                #              ) 
-                
-                # print ('gravados arquivos csv e xlsx até '+nome_processo)
-                # lista_dados = []
-
-        # Grava arquivo individual para este processo
+    dados_a_gravar, processo_baixado = montar_linha(dados, classe, anteriores, processo_num)
+
+    # O ritmo é controlado pelo limitador adaptativo; aqui apenas registra a taxa atual
+    if contagem % 25 == 0:
+        logger.info(f'Limitador: {limitador.estatisticas()} | Backend: {backend.estatisticas()}')
+
+    # As mudanças são registradas antes de substituir a extração anterior: se a
+    # execução for interrompida entre as duas etapas, o processo é extraído de novo
+    # e comparado com a mesma extração anterior, em vez de a mudança se perder
+    n_mudancas = mudancas.registrar(classe, processo_num, dados['incidente'], anterior, dados)
+
+    # Grava arquivo individual para este processo
+    with medidor.etapa('gravacao'):
         pasta = 'baixados' if processo_baixado else 'temp'
         arquivo_parcial = f'{pasta}/{classe}{processo_num}_partial.csv'
-        df_row = pd.DataFrame([dados_a_gravar], columns=colunas)
-        df_row.to_csv(arquivo_parcial,
+        df_row = pd.DataFrame([dados_a_gravar], columns=COLUNAS)
+        # Grava em arquivo auxiliar e substitui, para não corromper a versão anterior em caso de interrupção
+        df_row.to_csv(arquivo_parcial + '.tmp',
                       index=False,
                       encoding='utf-8',
                       quoting=1,
                       doublequote=True
                       )
-        status = 'BAIXADO' if processo_baixado else 'TEMP'
-        print(f'  -> Salvo em {pasta}/: {classe}{processo_num} [{status}]')
+        os.replace(arquivo_parcial + '.tmp', arquivo_parcial)
+        if processo_baixado and os.path.exists(arquivo_temp):
+            os.remove(arquivo_temp)
+        registro.concluir(classe, processo_num,
+                          'baixado' if processo_baixado else 'em_andamento',
+                          hashlib.sha256(dsd.js(dados_a_gravar).encode('utf-8')).hexdigest())
+    if anterior is not None:
+        print(f'  -> {n_mudancas} mudança(s) desde a última extração')
+    status = 'BAIXADO' if processo_baixado else 'TEMP'
+    print(f'  -> Salvo em {pasta}/: {classe}{processo_num} [{status}]')
+    return 'baixado' if processo_baixado else 'temp'
+
+
+def processar_tarefas(tarefas: list, backend, trabalhadores: int = NUM_TRABALHADORES,
+                      parar: threading.Event = None, ao_concluir=None):
+    """Processa uma lista de tarefas com um ou mais trabalhadores em paralelo.
+
+    Todos os trabalhadores compartilham o backend (e seu pool de drivers), os caches e o
+    limitador global de requisições, qualquer que seja a classe da tarefa. Em cada
+    intervalo, a extração é interrompida quando mais de LIMITE_NAO_ENCONTRADOS processos
+    seguidos não são encontrados; os processos de listas são sempre buscados.
+
+    Args:
+        tarefas: Tuplas (classe, numero, intervalo), na ordem em que devem ser buscadas.
+            `intervalo` identifica o intervalo de origem, ou é None para processos de listas
+        backend: Backend de obtenção da página
+        trabalhadores: Número de extrações simultâneas
+        parar: Evento que, quando ativado, encerra os trabalhadores após o processo atual
+        ao_concluir: Função opcional (classe, numero, status) chamada após cada processo
+    """
+    fila = queue.Queue()
+    for tarefa in tarefas:
+        fila.put(tarefa)
+
+    lock = threading.Lock()
+    nao_encontrados_seguidos = {}
+
+    def trabalhador():
+        while parar is None or not parar.is_set():
+            try:
+                classe, processo_num, intervalo = fila.get_nowait()
+            except queue.Empty:
+                return
+
+            with lock:
+                if nao_encontrados_seguidos.get(intervalo, 0) > LIMITE_NAO_ENCONTRADOS:
+                    continue
+
+            medidor.iniciar_processo(classe, processo_num)
+            try:
+                status = extrair_processo(classe, processo_num, backend)
+            except Exception as e:
+                logger.exception(f'{classe}{processo_num} - Erro na extração: {e}')
+                status = 'erro'
+            medidor.finalizar_processo(status)
+            if ao_concluir is not None:
+                ao_concluir(classe, processo_num, status)
+
+            if intervalo is None:
+                continue
+            with lock:
+                # Erros de acesso não dizem nada sobre a existência do processo
+                if status == 'nao_encontrado':
+                    nao_encontrados_seguidos[intervalo] = nao_encontrados_seguidos.get(intervalo, 0) + 1
+                    if nao_encontrados_seguidos[intervalo] == LIMITE_NAO_ENCONTRADOS + 1:
+                        print(f'{intervalo}: {LIMITE_NAO_ENCONTRADOS + 1} processos seguidos '
+                              f'não encontrados, encerrando o intervalo')
+                elif status in ('baixado', 'temp'):
+                    nao_encontrados_seguidos[intervalo] = 0
+
+    if trabalhadores <= 1:
+        trabalhador()
+        return
+
+    threads = [threading.Thread(target=trabalhador, name=f'trabalhador-{n + 1}')
+               for n in range(trabalhadores)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def descobrir_ultimo_processo(classe: str, backend, inicio: int = 1,
+                              lacuna: int = LIMITE_NAO_ENCONTRADOS,
+                              amostras: int = AMOSTRAS_FRONTEIRA):
+    """Encontra o maior número de processo existente na classe.
+
+    Parte do maior número já encontrado no registro (ou de `inicio`) e avança
+    com passos que dobram a cada processo encontrado; ao passar da fronteira,
+    faz uma busca binária entre o último número encontrado e o primeiro vazio.
+    Cada ponto consulta até `amostras` números consecutivos, para que números
+    isolados inexistentes não interrompam a busca, e o resultado só é aceito
+    se os `lacuna` números seguintes também não existirem.
+
+    Erros de acesso não contam como processo inexistente: persistindo após as
+    tentativas do backend (e a espera do disjuntor), a busca é interrompida.
+
+    Args:
+        classe: Classe processual (ADI, ADPF, etc.)
+        backend: Backend de obtenção da página
+        inicio: Menor número considerado
+        lacuna: Números inexistentes seguidos que marcam a fronteira
+        amostras: Números consecutivos consultados em cada ponto
+
+    Returns:
+        int: Maior número existente, ou None se nenhum processo for encontrado
+
+    Raises:
+        STFAccessError, WebDriverException, requests.RequestException: Se o portal
+        continuar inacessível
+    """
+    existentes = {}
+
+    def existe(numero: int) -> bool:
+        if numero not in existentes:
+            # Processos inexistentes no registro podem ter sido criados depois; só o positivo é confiável
+            if registro.status(classe, numero) in ('baixado', 'em_andamento'):
+                existentes[numero] = True
+            else:
+                registrar_requisicao()
+                pagina = PaginaProcesso(backend.obter_pagina(URL_PROCESSO.format(classe=classe, numero=numero)))
+                existentes[numero] = (
+                    'Processo não encontrado' not in pagina.inner_html(pagina.por_id('conteudo')) and
+                    pagina.inner_html(pagina.por_id('descricao-procedencia')) != '')
+            print(f'  {classe}{numero}: {"existe" if existentes[numero] else "não encontrado"}')
+        return existentes[numero]
+
+    def existe_perto(numero: int):
+        return next((n for n in range(numero, numero + amostras) if existe(n)), None)
+
+    print(f'Buscando o último processo de {classe}...')
+    base = max(inicio, registro.maior_numero(classe) or 0)
+    ultimo = existe_perto(base)
+    if ultimo is None:
+        ultimo = base - 1
+    passo = 1
+    while True:
+        # Avanço exponencial até passar da fronteira
+        limite = ultimo + passo
+        encontrado = existe_perto(limite)
+        if encontrado is not None:
+            ultimo = encontrado
+            passo *= 2
+            continue
+
+        # Busca binária: `ultimo` existe e não há processos em [limite, limite + amostras)
+        while limite - ultimo > 1:
+            meio = (ultimo + limite) // 2
+            encontrado = existe_perto(meio)
+            if encontrado is None:
+                limite = meio
+            else:
+                ultimo = encontrado
+
+        # Confirma a fronteira: nenhum processo nos `lacuna` números seguintes
+        encontrado = next((n for n in range(ultimo + 1, ultimo + lacuna + 1) if existe(n)), None)
+        if encontrado is None:
+            break
+        ultimo = encontrado
+        passo = 1
+
+    if ultimo < inicio:
+        print(f'Nenhum processo de {classe} encontrado a partir de {inicio}')
+        return None
+    print(f'Último processo de {classe}: {ultimo} ({len(existentes)} número(s) consultado(s))')
+    return ultimo
+
+
+def interpretar_alvo(texto: str) -> tuple:
+    """Interpreta um alvo da linha de comando ou de um arquivo de tarefas.
+
+    Aceita 'ADI:6000-6010' (intervalo), 'ADI:6000-' (do número indicado até o
+    último processo existente, descoberto no início da execução) e 'ADI:130',
+    'ADI 130', 'ADI,130' ou 'ADI130' (processo único). Aspas e colchetes são
+    ignorados, de modo que as linhas no formato de `lista_processos`
+    (['ADI', '130']) também são aceitas.
+
+    Returns:
+        tuple: (classe, número inicial, número final ou None se aberto, se é um intervalo)
+
+    Raises:
+        ValueError: Se o texto não for um alvo válido
+    """
+    limpo = texto.strip().strip('[],').replace("'", '').replace('"', '')
+    match = re.fullmatch(r'([A-Za-z]+)\s*[:,;]?\s*(\d+)(?:\s*(-)\s*(\d*))?', limpo)
+    if match is None:
+        raise ValueError(f'alvo inválido: {texto!r} (use CLASSE:INICIO-FIM, CLASSE:INICIO- ou CLASSE:NUMERO)')
+    classe_alvo, inicio = match.group(1), int(match.group(2))
+    if match.group(3) is None:
+        return classe_alvo, inicio, inicio, False
+    if not match.group(4):
+        return classe_alvo, inicio, None, True
+    if int(match.group(4)) < inicio:
+        raise ValueError(f'intervalo invertido: {texto!r}')
+    return classe_alvo, inicio, int(match.group(4)), True
+
+
+def ler_arquivo_alvos(caminho: str) -> list:
+    """Lê um arquivo de tarefas ou lista de processos: um alvo por linha, '#' inicia comentário."""
+    with open(caminho, encoding='utf-8') as f:
+        return [linha.split('#', 1)[0].strip() for linha in f if linha.split('#', 1)[0].strip()]
+
+
+def montar_tarefas(alvos: list, backend=None) -> list:
+    """Converte os alvos em tarefas (classe, numero, intervalo), sem repetições.
+
+    Args:
+        alvos: Alvos já interpretados por interpretar_alvo()
+        backend: Backend usado para descobrir o fim dos intervalos abertos
+
+    Raises:
+        STFAccessError, WebDriverException, requests.RequestException: Se o portal
+        estiver inacessível durante a descoberta
+    """
+    tarefas = []
+    vistos = set()
+    for classe_alvo, inicio, fim, e_intervalo in alvos:
+        if fim is None:
+            fim = descobrir_ultimo_processo(classe_alvo, backend, inicio)
+            if fim is None:
+                continue
+        intervalo = f'{classe_alvo} {inicio}-{fim}' if e_intervalo else None
+        for numero in range(inicio, fim + 1):
+            if (classe_alvo, numero) not in vistos:
+                vistos.add((classe_alvo, numero))
+                tarefas.append((classe_alvo, numero, intervalo))
+    return tarefas
+
+
+def _data_andamento(texto: str):
+    """Converte a data de um andamento (dd/mm/aaaa) em datetime, ou None se inválida."""
+    try:
+        return datetime.strptime(str(texto).strip(), '%d/%m/%Y')
+    except ValueError:
+        return None
 
 
+def prioridade_atualizacao(andamentos: list, status_processo: str, ultima_busca, agora: datetime) -> float:
+    """Estima a probabilidade de o processo ter andamentos novos desde a última busca.
 
+    A atividade do processo é estimada em andamentos por dia a partir dos
+    andamentos do último ano, reduzida pelo tempo sem movimentação e
+    multiplicada por FATOR_SESSAO_RECENTE se houve sessão ou pauta de
+    julgamento virtual nos últimos SESSAO_RECENTE_DIAS. A probabilidade de
+    ao menos um andamento novo cresce com o tempo desde a última busca.
+
+    Args:
+        andamentos: Andamentos da última extração
+        status_processo: 'Em andamento' ou 'Finalizado'
+        ultima_busca: datetime da última busca, ou None se desconhecida
+        agora: Momento de referência
+
+    Returns:
+        float: Probabilidade entre 0 e 1
+    """
+    if status_processo == 'Finalizado':
+        return 0.0
+    datas = []
+    for andamento in andamentos:
+        data = _data_andamento(andamento.get('data', ''))
+        if data is not None:
+            datas.append((data, andamento.get('nome', '')))
+    if not datas:
+        return 1.0
+
+    dias_sem_movimento = max(0, (agora - max(data for data, _ in datas)).days)
+    andamentos_ultimo_ano = sum(1 for data, _ in datas if (agora - data).days <= 365)
+    taxa = (andamentos_ultimo_ano + 1) / 365 / (1 + dias_sem_movimento / 365)
+    if any((agora - data).days <= SESSAO_RECENTE_DIAS and
+           ('Julgamento Virtual' in nome or 'pauta' in nome.lower())
+           for data, nome in datas):
+        taxa *= FATOR_SESSAO_RECENTE
+
+    dias_desde_busca = (agora - ultima_busca).total_seconds() / 86400 if ultima_busca else 365
+    return 1 - math.exp(-taxa * max(dias_desde_busca, 0))
+
+
+def agendar_atualizacoes(alvos: list, orcamento: int = None, requisicoes_por_processo: int = 1,
+                         agora: datetime = None) -> list:
+    """Seleciona e ordena a atualização dos processos em andamento, pela chance de mudança.
+
+    Os processos 'em_andamento' do registro são ordenados por
+    prioridade_atualizacao(), calculada a partir de temp/; os de prioridade
+    abaixo de PRIORIDADE_MINIMA_ATUALIZACAO são deixados para outra execução,
+    e a seleção para quando o orçamento de requisições se esgota.
+
+    Args:
+        alvos: Alvos já interpretados que limitam as classes e intervalos
+            (vazio: todas as classes do registro)
+        orcamento: Máximo de requisições de páginas na execução (None: sem limite)
+        requisicoes_por_processo: Requisições de página por processo no backend usado
+        agora: Momento de referência (padrão: agora)
+
+    Returns:
+        list: Tarefas (classe, numero, None), da maior para a menor prioridade
+    """
+    agora = agora or datetime.now()
+    if not alvos:
+        alvos = [(classe_registro, 1, None, True) for classe_registro in registro.classes()]
+
+    candidatos = {}
+    for classe_alvo, inicio, fim, _ in alvos:
+        for numero, ultima_busca in registro.listar_buscas(classe_alvo, 'em_andamento').items():
+            if numero < inicio or (fim is not None and numero > fim) or (classe_alvo, numero) in candidatos:
+                continue
+            try:
+                anterior = pd.read_csv(f'temp/{classe_alvo}{numero}_partial.csv',
+                                       usecols=['andamentos_lista', 'status_processo'])
+                andamentos = json.loads(anterior['andamentos_lista'].iloc[0])
+                status_processo = anterior['status_processo'].iloc[0]
+            except Exception:
+                # Sem a extração anterior não há como estimar: o processo é buscado
+                andamentos, status_processo = [], 'Em andamento'
+            ultima_busca = datetime.fromisoformat(ultima_busca) if ultima_busca else None
+            candidatos[(classe_alvo, numero)] = prioridade_atualizacao(andamentos, status_processo,
+                                                                       ultima_busca, agora)
+
+    ordenados = sorted(candidatos.items(), key=lambda item: -item[1])
+    tarefas = [(classe_alvo, numero, None) for (classe_alvo, numero), prioridade in ordenados
+               if prioridade >= PRIORIDADE_MINIMA_ATUALIZACAO]
+    adiados = len(candidatos) - len(tarefas)
+    if orcamento is not None:
+        limite = max(0, orcamento // max(requisicoes_por_processo, 1))
+        adiados += max(0, len(tarefas) - limite)
+        tarefas = tarefas[:limite]
+
+    print(f'Atualização: {len(candidatos)} processo(s) em andamento, {len(tarefas)} selecionado(s), '
+          f'{adiados} adiado(s)' + (f' (orçamento de {orcamento} requisições)' if orcamento is not None else ''))
+    if tarefas:
+        print(f'  prioridade de {candidatos[tarefas[0][:2]]:.2f} a {candidatos[tarefas[-1][:2]]:.2f}')
+    return tarefas
+
+
+class _ManipuladorStatus(BaseHTTPRequestHandler):
+    """Responde a qualquer GET com o status atual do modo contínuo, em JSON."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        corpo = json.dumps(self.server.obter_status(), ensure_ascii=False, indent=2).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+class StatusDaemon:
+    """Situação do modo contínuo, gravada em arquivo JSON e, opcionalmente, servida por HTTP.
+
+    Informa a fila do ciclo atual, os processos concluídos e, por classe, os
+    processos em andamento, o maior número conhecido e a defasagem (horas desde
+    a última busca) dos processos em andamento.
+
+    Args:
+        caminho: Arquivo JSON do status
+        classes: Função que retorna as classes acompanhadas
+        porta: Porta do endpoint HTTP de status (None: apenas o arquivo)
+    """
+
+    def __init__(self, caminho: str, classes, porta: int = None):
+        self.caminho = caminho
+        self._classes = classes
+        self._lock = threading.Lock()
+        self._ultima_gravacao = 0
+        self.dados = {'estado': 'iniciando', 'iniciado_em': datetime.now().isoformat(timespec='seconds'),
+                      'ciclo': 0, 'fila': 0, 'processados_no_ciclo': 0, 'processados_total': 0,
+                      'ultima_descoberta': None}
+        self._servidor = None
+        if porta is not None:
+            self._servidor = ThreadingHTTPServer(('0.0.0.0', porta), _ManipuladorStatus)
+            self._servidor.daemon_threads = True
+            self._servidor.obter_status = self.montar
+            threading.Thread(target=self._servidor.serve_forever, name='status-daemon', daemon=True).start()
+            print(f'Status do modo contínuo em http://localhost:{porta}/')
+
+    def atualizar(self, **valores):
+        with self._lock:
+            self.dados.update(valores)
+
+    def concluir_processo(self, classe: str, numero: int, status: str):
+        """Atualiza a fila após um processo; grava o arquivo no máximo a cada 10 segundos."""
+        with self._lock:
+            self.dados['fila'] = max(0, self.dados['fila'] - 1)
+            self.dados['processados_no_ciclo'] += 1
+            self.dados['processados_total'] += 1
+            gravar = time.monotonic() - self._ultima_gravacao >= 10
+        if gravar:
+            self.gravar()
+
+    def montar(self) -> dict:
+        """Monta o status atual, com a defasagem dos processos em andamento de cada classe."""
+        agora = datetime.now()
+        classes = {}
+        for classe_status in self._classes():
+            atrasos = sorted((agora - datetime.fromisoformat(ultima_busca)).total_seconds() / 3600
+                             for ultima_busca in registro.listar_buscas(classe_status, 'em_andamento').values()
+                             if ultima_busca)
+            classes[classe_status] = {
+                'em_andamento': len(atrasos),
+                'maior_numero': registro.maior_numero(classe_status),
+                'defasagem_horas_p50': round(atrasos[len(atrasos) // 2], 1) if atrasos else None,
+                'defasagem_horas_max': round(atrasos[-1], 1) if atrasos else None}
+        with self._lock:
+            dados = dict(self.dados)
+        return {**dados, 'atualizado_em': agora.isoformat(timespec='seconds'), 'classes': classes,
+                'limitador': limitador.estatisticas(), 'disjuntor': disjuntor.estatisticas()}
+
+    def gravar(self):
+        """Grava o status no arquivo JSON (substituição atômica)."""
+        with self._lock:
+            self._ultima_gravacao = time.monotonic()
+        status = self.montar()
+        with open(self.caminho + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(status, f, ensure_ascii=False, indent=2)
+        os.replace(self.caminho + '.tmp', self.caminho)
+
+    def encerrar(self):
+        self.atualizar(estado='encerrado', fila=0)
+        self.gravar()
+        if self._servidor is not None:
+            self._servidor.shutdown()
+
+
+def executar_daemon(args, backend):
+    """Mantém a extração em execução contínua, com os drivers e caches sempre abertos.
+
+    Cada ciclo busca processos novos no fim das classes (a cada
+    DAEMON_INTERVALO_DESCOBERTA segundos), atualiza os processos em andamento
+    mais prováveis de ter mudado (agendar_atualizacoes, limitado por
+    --orcamento), consolida os arquivos das classes alteradas e aguarda
+    DAEMON_INTERVALO_CICLO segundos. A busca por processos novos só é feita
+    nas classes sem alvo ou com intervalo aberto (ex.: ADI:1-).
+
+    Termina com Ctrl+C ou SIGTERM, após o processo em extração em cada trabalhador.
+
+    Args:
+        args: Argumentos de interpretar_argumentos()
+        backend: Backend de obtenção da página, mantido durante toda a execução
+    """
+    parar = threading.Event()
+    try:
+        signal.signal(signal.SIGTERM, lambda *_: parar.set())
+    except ValueError:
+        pass  # Fora da thread principal, apenas Ctrl+C encerra
+
+    def classes_acompanhadas():
+        return sorted({alvo[0] for alvo in args.alvos}) if args.alvos else registro.classes()
+
+    status = StatusDaemon(DAEMON_STATUS, classes_acompanhadas, args.status_porta)
+    ultima_descoberta = None
+    print(f'Modo contínuo: ciclos a cada {DAEMON_INTERVALO_CICLO}s, status em {DAEMON_STATUS}')
+
+    try:
+        while not parar.is_set():
+            status.atualizar(estado='executando', ciclo=status.dados['ciclo'] + 1, processados_no_ciclo=0)
+            tarefas = []
+
+            # Processos novos além do maior número conhecido de cada classe
+            if ultima_descoberta is None or time.monotonic() - ultima_descoberta >= DAEMON_INTERVALO_DESCOBERTA:
+                alvos_abertos = ([alvo for alvo in args.alvos if alvo[2] is None] if args.alvos else
+                                 [(classe_registro, 1, None, True) for classe_registro in registro.classes()])
+                for classe_alvo, inicio, _, _ in alvos_abertos:
+                    inicio = max(inicio, (registro.maior_numero(classe_alvo) or 0) + 1)
+                    try:
+                        tarefas.extend(montar_tarefas([(classe_alvo, inicio, None, True)], backend))
+                    except (STFAccessError, WebDriverException, requests.RequestException) as e:
+                        logger.error(f'{classe_alvo}: falha na busca por processos novos: {e}')
+                ultima_descoberta = time.monotonic()
+                status.atualizar(ultima_descoberta=datetime.now().isoformat(timespec='seconds'))
+
+            # Processos em andamento, do mais para o menos provável de ter mudado
+            vistos = {tarefa[:2] for tarefa in tarefas}
+            tarefas.extend(tarefa for tarefa in
+                           agendar_atualizacoes(args.alvos, args.orcamento, backend.requisicoes_por_pagina)
+                           if tarefa[:2] not in vistos)
+
+            status.atualizar(fila=len(tarefas))
+            status.gravar()
+            if tarefas:
+                processar_tarefas(tarefas, backend, args.trabalhadores, parar=parar,
+                                  ao_concluir=status.concluir_processo)
+                for classe_tarefa in sorted({tarefa[0] for tarefa in tarefas}):
+                    concatenar_arquivos(classe_tarefa, f'Dados {classe_tarefa}.csv')
+
+            status.atualizar(estado='aguardando', fila=0)
+            status.gravar()
+            parar.wait(DAEMON_INTERVALO_CICLO)
+    except KeyboardInterrupt:
+        # Os demais trabalhadores terminam o processo atual e param
+        parar.set()
+        print('\nModo contínuo interrompido')
+    finally:
+        status.encerrar()
+
+
+class FilaDistribuida:
+    """Fila de lotes de processos compartilhada entre várias máquinas, em SQLite.
+
+    O arquivo fica em uma pasta compartilhada (volume de rede), sem servidor
+    intermediário. Cada alvo é dividido em lotes de FILA_TAMANHO_LOTE processos;
+    cada máquina aluga um lote por vez, com prazo de FILA_PRAZO_LOTE segundos,
+    e renova o aluguel enquanto extrai, registrando o progresso. O lote de uma
+    máquina que parou de renovar (travada, desligada) volta a ser alugado por
+    outra, que continua a partir do progresso registrado.
+
+    Os resultados de cada processo (linha do arquivo parcial e textos dos
+    documentos) são entregues à própria fila, que funciona como saída comum:
+    importar_fila() os traz para o registro local de qualquer máquina, para a
+    consolidação.
+
+    O arquivo usa o journal tradicional do SQLite (o WAL exige memória
+    compartilhada e não funciona entre máquinas). O volume precisa suportar
+    travas de arquivo (ex.: NFSv4, SMB) e os relógios das máquinas devem estar
+    sincronizados, com diferença bem menor que FILA_PRAZO_LOTE.
+
+    Status dos lotes: 'livre', 'alugado' e 'concluido'.
+
+    Args:
+        pasta: Pasta compartilhada onde fica o arquivo FILA_DISTRIBUIDA
+        prazo: Segundos de validade de cada aluguel ou renovação
+    """
+
+    def __init__(self, pasta: str, prazo: float = FILA_PRAZO_LOTE):
+        self.caminho = os.path.join(pasta, FILA_DISTRIBUIDA)
+        self.prazo = prazo
+        self._conexao = None
+        self._lock = threading.Lock()
+
+    def _conectar(self) -> sqlite3.Connection:
+        if self._conexao is None:
+            # isolation_level=None: as transações são abertas explicitamente com BEGIN IMMEDIATE
+            self._conexao = sqlite3.connect(self.caminho, check_same_thread=False,
+                                            isolation_level=None, timeout=60)
+            self._conexao.execute('PRAGMA journal_mode=DELETE')
+            self._conexao.executescript('''
+                CREATE TABLE IF NOT EXISTS lotes (
+                    id INTEGER PRIMARY KEY,
+                    classe TEXT NOT NULL,
+                    inicio INTEGER NOT NULL,
+                    fim INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'livre',
+                    proximo INTEGER NOT NULL,
+                    processados INTEGER NOT NULL DEFAULT 0,
+                    tentativas INTEGER NOT NULL DEFAULT 0,
+                    trabalhador TEXT,
+                    expira_em REAL,
+                    UNIQUE (classe, inicio, fim)
+                );
+                CREATE INDEX IF NOT EXISTS idx_lotes_status ON lotes(status, expira_em);
+                CREATE TABLE IF NOT EXISTS resultados (
+                    classe TEXT NOT NULL,
+                    numero INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    hash_conteudo TEXT,
+                    linha_csv TEXT,
+                    trabalhador TEXT NOT NULL,
+                    entregue_em TEXT NOT NULL,
+                    PRIMARY KEY (classe, numero)
+                );
+                CREATE TABLE IF NOT EXISTS textos (
+                    documento_id TEXT PRIMARY KEY,
+                    texto TEXT NOT NULL,
+                    url TEXT
+                );
+            ''')
+        return self._conexao
+
+    def _transacao(self, funcao):
+        """Executa funcao(conexao) em uma transação exclusiva de escrita e retorna seu resultado."""
+        with self._lock:
+            conexao = self._conectar()
+            conexao.execute('BEGIN IMMEDIATE')
+            try:
+                resultado = funcao(conexao)
+                conexao.execute('COMMIT')
+            except BaseException:
+                conexao.execute('ROLLBACK')
+                raise
+        return resultado
+
+    def criar_lotes(self, classe: str, inicio: int, fim: int, tamanho: int = FILA_TAMANHO_LOTE) -> int:
+        """Divide o intervalo em lotes e os acrescenta à fila (lotes já existentes são mantidos).
+
+        Returns:
+            int: Número de lotes novos
+        """
+        lotes = [(classe, numero, min(numero + tamanho - 1, fim), numero)
+                 for numero in range(inicio, fim + 1, tamanho)]
+
+        def inserir(conexao):
+            antes = conexao.total_changes
+            conexao.executemany('INSERT OR IGNORE INTO lotes (classe, inicio, fim, proximo) '
+                                'VALUES (?, ?, ?, ?)', lotes)
+            return conexao.total_changes - antes
+
+        return self._transacao(inserir)
+
+    def alugar(self, trabalhador: str):
+        """Aluga o próximo lote livre ou com aluguel vencido.
+
+        Returns:
+            dict: id, classe, inicio, fim, proximo, tentativas e o trabalhador
+            anterior, se o aluguel dele venceu; ou None se não há lote disponível
+        """
+        agora = time.time()
+
+        def alugar_lote(conexao):
+            linha = conexao.execute(
+                "SELECT id, classe, inicio, fim, proximo, tentativas, status, trabalhador FROM lotes "
+                "WHERE status = 'livre' OR (status = 'alugado' AND expira_em < ?) "
+                'ORDER BY tentativas, id LIMIT 1', (agora,)).fetchone()
+            if linha is None:
+                return None
+            conexao.execute(
+                "UPDATE lotes SET status = 'alugado', trabalhador = ?, expira_em = ?, "
+                'tentativas = tentativas + 1 WHERE id = ?', (trabalhador, agora + self.prazo, linha[0]))
+            lote_id, classe_lote, inicio, fim, proximo, tentativas, status, anterior = linha
+            return {'id': lote_id, 'classe': classe_lote, 'inicio': inicio, 'fim': fim, 'proximo': proximo,
+                    'tentativas': tentativas + 1, 'anterior': anterior if status == 'alugado' else None}
+
+        return self._transacao(alugar_lote)
+
+    def renovar(self, lote_id: int, trabalhador: str, proximo: int, processados: int) -> bool:
+        """Renova o aluguel e registra o progresso do lote.
+
+        Returns:
+            bool: False se o aluguel foi perdido (venceu e o lote foi alugado por outra máquina)
+        """
+        def renovar_lote(conexao):
+            return conexao.execute(
+                'UPDATE lotes SET expira_em = ?, proximo = ?, processados = ? '
+                "WHERE id = ? AND trabalhador = ? AND status = 'alugado'",
+                (time.time() + self.prazo, proximo, processados, lote_id, trabalhador)).rowcount == 1
+
+        return self._transacao(renovar_lote)
+
+    def devolver(self, lote_id: int, trabalhador: str, proximo: int, concluido: bool):
+        """Encerra o aluguel: o lote é concluído ou volta à fila a partir de `proximo`."""
+        def devolver_lote(conexao):
+            conexao.execute(
+                'UPDATE lotes SET status = ?, proximo = ?, trabalhador = NULL, expira_em = NULL '
+                "WHERE id = ? AND trabalhador = ? AND status = 'alugado'",
+                ('concluido' if concluido else 'livre', proximo, lote_id, trabalhador))
+
+        self._transacao(devolver_lote)
+
+    def entregar(self, classe: str, numero: int, status: str, trabalhador: str,
+                 linha_csv: str = None, textos: list = ()):
+        """Entrega o resultado de um processo e os textos dos documentos referenciados.
+
+        Args:
+            status: 'baixado', 'em_andamento' ou 'nao_encontrado'
+            linha_csv: Conteúdo do arquivo parcial (cabeçalho e linha), exceto se não encontrado
+            textos: Tuplas (documento_id, texto, url)
+        """
+        hash_conteudo = hashlib.sha256(linha_csv.encode('utf-8')).hexdigest() if linha_csv else None
+
+        def gravar(conexao):
+            conexao.executemany('INSERT OR IGNORE INTO textos (documento_id, texto, url) VALUES (?, ?, ?)',
+                                textos)
+            conexao.execute(
+                'INSERT OR REPLACE INTO resultados '
+                '(classe, numero, status, hash_conteudo, linha_csv, trabalhador, entregue_em) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (classe, numero, status, hash_conteudo, linha_csv, trabalhador,
+                 datetime.now().isoformat(timespec='seconds')))
+
+        self._transacao(gravar)
+
+    def entregues(self, classe: str, inicio: int, fim: int) -> set:
+        """Números da classe, no intervalo, com resultado já entregue por qualquer máquina."""
+        with self._lock:
+            return {numero for (numero,) in self._conectar().execute(
+                'SELECT numero FROM resultados WHERE classe = ? AND numero BETWEEN ? AND ?',
+                (classe, inicio, fim))}
+
+    def resultados(self):
+        """Percorre os resultados entregues: (classe, numero, status, hash_conteudo, linha_csv)."""
+        with self._lock:
+            linhas = self._conectar().execute(
+                'SELECT classe, numero, status, hash_conteudo FROM resultados ORDER BY classe, numero').fetchall()
+        for classe_resultado, numero, status, hash_conteudo in linhas:
+            with self._lock:
+                (linha_csv,) = self._conectar().execute(
+                    'SELECT linha_csv FROM resultados WHERE classe = ? AND numero = ?',
+                    (classe_resultado, numero)).fetchone()
+            yield classe_resultado, numero, status, hash_conteudo, linha_csv
+
+    def texto(self, documento_id: str):
+        """Texto e URL de um documento entregue, ou None."""
+        with self._lock:
+            return self._conectar().execute(
+                'SELECT texto, url FROM textos WHERE documento_id = ?', (documento_id,)).fetchone()
+
+    def intervalos(self) -> dict:
+        """Menor e maior número dos lotes de cada classe: classe -> (inicio, fim)."""
+        with self._lock:
+            return {classe_lote: (inicio, fim) for classe_lote, inicio, fim in self._conectar().execute(
+                'SELECT classe, MIN(inicio), MAX(fim) FROM lotes GROUP BY classe ORDER BY classe')}
+
+    def resumo(self) -> dict:
+        """Número de lotes em cada status (aluguéis vencidos contam como 'vencido') e de resultados."""
+        agora = time.time()
+        with self._lock:
+            conexao = self._conectar()
+            resumo = dict(conexao.execute(
+                "SELECT CASE WHEN status = 'alugado' AND expira_em < ? THEN 'vencido' ELSE status END, "
+                'COUNT(*) FROM lotes GROUP BY 1', (agora,)))
+            resumo['resultados'] = conexao.execute('SELECT COUNT(*) FROM resultados').fetchone()[0]
+        return resumo
+
+    def fechar(self):
+        with self._lock:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
+
+
+def _entregar_resultado(fila: FilaDistribuida, classe: str, numero: int, trabalhador: str) -> bool:
+    """Entrega à fila o resultado registrado localmente de um processo.
+
+    Returns:
+        bool: False se o processo não tem resultado (erro de acesso ou em extração)
+    """
+    status, _ = registro.situacao(classe, numero)
+    if status == 'nao_encontrado':
+        fila.entregar(classe, numero, status, trabalhador)
+        return True
+    if status not in ('baixado', 'em_andamento'):
+        return False
+
+    pasta = 'baixados' if status == 'baixado' else 'temp'
+    with open(f'{pasta}/{classe}{numero}_partial.csv', encoding='utf-8') as f:
+        linha_csv = f.read()
+    textos = []
+    andamentos = pd.read_csv(io.StringIO(linha_csv), usecols=['andamentos_lista'])['andamentos_lista'].iloc[0]
+    for documento_id in {andamento['documento_id'] for andamento in json.loads(andamentos)} - {'NA', 'Exception'}:
+        texto = textos_documentos.obter_com_url(documento_id)
+        if texto is not None:
+            textos.append((documento_id, *texto))
+    fila.entregar(classe, numero, status, trabalhador, linha_csv, textos)
+    return True
+
+
+def executar_fila(args, backend, fila: FilaDistribuida):
+    """Extrai os lotes da fila distribuída até que não reste nenhum livre ou vencido.
+
+    Cada lote alugado é extraído como um intervalo (processar_tarefas), pulando
+    os processos já entregues por outras máquinas, e o resultado de cada
+    processo é entregue à fila logo após a extração. Uma thread renova o
+    aluguel a cada FILA_INTERVALO_RENOVACAO segundos, com o progresso; se o
+    aluguel for perdido, a extração do lote é interrompida. Lotes com erros de
+    acesso voltam à fila, até FILA_TENTATIVAS_LOTE aluguéis.
+
+    Enquanto houver lotes alugados por outras máquinas, continua aguardando:
+    se alguma delas parar, seus lotes são realugados quando o aluguel vence.
+
+    Termina com Ctrl+C ou SIGTERM, devolvendo o lote atual à fila.
+
+    Args:
+        args: Argumentos de interpretar_argumentos()
+        backend: Backend de obtenção da página
+        fila: Fila distribuída aberta na pasta compartilhada
+    """
+    parar = threading.Event()
+    lote_atual = {'parar': threading.Event()}
+
+    def interromper(*_):
+        parar.set()
+        lote_atual['parar'].set()
+
+    try:
+        signal.signal(signal.SIGTERM, interromper)
+    except ValueError:
+        pass  # Fora da thread principal, apenas Ctrl+C encerra
+
+    trabalhador = f'{socket.gethostname()}:{os.getpid()}'
+    print(f'Fila distribuída em {fila.caminho} como {trabalhador}: {fila.resumo()}')
+
+    try:
+        while not parar.is_set():
+            lote = fila.alugar(trabalhador)
+            if lote is None:
+                resumo = fila.resumo()
+                if not resumo.get('alugado'):
+                    print(f'Fila distribuída concluída: {resumo}')
+                    return
+                # Outras máquinas ainda extraem: aguarda a conclusão ou o vencimento dos aluguéis
+                parar.wait(FILA_INTERVALO_RENOVACAO)
+                continue
+
+            nome_lote = f'{lote["classe"]} {lote["inicio"]}-{lote["fim"]}'
+            if lote['anterior']:
+                print(f'\nLote {nome_lote}: aluguel de {lote["anterior"]} vencido, retomando do {lote["proximo"]}')
+            else:
+                print(f'\nLote {nome_lote} alugado (tentativa {lote["tentativas"]})')
+
+            entregues = fila.entregues(lote['classe'], lote['proximo'], lote['fim'])
+            pendentes = [numero for numero in range(lote['proximo'], lote['fim'] + 1) if numero not in entregues]
+            progresso = {'pendentes': set(pendentes), 'processados': 0, 'erros': 0}
+            lock = threading.Lock()
+
+            def proximo() -> int:
+                return min(progresso['pendentes'], default=lote['fim'] + 1)
+
+            def ao_concluir(classe_processo, numero, status):
+                entregue = status != 'erro' and _entregar_resultado(fila, classe_processo, numero, trabalhador)
+                with lock:
+                    progresso['pendentes'].discard(numero)
+                    progresso['processados'] += 1
+                    if not entregue:
+                        progresso['erros'] += 1
+
+            lote_atual['parar'] = parar_lote = threading.Event()
+            fim_lote = threading.Event()
+            perdido = threading.Event()
+
+            def renovar():
+                while not fim_lote.wait(FILA_INTERVALO_RENOVACAO):
+                    with lock:
+                        estado = (proximo(), progresso['processados'])
+                    try:
+                        renovado = fila.renovar(lote['id'], trabalhador, *estado)
+                    except sqlite3.Error as e:
+                        # Falha momentânea do volume: tenta de novo na próxima renovação
+                        logger.warning(f'Lote {nome_lote}: falha ao renovar o aluguel: {e}')
+                        continue
+                    if not renovado:
+                        logger.error(f'Lote {nome_lote}: aluguel perdido, interrompendo o lote')
+                        perdido.set()
+                        parar_lote.set()
+                        return
+
+            renovacao = threading.Thread(target=renovar, name='renovacao-lote', daemon=True)
+            renovacao.start()
+            try:
+                processar_tarefas([(lote['classe'], numero, nome_lote) for numero in pendentes], backend,
+                                  args.trabalhadores, parar=parar_lote, ao_concluir=ao_concluir)
+            finally:
+                fim_lote.set()
+                renovacao.join()
+                if not perdido.is_set():
+                    # Lotes interrompidos voltam à fila a partir do primeiro processo pendente;
+                    # lotes com erros, desde o início (os processos já entregues são pulados)
+                    concluido = not parar.is_set() and (
+                        not progresso['erros'] or lote['tentativas'] >= FILA_TENTATIVAS_LOTE)
+                    fila.devolver(lote['id'], trabalhador, proximo() if parar.is_set() else
+                                  lote['fim'] + 1 if concluido else lote['inicio'], concluido)
+            print(f'Lote {nome_lote}: {progresso["processados"]} processo(s), {progresso["erros"]} erro(s)'
+                  + ('' if perdido.is_set() or parar.is_set() else
+                     ' - concluído' if concluido else ' - devolvido à fila'))
+    except KeyboardInterrupt:
+        parar.set()
+        print('\nFila distribuída interrompida')
+
+
+def importar_fila(fila: FilaDistribuida) -> list:
+    """Traz os resultados entregues à fila para o registro e as pastas locais.
+
+    Os arquivos parciais são gravados em baixados/ ou temp/ e os textos dos
+    documentos em textos_documentos; apenas os processos cujo conteúdo mudou
+    desde a última importação são regravados. Cada processo importado é
+    comparado com o arquivo parcial local que ele substitui, e as diferenças
+    são acrescentadas ao mudancas.jsonl desta pasta; o mudancas.jsonl de cada
+    máquina registra apenas as suas próprias extrações e não passa pela fila.
+
+    Returns:
+        list: Classes com processos importados
+    """
+    importados = {}
+    for classe_resultado, numero, status, hash_conteudo, linha_csv in fila.resultados():
+        if registro.situacao(classe_resultado, numero) == (status, hash_conteudo):
+            continue
+        if linha_csv is not None:
+            linha = pd.read_csv(io.StringIO(linha_csv), dtype=str, keep_default_na=False,
+                                usecols=['incidente', 'partes_total', 'andamentos_lista', 'deslocamentos_lista']).iloc[0]
+            nova = {'andamentos_lista': json.loads(linha['andamentos_lista']),
+                    'deslocamentos_lista': json.loads(linha['deslocamentos_lista']),
+                    'partes_total': json.loads(linha['partes_total'])}
+            for documento_id in {andamento['documento_id'] for andamento in nova['andamentos_lista']}:
+                texto = fila.texto(documento_id)
+                if texto is not None:
+                    textos_documentos.gravar(*texto)
+
+            # Compara com a versão local que será substituída (em andamento ou já
+            # baixada), antes de substituí-la, como em _extrair_processo_reivindicado
+            anterior = None
+            for pasta_anterior in ('temp', 'baixados'):
+                arquivo_anterior = f'{pasta_anterior}/{classe_resultado}{numero}_partial.csv'
+                if os.path.exists(arquivo_anterior):
+                    anterior = carregar_processo_anterior(arquivo_anterior)
+                    break
+            mudancas.registrar(classe_resultado, numero, linha['incidente'], anterior, nova)
+
+            pasta = 'baixados' if status == 'baixado' else 'temp'
+            arquivo_parcial = f'{pasta}/{classe_resultado}{numero}_partial.csv'
+            with open(arquivo_parcial + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(linha_csv)
+            os.replace(arquivo_parcial + '.tmp', arquivo_parcial)
+            if status == 'baixado' and os.path.exists(f'temp/{classe_resultado}{numero}_partial.csv'):
+                os.remove(f'temp/{classe_resultado}{numero}_partial.csv')
+        registro.importar(classe_resultado, numero, status, hash_conteudo)
+        importados[classe_resultado] = importados.get(classe_resultado, 0) + 1
+
+    for classe_resultado, quantidade in importados.items():
+        print(f'{classe_resultado}: {quantidade} processo(s) importado(s) da fila')
+    if not importados:
+        print('Nenhum resultado novo na fila')
+    return sorted(importados)
+
+
+def interpretar_argumentos(argv: list = None) -> argparse.Namespace:
+    """Interpreta a linha de comando; args.alvos recebe os alvos já interpretados."""
+    parser = argparse.ArgumentParser(
+        description='Extrai dados processuais do portal do STF.',
+        epilog='Sem alvos, usa as variáveis classe, num_inicial e num_final (ou lista_processos, '
+               'se estiver ativa) definidas no início do script.')
+    parser.add_argument('alvos', nargs='*', metavar='ALVO',
+                        help='Classe e intervalo ou número, ex.: ADI:6000-6010 ADPF:1-100 ADC:42. '
+                             'ADI:6000- vai até o último processo existente')
+    parser.add_argument('-a', '--arquivo', action='append', default=[], metavar='ARQUIVO',
+                        help='Arquivo de tarefas ou lista de processos, com um alvo por linha '
+                             '(pode ser repetido)')
+    parser.add_argument('-t', '--trabalhadores', type=int, default=NUM_TRABALHADORES,
+                        help=f'Extrações simultâneas (padrão: {NUM_TRABALHADORES})')
+    parser.add_argument('-b', '--backend', choices=sorted(BACKENDS), default=BACKEND,
+                        help=f'Forma de obter as páginas (padrão: {BACKEND})')
+    parser.add_argument('--atualizar', action='store_true',
+                        help='Atualiza apenas os processos em andamento do registro (dentro dos alvos, '
+                             'se houver), do mais para o menos provável de ter mudado')
+    parser.add_argument('--orcamento', type=int, default=ORCAMENTO_ATUALIZACAO, metavar='N',
+                        help='Com --atualizar, máximo de requisições de páginas na execução')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Modo contínuo: atualiza os processos em andamento e busca processos novos '
+                             'em ciclos, sem encerrar (Ctrl+C ou SIGTERM para terminar)')
+    parser.add_argument('--status-porta', type=int, default=None, metavar='PORTA',
+                        help=f'Com --daemon, serve o status (também gravado em {DAEMON_STATUS}) por HTTP')
+    parser.add_argument('--fila', default=None, metavar='PASTA',
+                        help='Divide a extração entre várias máquinas por uma fila de lotes na pasta '
+                             'compartilhada PASTA; os alvos, se houver, são acrescentados à fila')
+    parser.add_argument('--consolidar', action='store_true',
+                        help='Com --fila, apenas importa os resultados entregues pelas máquinas e '
+                             'consolida os arquivos finais na pasta atual')
+    parser.add_argument('--gravar', default=GRAVAR_FIXTURES, metavar='PASTA',
+                        help='Grava as páginas e documentos recebidos em PASTA, para reprodução '
+                             'com portal_simulado.py')
+    parser.add_argument('--portal', default=PORTAL_SIMULADO, metavar='URL',
+                        help='Acessa o portal simulado em URL (ex.: http://127.0.0.1:8000) '
+                             'em vez do portal do STF')
+    args = parser.parse_args(argv)
+
+    alvos = list(args.alvos)
+    try:
+        for arquivo in args.arquivo:
+            alvos.extend(ler_arquivo_alvos(arquivo))
+    except OSError as e:
+        parser.error(f'não foi possível ler {e.filename}: {e.strerror}')
+    if args.consolidar and not args.fila:
+        parser.error('--consolidar exige --fila')
+    if not alvos and not args.arquivo and not args.atualizar and not args.daemon and not args.fila:
+        if 'lista_processos' in globals():
+            alvos = [f'{item[0]}:{item[1]}' for item in globals()['lista_processos']]
+        else:
+            alvos = [f'{classe}:{num_inicial}-{num_final}']
+
+    try:
+        args.alvos = [interpretar_alvo(alvo) for alvo in alvos]
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def _separar_textos_json(valor):
+    """Aplica separar_textos() a uma lista de andamentos em JSON, se ela tiver textos inline."""
+    if not isinstance(valor, str) or 'link_conteúdo' not in valor:
+        return valor
+    return dsd.js(separar_textos(json.loads(valor)))
+
+
+def _decisoes_como_indices(valor):
+    """Converte decisões em JSON no formato antigo (andamentos completos) nos index dos andamentos."""
+    if not isinstance(valor, str) or '{' not in valor:
+        return valor
+    return dsd.js([decisao['index'] for decisao in json.loads(valor)])
+
+
+def _ler_parcial(caminho: str) -> pd.DataFrame:
+    """Lê um arquivo parcial, convertendo textos inline e decisões do formato antigo."""
+    df = pd.read_csv(caminho)
+    df['andamentos_lista'] = df['andamentos_lista'].map(_separar_textos_json)
+    df['decisões'] = df['decisões'].map(_decisoes_como_indices)
+    return df
+
+
+def _gravar_parciais(arquivos: list, destino: str, cabecalho: bool):
+    """Acrescenta os arquivos parciais ao destino, um por vez (memória limitada a um processo)."""
+    for caminho in arquivos:
+        _ler_parcial(caminho).to_csv(destino, mode='a', header=cabecalho, index=False,
+                                     encoding='utf-8', quoting=1, doublequote=True)
+        cabecalho = False
+
+
+def _numeros_processo(nomes) -> list:
+    """Número de cada processo a partir de nome_processo ('ADI 6000'); sem número, repete o anterior."""
+    numeros = []
+    anterior = 0
+    for nome in nomes:
+        match = re.search(r'(\d+)\s*$', str(nome or ''))
+        anterior = int(match.group(1)) if match else anterior
+        numeros.append(anterior)
+    return numeros
+
+
+def _pendentes_ate(pendentes: list, posicao: int, limite) -> int:
+    """Posição do primeiro processo pendente com número maior que `limite` (None: até o fim)."""
+    while posicao < len(pendentes) and (limite is None or pendentes[posicao][0] <= limite):
+        posicao += 1
+    return posicao
+
+
+def _campos_texto(*campos) -> list:
+    return [(campo, pa.int64() if campo in ('index', '_index') else pa.string()) for campo in campos]
+
+
+# Esquema do arquivo Parquet: as listas gravadas como JSON no CSV viram colunas aninhadas
+_ANDAMENTOS_PARQUET = pa.list_(pa.struct(_campos_texto(
+    'index', 'data', 'nome', 'complemento', 'julgador', 'validade', 'link', 'link_tipo', 'documento_id')))
+ESQUEMA_PARQUET = pa.schema([
+    ('incidente', pa.string()),
+    ('classe', pa.string()),
+    ('nome_processo', pa.string()),
+    ('classe_extenso', pa.string()),
+    ('tipo_processo', pa.string()),
+    ('liminar', pa.list_(pa.string())),
+    ('origem', pa.string()),
+    ('relator', pa.string()),
+    ('autor1', pa.string()),
+    ('len(partes_total)', pa.int64()),
+    ('partes_total', pa.list_(pa.struct(_campos_texto('_index', 'tipo', 'nome')))),
+    ('data_protocolo', pa.string()),
+    ('origem_orgao', pa.string()),
+    ('lista_assuntos', pa.list_(pa.string())),
+    ('len(andamentos_lista)', pa.int64()),
+    ('andamentos_lista', _ANDAMENTOS_PARQUET),
+    ('len(decisões)', pa.int64()),
+    ('decisões', pa.list_(pa.int64())),  # index dos andamentos decisórios
+    ('len(deslocamentos)', pa.int64()),
+    ('deslocamentos_lista', pa.list_(pa.struct(_campos_texto(
+        'index', 'data_recebido', 'enviado por', 'recebido por', 'guia')))),
+    ('status_processo', pa.string()),
+])
+
+
+def _linha_parquet(linha: dict) -> dict:
+    """Converte uma linha lida do CSV parcial para os tipos do esquema Parquet."""
+    convertida = {}
+    for campo in ESQUEMA_PARQUET:
+        valor = linha.get(campo.name)
+        if not isinstance(valor, (list, dict)) and pd.isna(valor):
+            valor = None
+        if pa.types.is_list(campo.type):
+            if isinstance(valor, str):
+                # Listas de dicionários estão em JSON (dsd.js); listas de textos, como repr do Python
+                try:
+                    valor = json.loads(valor)
+                except ValueError:
+                    try:
+                        valor = ast.literal_eval(valor)
+                    except (ValueError, SyntaxError):
+                        pass
+            if campo.name == 'andamentos_lista' and isinstance(valor, list):
+                valor = separar_textos(valor)
+            if campo.name == 'decisões' and isinstance(valor, list):
+                # Formato antigo: as decisões eram cópias dos andamentos
+                valor = [item['index'] if isinstance(item, dict) else item for item in valor]
+            if not isinstance(valor, list):
+                valor = [] if valor is None or not pa.types.is_string(campo.type.value_type) else [str(valor)]
+            elif pa.types.is_integer(campo.type.value_type):
+                valor = [int(item) for item in valor]
+            elif not pa.types.is_struct(campo.type.value_type):
+                valor = [str(item) for item in valor]
+        elif pa.types.is_integer(campo.type):
+            valor = int(valor) if valor is not None else None
+        elif valor is not None:
+            valor = str(valor)
+        convertida[campo.name] = valor
+    return convertida
+
+
+def _consolidar_csv(arquivo: str, pendentes: list, recriar: bool, ultimo_consolidado: int = None) -> str:
+    """Grava os processos pendentes no CSV consolidado (ver concatenar_arquivos).
+
+    Args:
+        pendentes: Tuplas (numero, hash_conteudo, ja_consolidado, caminho), em ordem de número
+        ultimo_consolidado: Maior número já consolidado no arquivo; processos novos
+            só são acrescentados ao final se vierem depois dele
+    """
+    caminhos = [caminho for *_, caminho in pendentes]
+    if recriar:
+        destino = arquivo + '.tmp'
+        if os.path.exists(destino):
+            os.remove(destino)
+        _gravar_parciais(caminhos, destino, cabecalho=True)
+        os.replace(destino, arquivo)
+        return f'Arquivo final criado: {arquivo}'
+
+    if (not any(ja_consolidado for _, _, ja_consolidado, _ in pendentes)
+            and pendentes[0][0] > (ultimo_consolidado or 0)):
+        # Apenas processos novos, após o último consolidado: acrescenta ao final, sem reler o arquivo
+        _gravar_parciais(caminhos, arquivo, cabecalho=False)
+        return f'{len(pendentes)} processo(s) novo(s) acrescentado(s) a {arquivo}'
+
+    # Regrava o arquivo em lotes, removendo as linhas dos processos alterados e
+    # intercalando os pendentes por número, para que o arquivo continue em ordem
+    substituidos = set()
+    for _, _, ja_consolidado, caminho in pendentes:
+        if ja_consolidado:
+            substituidos.update(pd.read_csv(caminho, usecols=['incidente'], dtype=str)['incidente'])
+    destino = arquivo + '.tmp'
+    cabecalho = True
+    posicao = 0
+    for lote in pd.read_csv(arquivo, dtype=str, keep_default_na=False, chunksize=CONSOLIDACAO_LOTE):
+        lote = lote[~lote['incidente'].isin(substituidos)]
+        if lote.empty:
+            continue
+        numeros = _numeros_processo(lote['nome_processo'])
+        fim = _pendentes_ate(pendentes, posicao, numeros[-1])
+        if fim > posicao:
+            lote = pd.concat([lote.assign(_numero=numeros)] +
+                             [_ler_parcial(caminho).assign(_numero=numero)
+                              for numero, _, _, caminho in pendentes[posicao:fim]], ignore_index=True)
+            lote = lote.sort_values('_numero', kind='stable').drop(columns='_numero')
+            posicao = fim
+        lote.to_csv(destino, mode='w' if cabecalho else 'a', header=cabecalho, index=False,
+                    encoding='utf-8', quoting=1, doublequote=True)
+        cabecalho = False
+    _gravar_parciais(caminhos[posicao:], destino, cabecalho=cabecalho)
+    os.replace(destino, arquivo)
+    return f'{len(pendentes)} processo(s) novo(s) ou alterado(s) atualizado(s) em {arquivo}'
+
+
+def _consolidar_parquet(arquivo: str, pendentes: list, recriar: bool) -> str:
+    """Grava os processos pendentes no Parquet consolidado (ver concatenar_arquivos).
+
+    Um arquivo Parquet não aceita acréscimos: os grupos de linhas existentes são
+    copiados em lotes, sem os processos pendentes, e os pendentes são intercalados
+    por número, para que o arquivo continue em ordem. A memória usada é limitada a
+    CONSOLIDACAO_LOTE linhas, mais os pendentes intercalados em cada lote.
+    """
+    destino = arquivo + '.tmp'
+    posicao = 0
+    with pq.ParquetWriter(destino, ESQUEMA_PARQUET, compression='zstd') as escritor:
+        if not recriar:
+            substituidos = set()
+            for _, _, _, caminho in pendentes:
+                substituidos.update(pd.read_csv(caminho, usecols=['incidente'], dtype=str)['incidente'].dropna())
+            incidentes = pa.array(sorted(substituidos), pa.string())
+            for lote in pq.ParquetFile(arquivo).iter_batches(batch_size=CONSOLIDACAO_LOTE):
+                tabela = pa.Table.from_batches([lote], schema=ESQUEMA_PARQUET)
+                tabela = tabela.filter(pc.invert(pc.is_in(tabela['incidente'], incidentes)))
+                if tabela.num_rows == 0:
+                    continue
+                numeros = _numeros_processo(tabela['nome_processo'].to_pylist())
+                fim = _pendentes_ate(pendentes, posicao, numeros[-1])
+                if fim > posicao:
+                    tabela = pa.concat_tables([tabela, pa.Table.from_pylist(
+                        [_linha_parquet(pd.read_csv(caminho).iloc[0].to_dict())
+                         for _, _, _, caminho in pendentes[posicao:fim]], schema=ESQUEMA_PARQUET)])
+                    numeros += [numero for numero, _, _, _ in pendentes[posicao:fim]]
+                    tabela = tabela.take(pc.sort_indices(pa.array(numeros)))
+                    posicao = fim
+                escritor.write_table(tabela)
+
+        linhas = []
+        for _, _, _, caminho in pendentes[posicao:]:
+            linhas.append(_linha_parquet(pd.read_csv(caminho).iloc[0].to_dict()))
+            if len(linhas) >= CONSOLIDACAO_LOTE:
+                escritor.write_table(pa.Table.from_pylist(linhas, schema=ESQUEMA_PARQUET))
+                linhas = []
+        if linhas:
+            escritor.write_table(pa.Table.from_pylist(linhas, schema=ESQUEMA_PARQUET))
+    os.replace(destino, arquivo)
+    if recriar:
+        return f'Arquivo final criado: {arquivo}'
+    return f'{len(pendentes)} processo(s) novo(s) ou alterado(s) atualizado(s) em {arquivo}'
+
+
+def _consolidar(classe: str, arquivo: str):
+    """Consolida os processos novos ou alterados da classe em um arquivo final (CSV ou Parquet)."""
+    tamanho_registrado = registro.tamanho_consolidado(arquivo)
+    recriar = not os.path.exists(arquivo) or os.path.getsize(arquivo) != tamanho_registrado
+    if not recriar and arquivo.endswith('.parquet') and not pq.read_schema(arquivo).equals(ESQUEMA_PARQUET):
+        recriar = True
+    if not recriar and arquivo.endswith('.csv'):
+        # CSV gravado antes da separação dos textos (andamentos com link_conteúdo)
+        # ou antes das decisões por referência (decisões com os andamentos completos)
+        primeira = pd.read_csv(arquivo, usecols=['andamentos_lista', 'decisões'], nrows=1)
+        recriar = not primeira.empty and ('link_conteúdo' in str(primeira['andamentos_lista'].iloc[0]) or
+                                          '{' in str(primeira['decisões'].iloc[0]))
+    if recriar and os.path.exists(arquivo):
+        print(f'  {arquivo} sem registro de consolidação, alterado ou em formato antigo: recriando')
+
+    pendentes = []
+    for numero, status, hash_conteudo, ja_consolidado in registro.pendentes_consolidacao(
+            '' if recriar else arquivo, classe):
+        pasta = 'baixados' if status == 'baixado' else 'temp'
+        caminho = f'{pasta}/{classe}{numero}_partial.csv'
+        if os.path.exists(caminho):
+            pendentes.append((numero, hash_conteudo, ja_consolidado, caminho))
+
+    if recriar and not pendentes:
+        print(f'AVISO: Nenhum arquivo parcial encontrado para {arquivo}!')
+        return
+    if not pendentes:
+        print(f'\nOK {arquivo} já está atualizado')
+        return
+
+    if arquivo.endswith('.parquet'):
+        mensagem = _consolidar_parquet(arquivo, pendentes, recriar)
     else:
-        driver.quit()
-        processonaoencontrado += 1
-        time.sleep(0.5)
-
-        # Salva marcador de processo não encontrado para evitar rebuscas
-        arquivo_nao_encontrado = f'nao_encontrados/{classe}{processo_num}_partial.csv'
-        # Cria arquivo vazio como marcador
-        with open(arquivo_nao_encontrado, 'w', encoding='utf-8') as f:
-            f.write('')
-        print(f'  -> Não encontrado: {classe}{processo_num}')
+        mensagem = _consolidar_csv(arquivo, pendentes, recriar, registro.maior_consolidado(arquivo, classe))
+    print(f'\nOK {mensagem}')
+    registro.marcar_consolidados(arquivo, classe,
+                                 [(numero, hash_conteudo) for numero, hash_conteudo, _, _ in pendentes],
+                                 os.path.getsize(arquivo), reiniciar=recriar)
+
 
-# Concatena todos os arquivos parciais
-print('\n' + '='*60)
-print('Concatenando arquivos parciais...')
-
-# Coleta arquivos de ambas as pastas (não inclui nao_encontrados)
-arquivos_temp = [('temp', f) for f in os.listdir('temp') if f.startswith(classe) and f.endswith('_partial.csv')]
-arquivos_baixados = [('baixados', f) for f in os.listdir('baixados') if f.startswith(classe) and f.endswith('_partial.csv')]
-arquivos_nao_encontrados = [f for f in os.listdir('nao_encontrados') if f.startswith(classe) and f.endswith('_partial.csv')]
-todos_arquivos = arquivos_temp + arquivos_baixados
-
-if todos_arquivos:
-    # Ordena arquivos pelo número do processo
-    todos_arquivos.sort(key=lambda x: int(''.join(filter(str.isdigit, x[1]))))
-
-    # Lê e concatena todos os arquivos
-    dfs = []
-    for pasta, arquivo in todos_arquivos:
-        caminho = os.path.join(pasta, arquivo)
-        dfs.append(pd.read_csv(caminho))
-        print(f'  OK Lido de {pasta}/: {arquivo}')
-
-    # Concatena e salva arquivo final
-    df_final = pd.concat(dfs, ignore_index=True)
-    df_final.to_csv(csv_file, index=False, encoding='utf-8', quoting=1, doublequote=True)
-
-    print(f'\nOK Arquivo final criado: {csv_file}')
-    print(f'  Total de processos: {len(df_final)}')
-    print(f'  - Baixados: {len(arquivos_baixados)}')
-    print(f'  - Em andamento: {len(arquivos_temp)}')
-    print(f'  - Não encontrados: {len(arquivos_nao_encontrados)}')
-
-    # Remove apenas arquivos temporários (mantém os baixados e não encontrados)
-    if arquivos_temp:
-        print('\nLimpando arquivos temporários...')
-        for pasta, arquivo in arquivos_temp:
-            os.remove(os.path.join(pasta, arquivo))
-        print(f'  OK {len(arquivos_temp)} arquivo(s) temporário(s) removido(s)')
-    print(f'  Mantidos {len(arquivos_baixados)} arquivo(s) em baixados/')
-    print(f'  Mantidos {len(arquivos_nao_encontrados)} marcador(es) em nao_encontrados/')
-else:
-    print('AVISO: Nenhum arquivo parcial encontrado!')
-
-print('='*60)
-print('Extração finalizada!')
+def concatenar_arquivos(classe: str, csv_file: str):
+    """Consolida os arquivos parciais da classe nos arquivos finais, de forma incremental.
+
+    Apenas os processos cujo conteúdo mudou desde a última consolidação (segundo o
+    hash registrado) são gravados. No CSV, processos novos após o último
+    consolidado são acrescentados ao final do arquivo; nos demais casos, o arquivo
+    é regravado em lotes de CONSOLIDACAO_LOTE linhas, substituindo as linhas dos
+    processos alterados e intercalando os pendentes, de modo que os arquivos
+    finais permanecem em ordem de número.
+    O Parquet (mesmo nome, extensão .parquet) guarda andamentos, decisões, partes e
+    deslocamentos como colunas aninhadas e é regravado em lotes. Em ambos os casos,
+    a memória usada não depende do número total de processos.
+
+    Cada arquivo é recriado do zero se não existir ou se tiver sido alterado fora do extrator.
+
+    Args:
+        classe: Classe processual (ADI, ADPF, etc.)
+        csv_file: Arquivo CSV consolidado
+    """
+    print('Consolidando arquivos parciais...')
+
+    for formato in FORMATOS_SAIDA:
+        _consolidar(classe, csv_file if formato == 'csv' else os.path.splitext(csv_file)[0] + '.parquet')
+
+    contagem = registro.contar(classe)
+    print(f'  - Baixados: {contagem.get("baixado", 0)}')
+    print(f'  - Em andamento: {contagem.get("em_andamento", 0)}')
+    print(f'  - Não encontrados: {contagem.get("nao_encontrado", 0)}')
+    print(f'  - Com erro de acesso: {contagem.get("erro_acesso", 0)}')
+
+    # Remove apenas arquivos temporários (mantém os baixados).
+    # Na atualização incremental, os arquivos de temp/ são a base da próxima execução.
+    if not ATUALIZACAO_INCREMENTAL:
+        arquivos_temp = [f'temp/{classe}{numero}_partial.csv'
+                         for numero in registro.listar(classe, 'em_andamento')]
+        arquivos_temp = [caminho for caminho in arquivos_temp if os.path.exists(caminho)]
+        for caminho in arquivos_temp:
+            os.remove(caminho)
+        print(f'\n  OK {len(arquivos_temp)} arquivo(s) temporário(s) removido(s)')
+
+
+def main(argv: list = None):
+    global PORTAL_SIMULADO
+    args = interpretar_argumentos(argv)
+    medidor.abrir()
+    if args.gravar:
+        gravador.abrir(args.gravar)
+        print(f'Gravando as respostas do portal em {args.gravar}')
+    if args.portal:
+        PORTAL_SIMULADO = args.portal
+        print(f'Usando o portal simulado em {PORTAL_SIMULADO}')
+
+    # Garante que os diretórios existem
+    os.makedirs('dados', exist_ok=True)
+    os.makedirs('temp', exist_ok=True)
+    os.makedirs('baixados', exist_ok=True)  # Processos finalizados (não são reprocessados)
+
+    # Importa a situação registrada pelas pastas de marcadores de versões anteriores
+    registro.migrar_marcadores()
+    # Processos que ficaram em 'processando' em uma execução interrompida desta máquina
+    registro.liberar_abandonados()
+
+    fila = FilaDistribuida(args.fila) if args.fila else None
+    if args.consolidar:
+        # Sem extração: apenas traz os resultados das máquinas e consolida
+        intervalos = fila.intervalos()
+        for classe_fila in importar_fila(fila):
+            inicio, fim = intervalos.get(classe_fila, (None, None))
+            concatenar_arquivos(classe_fila, f'Dados {classe_fila} de {inicio} a {fim}.csv'
+                                if inicio is not None else f'Dados {classe_fila}.csv')
+        textos_documentos.fechar()
+        fila.fechar()
+        medidor.fechar()
+        return
+
+    # Drivers Chrome reutilizados durante toda a execução, por todas as classes, um por trabalhador
+    limitador.capacidade = args.trabalhadores
+    pool_drivers = PoolDrivers(tamanho=max(POOL_DRIVERS, args.trabalhadores))
+    backend = BACKENDS[args.backend](pool_drivers)
+
+    # No modo contínuo, as tarefas e a consolidação são feitas a cada ciclo. Na fila
+    # distribuída, os alvos viram lotes e a consolidação é feita com --consolidar
+    tarefas = []
+    csv_files = {}
+    if fila is not None:
+        try:
+            for classe_alvo, inicio, fim, _ in args.alvos:
+                if fim is None:
+                    fim = descobrir_ultimo_processo(classe_alvo, backend, inicio)
+                    if fim is None:
+                        continue
+                novos = fila.criar_lotes(classe_alvo, inicio, fim)
+                print(f'{classe_alvo} {inicio}-{fim}: {novos} lote(s) novo(s) na fila')
+        except Exception:
+            backend.encerrar()
+            raise
+    elif not args.daemon:
+        # Intervalos abertos (ADI:6000-) vão até o último processo existente, descoberto agora
+        try:
+            if args.atualizar:
+                tarefas = agendar_atualizacoes(args.alvos, args.orcamento, backend.requisicoes_por_pagina)
+            else:
+                tarefas = montar_tarefas(args.alvos, backend)
+        except Exception:
+            backend.encerrar()
+            raise
+        if not tarefas:
+            backend.encerrar()
+            medidor.fechar()
+            print('Nenhum processo a extrair')
+            return
+
+        # Define os nomes dos arquivos finais, um por classe
+        numeros_por_classe = {}
+        for classe_tarefa, numero, _ in tarefas:
+            numeros_por_classe.setdefault(classe_tarefa, []).append(numero)
+        csv_files = {classe_tarefa: ('Dados ' +
+                                     classe_tarefa + ' de ' +
+                                     str(min(numeros)) + ' a ' +
+                                     str(max(numeros)) + '.csv')
+                     for classe_tarefa, numeros in numeros_por_classe.items()}
+        # xlsx_file = 'dados/Dados_processuais.xlsx'
+
+        print(f'{len(tarefas)} processo(s) de {len(csv_files)} classe(s): {", ".join(csv_files)}')
+
+    try:
+        if fila is not None:
+            executar_fila(args, backend, fila)
+        elif args.daemon:
+            executar_daemon(args, backend)
+        else:
+            processar_tarefas(tarefas, backend, args.trabalhadores)
+    finally:
+        # Encerra os drivers que ficaram abertos no pool
+        estatisticas = backend.estatisticas()
+        backend.encerrar()
+        downloader.encerrar()
+        extrator_documentos.encerrar()
+        estatisticas_cache = cache_documentos.estatisticas()
+        cache_documentos.fechar()
+        if fila is not None:
+            fila.fechar()
+
+    print('\n' + '='*60)
+    print(f'Drivers criados: {estatisticas["criados"]} | '
+          f'reutilizações: {estatisticas["reutilizacoes"]} | '
+          f'reciclados: {estatisticas["reciclados"]}')
+    if backend.nome == 'http':
+        print(f'Páginas por HTTP: {estatisticas["paginas_http"]} | '
+              f'fallbacks para o navegador: {estatisticas["fallbacks"]}')
+    estatisticas_limitador = limitador.estatisticas()
+    print(f'Taxa final: {estatisticas_limitador["por_minuto"]} requisições/min | '
+          f'reduções por bloqueio ou lentidão: {estatisticas_limitador["reducoes"]}')
+    estatisticas_disjuntor = disjuntor.estatisticas()
+    print(f'Disjuntor aberto {estatisticas_disjuntor["aberturas"]} vez(es) | '
+          f'{estatisticas_disjuntor["tempo_suspenso"]}s de suspensão')
+    estatisticas_extracao = extrator_documentos.estatisticas()
+    print(f'Documentos extraídos: {estatisticas_extracao["documentos"]} | '
+          f'{estatisticas_extracao["paginas"]} página(s) | '
+          f'{estatisticas_extracao["paginas_por_segundo"]} páginas/s | '
+          f'{estatisticas_extracao["interrompidos"]} interrompido(s) por tempo')
+    print(f'Cache de documentos: {estatisticas_cache["acertos"]} acerto(s) | '
+          f'{estatisticas_cache["falhas"]} falha(s) | '
+          f'{estatisticas_cache["removidos"]} removido(s) | '
+          f'{estatisticas_cache["tamanho_mb"]} MB')
+    # Consolida os processos novos ou alterados no arquivo final de cada classe
+    for classe_tarefa, csv_file in csv_files.items():
+        concatenar_arquivos(classe_tarefa, csv_file)
+    textos_documentos.fechar()
+
+    # Resumo dos tempos por etapa (também gravado no log da execução)
+    resumo = medidor.fechar()
+    print(f'\nProcessos por hora: {resumo["processos_por_hora"]} | {resumo["processos"]}')
+    print(f'{"Etapa":<20}{"n":>8}{"total (s)":>12}{"p50":>9}{"p90":>9}{"p99":>9}')
+    for etapa, valores in sorted(resumo['etapas'].items(), key=lambda item: -item[1]['total']):
+        print(f'{etapa:<20}{valores["n"]:>8}{valores["total"]:>12}'
+              f'{valores["p50"]:>9}{valores["p90"]:>9}{valores["p99"]:>9}')
+    print(f'Log da execução: {medidor.caminho}')
+    if gravador.ativo:
+        print(f'Respostas gravadas: {gravador.gravados} em {gravador.pasta}')
+
+    print('='*60)
+    print('Extração finalizada!')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+# -*- coding: utf-8 -*-
+# Gravação e reprodução do portal do STF para execuções offline do extrator.
+#
+# - GravadorFixtures: usado pelo extrator com --gravar PASTA, grava as páginas
+#   de processos, os fragmentos das abas e os documentos exatamente como foram
+#   recebidos, com um índice (indice.jsonl) que associa cada URL ao seu arquivo.
+# - Servidor: reproduz uma pasta gravada como um portal local, com latência
+#   configurável e respostas 403, CAPTCHA e 502 injetadas aleatoriamente nas
+#   páginas de processos.
+#
+# O extrator acessa o portal simulado com --portal, que reescreve cada URL
+# https://host/caminho como http://127.0.0.1:PORTA/host/caminho.
+#
+# Uso:
+#   python extrator_selenium.py ADI:6000-6010 --gravar fixtures
+#   python portal_simulado.py fixtures --porta 8000 --latencia 0.3 --taxa-403 0.05
+#   python extrator_selenium.py ADI:6000-6010 --portal http://127.0.0.1:8000
+#
+# As gravações dependem do backend: com o Chrome, grava-se a página já
+# renderizada (sem scripts); com o backend HTTP, a página e cada aba. Reproduza
+# com o mesmo backend usado na gravação.
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Endereços das páginas de processos (página principal e fragmentos das abas), as únicas com falhas injetadas
+_PAGINAS_PROCESSO = re.compile(r'/processos/(listarProcessos|aba\w+)\.asp$')
+
+# Página devolvida para processos sem gravação (números além dos gravados)
+PAGINA_NAO_ENCONTRADO = ('<html><body><div id="conteudo">'
+                         '<div class="message-404">Processo não encontrado</div>'
+                         '</div></body></html>')
+
+
+def chave_url(url: str) -> str:
+    """Chave de uma URL no índice: host e caminho, com os parâmetros em ordem.
+
+    O esquema é ignorado, de modo que https://portal.stf.jus.br/x e
+    http://127.0.0.1:8000/portal.stf.jus.br/x têm a mesma chave.
+    """
+    partes = urllib.parse.urlsplit(url.strip().replace('&amp;', '&'))
+    consulta = urllib.parse.urlencode(sorted(urllib.parse.parse_qsl(partes.query, keep_blank_values=True)))
+    return f'{partes.netloc.lower()}{partes.path}' + (f'?{consulta}' if consulta else '')
+
+
+def reescrever_url(url: str, base: str) -> str:
+    """Reescreve https://host/caminho como {base}/host/caminho (URLs já reescritas não mudam)."""
+    if not base or url.startswith(base):
+        return url
+    partes = urllib.parse.urlsplit(url)
+    if not partes.scheme.startswith('http'):
+        return url
+    return base.rstrip('/') + '/' + partes.netloc + urllib.parse.urlunsplit(('', '', partes.path, partes.query, ''))
+
+
+class GravadorFixtures:
+    """Grava as respostas recebidas do portal para reprodução posterior.
+
+    Inativo até abrir() ser chamado; gravar() pode ser chamado por várias threads.
+    """
+
+    def __init__(self):
+        self.pasta = None
+        self._lock = threading.Lock()
+        self.gravados = 0
+
+    def abrir(self, pasta: str):
+        os.makedirs(os.path.join(pasta, 'arquivos'), exist_ok=True)
+        self.pasta = pasta
+
+    @property
+    def ativo(self) -> bool:
+        return self.pasta is not None
+
+    def gravar(self, url: str, conteudo: bytes, tipo_conteudo: str = 'text/html; charset=utf-8',
+               status: int = 200):
+        """Grava o conteúdo recebido para a URL (a gravação mais recente prevalece)."""
+        if self.pasta is None:
+            return
+        chave = chave_url(url)
+        arquivo = hashlib.sha1(chave.encode('utf-8')).hexdigest()
+        with open(os.path.join(self.pasta, 'arquivos', arquivo), 'wb') as f:
+            f.write(conteudo)
+        linha = json.dumps({'chave': chave, 'arquivo': arquivo, 'tipo': tipo_conteudo, 'status': status},
+                           ensure_ascii=False)
+        with self._lock:
+            with open(os.path.join(self.pasta, 'indice.jsonl'), 'a', encoding='utf-8') as f:
+                f.write(linha + '\n')
+            self.gravados += 1
+
+
+def carregar_indice(pasta: str) -> dict:
+    """Lê o índice de uma pasta gravada: chave -> (arquivo, tipo, status)."""
+    indice = {}
+    caminho = os.path.join(pasta, 'indice.jsonl')
+    if os.path.exists(caminho):
+        with open(caminho, encoding='utf-8') as f:
+            for linha in f:
+                if linha.strip():
+                    item = json.loads(linha)
+                    indice[item['chave']] = (item['arquivo'], item['tipo'], item['status'])
+    return indice
+
+
+class Servidor(ThreadingHTTPServer):
+    """Portal local que reproduz uma pasta gravada.
+
+    Args:
+        endereco: (host, porta); porta 0 escolhe uma porta livre
+        pasta: Pasta gravada com GravadorFixtures (None: apenas páginas geradas)
+        latencia: Segundos de espera antes de cada resposta
+        variacao: Variação aleatória da latência, em segundos (para mais ou para menos)
+        taxa_403: Fração das páginas de processos (listarProcessos.asp e abas) trocadas por 403 Forbidden
+        taxa_captcha: Fração das páginas de processos trocadas por uma página de CAPTCHA
+        taxa_502: Fração das páginas de processos trocadas por 502 Bad Gateway
+        semente: Semente do sorteio das falhas, para execuções reprodutíveis
+        gerador: Função opcional (chave) -> (bytes, tipo) ou None, consultada
+            quando a URL não está gravada (ex.: páginas sintéticas)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, endereco: tuple, pasta: str = None, latencia: float = 0, variacao: float = 0,
+                 taxa_403: float = 0, taxa_captcha: float = 0, taxa_502: float = 0,
+                 semente: int = None, gerador=None):
+        super().__init__(endereco, _Manipulador)
+        self.pasta = pasta
+        self.indice = carregar_indice(pasta) if pasta else {}
+        self.latencia = latencia
+        self.variacao = variacao
+        self.taxas = (('403', taxa_403), ('captcha', taxa_captcha), ('502', taxa_502))
+        self.gerador = gerador
+        self._aleatorio = random.Random(semente)
+        self._lock = threading.Lock()
+        self.contagem = {'respostas': 0, '403': 0, 'captcha': 0, '502': 0, 'nao_gravados': 0}
+
+    @property
+    def url_base(self) -> str:
+        host, porta = self.server_address[:2]
+        return f'http://{host}:{porta}'
+
+    def sortear(self) -> tuple:
+        """Sorteia a latência e a falha injetada (ou None) de uma resposta."""
+        with self._lock:
+            latencia = max(0.0, self.latencia + self._aleatorio.uniform(-self.variacao, self.variacao))
+            sorteio = self._aleatorio.random()
+        acumulado = 0
+        for falha, taxa in self.taxas:
+            acumulado += taxa
+            if sorteio < acumulado:
+                return latencia, falha
+        return latencia, None
+
+    def contar(self, chave: str):
+        with self._lock:
+            self.contagem[chave] += 1
+
+
+class _Manipulador(BaseHTTPRequestHandler):
+
+    def log_message(self, format, *args):
+        pass
+
+    def _responder(self, status: int, corpo: bytes, tipo: str = 'text/html; charset=utf-8'):
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def do_GET(self):
+        servidor = self.server
+        chave = chave_url('http://' + self.path.lstrip('/'))
+        latencia, falha = servidor.sortear()
+        if latencia:
+            time.sleep(latencia)
+
+        servidor.contar('respostas')
+        # As falhas só são injetadas nas páginas de processos: os documentos
+        # (downloadPeca.asp) são baixados pelo dsd, que aguarda vários minutos a cada CAPTCHA
+        if not _PAGINAS_PROCESSO.search(urllib.parse.urlsplit(chave).path):
+            falha = None
+        if falha == '403':
+            servidor.contar('403')
+            return self._responder(403, b'<html><body><h1>403 Forbidden</h1></body></html>')
+        if falha == '502':
+            servidor.contar('502')
+            return self._responder(502, b'<html><body><h1>502 Bad Gateway</h1></body></html>')
+        if falha == 'captcha':
+            servidor.contar('captcha')
+            return self._responder(200, '<html><body><form>CAPTCHA: confirme que você não é um robô'
+                                        '</form></body></html>'.encode('utf-8'))
+
+        gravado = servidor.indice.get(chave)
+        if gravado is not None:
+            arquivo, tipo, status = gravado
+            with open(os.path.join(servidor.pasta, 'arquivos', arquivo), 'rb') as f:
+                return self._responder(status, f.read(), tipo)
+
+        if servidor.gerador is not None:
+            gerado = servidor.gerador(chave)
+            if gerado is not None:
+                return self._responder(200, *gerado)
+
+        servidor.contar('nao_gravados')
+        if re.search(r'/listarProcessos\.asp$', urllib.parse.urlsplit(chave).path):
+            return self._responder(200, PAGINA_NAO_ENCONTRADO.encode('utf-8'))
+        return self._responder(404, b'Not Found', 'text/plain')
+
+
+def iniciar_servidor(pasta: str = None, porta: int = 0, **opcoes) -> Servidor:
+    """Inicia o portal simulado em uma thread e o retorna (use servidor.url_base).
+
+    Encerre com servidor.shutdown(). As opções são as de Servidor.
+    """
+    servidor = Servidor(('127.0.0.1', porta), pasta, **opcoes)
+    threading.Thread(target=servidor.serve_forever, name='portal-simulado', daemon=True).start()
+    return servidor
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Reproduz uma gravação do portal do STF como um servidor local.')
+    parser.add_argument('pasta', help='Pasta gravada com python extrator_selenium.py --gravar PASTA')
+    parser.add_argument('--porta', type=int, default=8000)
+    parser.add_argument('--latencia', type=float, default=0, help='Segundos de espera por resposta')
+    parser.add_argument('--variacao', type=float, default=0, help='Variação aleatória da latência, em segundos')
+    parser.add_argument('--taxa-403', type=float, default=0, help='Fração de respostas 403 (ex.: 0.05)')
+    parser.add_argument('--taxa-captcha', type=float, default=0, help='Fração de páginas de CAPTCHA')
+    parser.add_argument('--taxa-502', type=float, default=0, help='Fração de respostas 502')
+    parser.add_argument('--semente', type=int, default=None, help='Semente do sorteio das falhas')
+    args = parser.parse_args()
+
+    servidor = Servidor(('127.0.0.1', args.porta), args.pasta, latencia=args.latencia,
+                        variacao=args.variacao, taxa_403=args.taxa_403, taxa_captcha=args.taxa_captcha,
+                        taxa_502=args.taxa_502, semente=args.semente)
+    print(f'Portal simulado em {servidor.url_base} ({len(servidor.indice)} URL(s) gravada(s))')
+    print(f'Use: python extrator_selenium.py ... --portal {servidor.url_base}')
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        print(f'Respostas: {servidor.contagem}')
+
+
+if __name__ == '__main__':
+    main()